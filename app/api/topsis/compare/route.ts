@@ -0,0 +1,117 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { FuzzySiteData } from '@/lib/fuzzyTypes';
+
+const PYTHON_SERVICE_URL = process.env.PYTHON_TOPSIS_URL || 'http://localhost:5001';
+
+export async function POST(request: NextRequest) {
+  try {
+    const { sites, weights } = await request.json();
+
+    if (!sites || !Array.isArray(sites) || sites.length === 0) {
+      return NextResponse.json(
+        { success: false, error: 'No sites provided' },
+        { status: 400 }
+      );
+    }
+
+    // Fuzzy site data is sent once; the service derives the crisp matrix
+    // from the most_likely values
+    const alternatives = sites.map((site: FuzzySiteData) => [
+      site.criteria.solar_potential,
+      site.criteria.land_suitability,
+      site.criteria.grid_proximity,
+      site.criteria.installation_cost,
+    ]);
+
+    // Create fuzzy weights (with 10% uncertainty); their most_likely values
+    // are the crisp weights
+    const fuzzyWeights = [
+      weights.solar_potential,
+      weights.land_suitability,
+      weights.grid_proximity,
+      weights.installation_cost,
+    ].map((w: number) => ({ lower: w * 0.9, most_likely: w, upper: w * 1.1 }));
+
+    // Criteria types: true = benefit (higher is better), false = cost (lower is better)
+    const criteriaTypes = [
+      true, // solar_potential (benefit)
+      true, // land_suitability (benefit)
+      false, // grid_proximity (cost - closer is better)
+      false, // installation_cost (cost - lower is better)
+    ];
+
+    console.log('Sending to Python TOPSIS compare service:', PYTHON_SERVICE_URL);
+    console.log('Number of alternatives:', alternatives.length);
+
+    // One call runs both fuzzy and crisp TOPSIS
+    const response = await fetch(`${PYTHON_SERVICE_URL}/api/topsis/compare`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        alternatives,
+        weights: fuzzyWeights,
+        criteria_types: criteriaTypes,
+      }),
+    });
+
+    if (!response.ok) {
+      throw new Error(`Python service returned ${response.status}: ${response.statusText}`);
+    }
+
+    const result = await response.json();
+
+    if (!result.success) {
+      throw new Error(result.error || 'TOPSIS comparison failed');
+    }
+
+    // Transform both Python rankings to the frontend TOPSISResult format
+    const toResults = (rankings: any[]) =>
+      rankings.map((r: any) => {
+        const site = sites[r.alternative_index];
+        const score = r.closeness_coefficient * 100;
+
+        return {
+          site_id: site.site_id,
+          rank: r.rank,
+          topsis_score: score,
+          viability: getViability(score),
+          criteria_scores: {
+            solar_potential: site.criteria.solar_potential.most_likely,
+            land_suitability: site.criteria.land_suitability.most_likely,
+            grid_proximity: site.criteria.grid_proximity.most_likely,
+            installation_cost: site.criteria.installation_cost.most_likely,
+          },
+          location: site.location,
+        };
+      });
+
+    return NextResponse.json({
+      success: true,
+      fuzzy_results: toResults(result.fuzzy.rankings),
+      crisp_results: toResults(result.crisp.rankings),
+      metrics: {
+        ...result.metrics,
+        // Closeness difference on the same 0-100 scale as topsis_score
+        average_score_difference: result.metrics.average_score_difference * 100,
+      },
+    });
+  } catch (error: any) {
+    console.error('TOPSIS compare API error:', error);
+    return NextResponse.json(
+      {
+        success: false,
+        error: error.message || 'Failed to compare fuzzy and crisp TOPSIS',
+      },
+      { status: 500 }
+    );
+  }
+}
+
+function getViability(score: number): 'Excellent' | 'Good' | 'Fair' | 'Poor' {
+  if (score >= 80) return 'Excellent';
+  if (score >= 60) return 'Good';
+  if (score >= 40) return 'Fair';
+  return 'Poor';
+}
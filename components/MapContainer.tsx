@@ -10,7 +10,7 @@ import { createGridLayer } from './GridLayer';
 import ControlPanel from './ControlPanel';
 import ResultsPanel from './ResultsPanel';
 import { ComparisonData } from '@/lib/topsisTypes';
-import { calculateComparisonMetrics } from '@/lib/comparisonUtils';
+import { buildComparisonData } from '@/lib/comparisonUtils';
 
 interface MapContainerProps {
   mapboxToken: string;
@@ -198,46 +198,33 @@ export default function MapContainer({ mapboxToken, allowRotation = false }: Map
         setAnalysisProgress('Running both fuzzy and crisp TOPSIS analyses...');
         
         try {
-          // Run both analyses in parallel
-          const [fuzzyResponse, crispResponse] = await Promise.all([
-            fetch('/api/topsis', {
-              method: 'POST',
-              headers: { 'Content-Type': 'application/json' },
-              body: JSON.stringify({ sites: generatedFuzzySiteData, weights }),
-            }),
-            fetch('/api/topsis/crisp', {
-              method: 'POST',
-              headers: { 'Content-Type': 'application/json' },
-              body: JSON.stringify({ sites: generatedFuzzySiteData, weights }),
-            }),
-          ]);
-
-          if (!fuzzyResponse.ok) {
-            const error = await fuzzyResponse.json();
-            throw new Error(`Fuzzy TOPSIS failed: ${error.error || 'Unknown error'}`);
-          }
+          // Run both analyses in one request; the service parses the sites once
+          const compareResponse = await fetch('/api/topsis/compare', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ sites: generatedFuzzySiteData, weights }),
+          });
 
-          if (!crispResponse.ok) {
-            const error = await crispResponse.json();
-            throw new Error(`Crisp TOPSIS failed: ${error.error || 'Unknown error'}`);
+          if (!compareResponse.ok) {
+            const error = await compareResponse.json();
+            throw new Error(`TOPSIS comparison failed: ${error.error || 'Unknown error'}`);
           }
 
-          const fuzzyResult = await fuzzyResponse.json();
-          const crispResult = await crispResponse.json();
+          const compareResult = await compareResponse.json();
 
-          if (!fuzzyResult.success || !crispResult.success) {
+          if (!compareResult.success) {
             throw new Error('One or both analyses failed');
           }
 
-          // Calculate comparison metrics
-          setAnalysisProgress('Calculating comparison metrics...');
-          const comparison = calculateComparisonMetrics(
-            fuzzyResult.results,
-            crispResult.results
+          // The service already computed the comparison metrics
+          const comparison = buildComparisonData(
+            compareResult.fuzzy_results,
+            compareResult.crisp_results,
+            compareResult.metrics
           );
 
           setComparisonData(comparison);
-          setAnalysisResults(fuzzyResult.results); // Keep fuzzy results for map visualization
+          setAnalysisResults(compareResult.fuzzy_results); // Keep fuzzy results for map visualization
           setAnalysisProgress('Comparison analysis complete!');
 
         } catch (fetchError: any) {
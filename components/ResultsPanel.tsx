@@ -476,6 +476,10 @@ function ComparisonSummary({ metrics }: { metrics: ComparisonMetrics }) {
           <span className="text-gray-600">Rank correlation:</span>
           <span className="ml-2 font-semibold">{metrics.rank_correlation.toFixed(3)}</span>
         </div>
+        <div>
+          <span className="text-gray-600">Kendall tau-b:</span>
+          <span className="ml-2 font-semibold">{metrics.kendall_tau_b.toFixed(3)}</span>
+        </div>
       </div>
     </div>
   );
@@ -31,6 +31,7 @@ export interface ComparisonMetrics {
   max_rank_difference: number;
   average_score_difference: number;
   rank_correlation: number;
+  kendall_tau_b: number;
 }
 
 export interface ComparisonResult {
@@ -0,0 +1,135 @@
+import numpy as np
+
+from vectorized_topsis import fuzzy_column_scales, normalize_fuzzy_columns
+
+
+def alpha_levels_from(value=11):
+    """Alpha levels from a count (evenly spaced over [0, 1]) or an explicit list"""
+    if isinstance(value, bool):
+        raise ValueError('alpha_levels must be an integer >= 2 or a list of levels in [0, 1]')
+    if isinstance(value, int):
+        if value < 2:
+            raise ValueError('alpha_levels must be an integer >= 2 or a list of levels in [0, 1]')
+        return np.linspace(0.0, 1.0, value)
+    levels = np.unique(np.asarray(value, dtype=float))
+    if levels.ndim != 1 or len(levels) == 0 or levels[0] < 0 or levels[-1] > 1:
+        raise ValueError('alpha_levels must be an integer >= 2 or a list of levels in [0, 1]')
+    return levels
+
+
+class AlphaCutFuzzyTOPSIS:
+    """Interval fuzzy TOPSIS over the alpha-cuts of a (n, m, 3) TFN tensor.
+
+    At level alpha, the weighted TFN (a, b, c) becomes the interval
+    [a + alpha (b - a), c - alpha (c - b)]. Per level and criterion, the
+    positive ideal is the largest upper bound (the smallest lower bound for
+    cost criteria) and the negative ideal the opposite extreme. Each site's
+    distance to an ideal is then an interval, from the closest to the
+    farthest point of its cuts, summed over criteria like the vertex
+    distances of FuzzyTOPSIS. This gives the closeness interval
+
+        [d-_min / (d-_min + d+_max), d-_max / (d-_max + d+_min)]
+
+    per level. All levels are an extra leading axis of one (L, rows, m)
+    tensor, evaluated in row blocks of at most block_cells values.
+    """
+
+    def __init__(self, alternatives, weights, criteria_types, alpha_levels=11, dtype=float,
+                 block_cells=4_000_000):
+        """
+        alternatives: array-like of shape (n, m, 3) as (lower, most_likely, upper)
+        weights: array-like of shape (m, 3)
+        criteria_types: List of booleans (True for benefit, False for cost)
+        alpha_levels: number of evenly spaced levels in [0, 1], or a list of levels
+        dtype: float64 (default) or float32
+        """
+        self.alternatives = np.ascontiguousarray(alternatives, dtype=dtype)
+        self.weights = np.ascontiguousarray(weights, dtype=dtype)
+        self.criteria_types = np.asarray(criteria_types, dtype=bool)
+        self.levels = alpha_levels_from(alpha_levels).astype(dtype)
+        self.block_cells = block_cells
+
+        if self.alternatives.ndim != 3 or self.alternatives.shape[2] != 3:
+            raise ValueError('alternatives must have shape (n, m, 3)')
+
+        self.n_alternatives, self.n_criteria = self.alternatives.shape[:2]
+
+        if self.weights.shape != (self.n_criteria, 3):
+            raise ValueError('weights must have shape (m, 3)')
+        if self.criteria_types.shape != (self.n_criteria,):
+            raise ValueError('criteria_types must match number of criteria')
+
+    def weighted_matrix(self):
+        """Normalized, weighted TFN tensor as in VectorizedFuzzyTOPSIS"""
+        scale = fuzzy_column_scales(self.alternatives, self.criteria_types)
+        return normalize_fuzzy_columns(self.alternatives, self.criteria_types, scale) * self.weights
+
+    def cuts(self, weighted):
+        """Alpha-cut bounds of (rows, m, 3) TFNs, each of shape (L, rows, m)"""
+        alpha = self.levels[:, None, None]
+        a, b, c = weighted[None, :, :, 0], weighted[None, :, :, 1], weighted[None, :, :, 2]
+        return a + alpha * (b - a), c - alpha * (c - b)
+
+    def _blocks(self):
+        rows = max(1, self.block_cells // max(len(self.levels) * self.n_criteria, 1))
+        return range(0, self.n_alternatives, rows), rows
+
+    def ideal_solutions(self, weighted):
+        """Positive and negative ideal points per level, each of shape (L, m)"""
+        starts, rows = self._blocks()
+        max_upper = np.full((len(self.levels), self.n_criteria), -np.inf, dtype=weighted.dtype)
+        min_lower = np.full_like(max_upper, np.inf)
+        for start in starts:
+            lower, upper = self.cuts(weighted[start:start + rows])
+            np.maximum(max_upper, upper.max(axis=1), out=max_upper)
+            np.minimum(min_lower, lower.min(axis=1), out=min_lower)
+
+        benefit = self.criteria_types
+        return np.where(benefit, max_upper, min_lower), np.where(benefit, min_lower, max_upper)
+
+    @staticmethod
+    def interval_distances(lower, upper, point):
+        """Closest and farthest distance from each interval to `point`, summed over criteria"""
+        nearest = np.maximum(np.maximum(lower - point, point - upper), 0)
+        farthest = np.maximum(np.abs(lower - point), np.abs(upper - point))
+        return nearest.sum(axis=-1), farthest.sum(axis=-1)
+
+    def closeness_intervals(self):
+        """Lower and upper closeness per level and site, each of shape (L, n)"""
+        weighted = self.weighted_matrix()
+        pis, nis = self.ideal_solutions(weighted)
+        pis, nis = pis[:, None, :], nis[:, None, :]
+
+        shape = (len(self.levels), self.n_alternatives)
+        cc_lower = np.empty(shape, dtype=weighted.dtype)
+        cc_upper = np.empty(shape, dtype=weighted.dtype)
+        starts, rows = self._blocks()
+        for start in starts:
+            lower, upper = self.cuts(weighted[start:start + rows])
+            plus_min, plus_max = self.interval_distances(lower, upper, pis)
+            minus_min, minus_max = self.interval_distances(lower, upper, nis)
+
+            block = slice(start, start + rows)
+            denominator = minus_min + plus_max
+            cc_lower[:, block] = np.divide(minus_min, denominator,
+                                           out=np.zeros_like(denominator), where=denominator > 0)
+            denominator = minus_max + plus_min
+            cc_upper[:, block] = np.divide(minus_max, denominator,
+                                           out=np.zeros_like(denominator), where=denominator > 0)
+        return cc_lower, cc_upper
+
+    def defuzzify(self, cc_lower, cc_upper):
+        """Alpha-weighted mean of the interval midpoints, shape (n,).
+
+        Higher levels are closer to the most likely values and count more;
+        with only the level 0 the midpoints are averaged plainly.
+        """
+        midpoints = (cc_lower + cc_upper) / 2
+        if self.levels.sum() > 0:
+            return self.levels @ midpoints / self.levels.sum()
+        return midpoints.mean(axis=0)
+
+    def closeness(self):
+        """(defuzzified (n,), cc_lower (L, n), cc_upper (L, n))"""
+        cc_lower, cc_upper = self.closeness_intervals()
+        return self.defuzzify(cc_lower, cc_upper), cc_lower, cc_upper
@@ -1,10 +1,131 @@
-from flask import Flask, request, jsonify
+import atexit
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import numpy as np
 
+from alpha_cut_topsis import AlphaCutFuzzyTOPSIS
+from bootstrap import BootstrapRankConfidence
+from batch import BatchProblem, closeness_group, run_batch
+from comparison import compare_rankings
+from ensemble import METHODS, SharedDecisionMatrix, ensemble_rankings, run_ensemble
+from jobs import FINISHED, JobManager, JobQueueFull, JobStore, ProcessPool
+from fuzzy_kernels import crisp_values
+from incremental import IncrementalCrispTOPSIS, IncrementalFuzzyTOPSIS
+from monte_carlo import MonteCarloTOPSIS
+from promethee import PrometheeII
+from request_formats import UnsupportedFormat, columnar_array, read_analyze_request
+from result_cache import ResultCache, cache_key
+from response_formats import JSON_TYPE, RESPONSE_TYPES, columnar_rankings, encode_columnar
+from sensitivity import CrispWeightModel
+from sessions import DecisionSession, IncrementalSessionStore, SessionStore
+from shared_matrices import SharedMatrixStore
+from sobol import CrispTopCloseness, FuzzyTopCloseness, SobolWeightSensitivity
+from streaming_topsis import StreamingCrispTOPSIS, StreamingFuzzyTOPSIS
+from vectorized_topsis import (
+    PRECISIONS,
+    VectorizedFuzzyTOPSIS,
+    closeness_summary,
+    fuzzy_array,
+    rankings_from_closeness,
+    top_k_order
+)
+
 app = Flask(__name__)
 CORS(app)
 
+SESSION_TTL_SECONDS = int(os.environ.get('SESSION_TTL_SECONDS', 900))
+
+# Normalized session matrices are published to shared memory so any worker
+# on the host can re-rank them without a copy, and incremental sessions are
+# kept in a SQLite file any worker can edit. TOPSIS_SHARED_SESSIONS=0 keeps
+# sessions private to the worker that created them.
+shared_matrices = None
+incremental_sessions = None
+if os.environ.get('TOPSIS_SHARED_SESSIONS', '1') != '0':
+    shared_matrices = SharedMatrixStore(
+        os.environ.get('TOPSIS_SHM_DB', os.path.join(tempfile.gettempdir(), 'topsis-shm.sqlite3')),
+        ttl=SESSION_TTL_SECONDS
+    )
+    atexit.register(shared_matrices.close)
+    incremental_sessions = IncrementalSessionStore(
+        os.environ.get('TOPSIS_INCREMENTAL_DB',
+                       os.path.join(tempfile.gettempdir(), 'topsis-incremental.sqlite3')),
+        ttl=SESSION_TTL_SECONDS
+    )
+
+
+def detach_shared_session(session_id, session):
+    """SessionStore on_drop hook: release this worker's mapping of the block"""
+    if getattr(session, 'shared', False):
+        try:
+            shared_matrices.detach(session_id)
+        except sqlite3.Error:
+            pass
+
+
+# Per-worker store for uploaded decision matrices (see /api/sessions)
+session_store = SessionStore(
+    ttl=SESSION_TTL_SECONDS,
+    max_bytes=int(os.environ.get('SESSION_MAX_BYTES', 256 * 1024 * 1024)),
+    on_drop=detach_shared_session
+)
+
+# Closeness results keyed by a hash of the inputs. The SQLite tier is shared
+# by every worker on the node; set TOPSIS_CACHE_DB to an empty string to
+# keep the cache per process.
+result_cache = ResultCache(
+    memory_bytes=int(os.environ.get('TOPSIS_CACHE_MEMORY_BYTES', 64 * 1024 * 1024)),
+    shared_path=os.environ.get(
+        'TOPSIS_CACHE_DB', os.path.join(tempfile.gettempdir(), 'topsis-cache.sqlite3')),
+    shared_bytes=int(os.environ.get('TOPSIS_CACHE_DB_BYTES', 512 * 1024 * 1024)),
+    flush_seconds=float(os.environ.get('TOPSIS_CACHE_FLUSH_SECONDS', 5))
+)
+atexit.register(result_cache.flush_counters)
+
+# Long-running analyses go through /api/jobs: they run in a process pool
+# and their state lives in a SQLite file every worker can read
+job_manager = JobManager(
+    JobStore(
+        os.environ.get('TOPSIS_JOBS_DB', os.path.join(tempfile.gettempdir(), 'topsis-jobs.sqlite3')),
+        ttl=int(os.environ.get('TOPSIS_JOB_TTL_SECONDS', 3600))
+    ),
+    max_workers=int(os.environ.get('TOPSIS_JOB_WORKERS', 2)),
+    max_active=int(os.environ.get('TOPSIS_JOB_MAX_ACTIVE', 32))
+)
+
+# Each job event stream holds a worker thread, so a worker serves at most
+# TOPSIS_JOB_EVENT_STREAMS of them and ends each one after
+# TOPSIS_JOB_EVENT_MAX_SECONDS, or after TOPSIS_JOB_EVENT_IDLE_HEARTBEATS
+# keep-alives without a status change. Clients reconnect or poll after that.
+job_event_streams = threading.BoundedSemaphore(int(os.environ.get('TOPSIS_JOB_EVENT_STREAMS', 2)))
+JOB_EVENT_MAX_SECONDS = float(os.environ.get('TOPSIS_JOB_EVENT_MAX_SECONDS', 600))
+JOB_EVENT_IDLE_HEARTBEATS = int(os.environ.get('TOPSIS_JOB_EVENT_IDLE_HEARTBEATS', 8))
+JOB_EVENT_HEARTBEAT_SECONDS = 15
+
+# /api/batch fans large batches out over its own pool, so it never queues
+# behind long-running jobs
+batch_pool = ProcessPool(int(os.environ.get('TOPSIS_BATCH_WORKERS', 2)))
+BATCH_MAX_PROBLEMS = int(os.environ.get('TOPSIS_BATCH_MAX_PROBLEMS', 1000))
+BATCH_PARALLEL_CELLS = int(os.environ.get('TOPSIS_BATCH_PARALLEL_CELLS', 2_000_000))
+SWEEP_MAX_BREAKPOINTS = int(os.environ.get('TOPSIS_SWEEP_MAX_BREAKPOINTS', 2000))
+# PROMETHEE is O(n^2): cap the matrix size, and spread large ones over batch_pool
+PROMETHEE_MAX_ALTERNATIVES = int(os.environ.get('TOPSIS_PROMETHEE_MAX_ALTERNATIVES', 20000))
+PROMETHEE_PARALLEL_PAIRS = int(os.environ.get('TOPSIS_PROMETHEE_PARALLEL_PAIRS', 50_000_000))
+# Copeland consensus compares every pair of sites
+COPELAND_MAX_ALTERNATIVES = int(os.environ.get('TOPSIS_COPELAND_MAX_ALTERNATIVES', 20000))
+# Bootstrap resamples are ranked in chunks of about this many bytes
+BOOTSTRAP_MAX_RESAMPLES = int(os.environ.get('TOPSIS_BOOTSTRAP_MAX_RESAMPLES', 10000))
+BOOTSTRAP_CHUNK_BYTES = int(os.environ.get('TOPSIS_BOOTSTRAP_CHUNK_BYTES', 64 * 1024 * 1024))
+# Sobol designs cost samples * (m + 2) closeness evaluations
+SOBOL_MAX_EVALUATIONS = int(os.environ.get('TOPSIS_SOBOL_MAX_EVALUATIONS', 1_000_000))
+
 
 class TriangularFuzzyNumber:
     """Represents a triangular fuzzy number (lower, most_likely, upper)"""
@@ -201,29 +322,41 @@ class FuzzyTOPSIS:
 
         return rankings
 
+    def incremental(self):
+        """Switch to an engine that absorbs add/update/remove edits in place"""
+        tfn = lambda t: (t.lower, t.most_likely, t.upper)
+        return IncrementalFuzzyTOPSIS(
+            [[tfn(c) for c in alt] for alt in self.alternatives],
+            [tfn(w) for w in self.weights],
+            self.criteria_types
+        )
+
 
 class CrispTOPSIS:
     """Traditional TOPSIS implementation using deterministic values"""
 
-    def __init__(self, alternatives, weights, criteria_types):
+    def __init__(self, alternatives, weights, criteria_types, dtype=float):
         """
         alternatives: List of lists of numeric values
         weights: List of numeric values for criteria weights
         criteria_types: List of booleans (True for benefit, False for cost)
+        dtype: float64 (default) or float32 for every step of the computation
         """
-        self.alternatives = np.array(alternatives, dtype=float)
-        self.weights = np.array(weights, dtype=float)
+        # asarray keeps an ndarray already in dtype (e.g. from np.frombuffer) uncopied
+        self.alternatives = np.asarray(alternatives, dtype=dtype)
+        self.weights = np.asarray(weights, dtype=dtype)
         self.criteria_types = criteria_types
         self.n_alternatives = len(alternatives)
         self.n_criteria = len(alternatives[0])
 
     def normalize_matrix(self):
         """Normalize using vector normalization"""
-        # Calculate column-wise norms
-        norms = np.sqrt(np.sum(self.alternatives ** 2, axis=0))
+        # Calculate column-wise norms, accumulating in float64 so a float32
+        # run does not lose precision over long columns
+        norms = np.sqrt(np.sum(self.alternatives ** 2, axis=0, dtype=np.float64))
         # Avoid division by zero
         norms[norms == 0] = 1
-        return self.alternatives / norms
+        return self.alternatives / norms.astype(self.alternatives.dtype)
 
     def calculate_weighted_matrix(self, normalized):
         """Apply weights to normalized matrix"""
@@ -257,8 +390,8 @@ class CrispTOPSIS:
         denominator[denominator == 0] = 1
         return d_minus / denominator
 
-    def rank(self):
-        """Perform complete crisp TOPSIS ranking"""
+    def closeness(self):
+        """Run steps 1-5 and return the closeness coefficient array"""
         # Step 1: Normalize
         normalized = self.normalize_matrix()
 
@@ -272,23 +405,202 @@ class CrispTOPSIS:
         d_plus, d_minus = self.calculate_distances(weighted, pis, nis)
 
         # Step 5: Calculate closeness coefficients
-        cc = self.calculate_closeness_coefficients(d_plus, d_minus)
+        return self.calculate_closeness_coefficients(d_plus, d_minus)
 
-        # Step 6: Create rankings
-        rankings = []
-        for i, coefficient in enumerate(cc):
-            rankings.append({
-                'alternative_index': i,
-                'closeness_coefficient': float(coefficient),
-                'rank': 0
-            })
+    def rank(self, top_k=None):
+        """Perform complete crisp TOPSIS ranking, optionally only the top k"""
+        # Step 6: Create rankings (partial selection when top_k is set)
+        return rankings_from_closeness(self.closeness(), top_k)
 
-        # Sort and assign ranks
-        rankings.sort(key=lambda x: x['closeness_coefficient'], reverse=True)
-        for rank, item in enumerate(rankings, 1):
-            item['rank'] = rank
+    def closeness_scenarios(self, weight_sets):
+        """Closeness coefficients for K weight vectors of shape (K, m).
 
-        return rankings
+        normalize_matrix runs once; the weight vectors are broadcast over a
+        (K, n, m) tensor and every scenario is scored in the same pass.
+        """
+        weight_sets = np.asarray(weight_sets, dtype=self.alternatives.dtype)
+        if weight_sets.ndim != 2 or weight_sets.shape[1] != self.n_criteria:
+            raise ValueError('weight_sets must have shape (K, m)')
+
+        normalized = self.normalize_matrix()
+        weighted = normalized[None, :, :] * weight_sets[:, None, :]
+
+        col_max = weighted.max(axis=1, keepdims=True)
+        col_min = weighted.min(axis=1, keepdims=True)
+        benefit = np.asarray(self.criteria_types, dtype=bool)
+        pis = np.where(benefit, col_max, col_min)
+        nis = np.where(benefit, col_min, col_max)
+
+        d_plus = np.sqrt(np.sum((weighted - pis) ** 2, axis=2))
+        d_minus = np.sqrt(np.sum((weighted - nis) ** 2, axis=2))
+        return self.calculate_closeness_coefficients(d_plus, d_minus)
+
+    def rank_scenarios(self, weight_sets):
+        """Rank the alternatives once per weight vector"""
+        return [rankings_from_closeness(cc) for cc in self.closeness_scenarios(weight_sets)]
+
+    def incremental(self):
+        """Switch to an engine that absorbs add/update/remove edits in place"""
+        return IncrementalCrispTOPSIS(self.alternatives, self.weights, self.criteria_types)
+
+
+def validate_topsis_payload(data, matrix, weights_field='weights'):
+    """Alternatives, weights and criteria_types of an analyze payload.
+
+    matrix is the ndarray read_analyze_request parsed from a binary or
+    columnar body, or None when data['alternatives'] holds the rows.
+    Raises ValueError naming the first missing or malformed field.
+    """
+    alternatives = data.get('alternatives') if matrix is None else matrix
+    weights = data.get(weights_field)
+    criteria_types = data.get('criteria_types')
+
+    if matrix is None and (not alternatives or not isinstance(alternatives, list)):
+        raise ValueError('Invalid or missing alternatives')
+    if not weights or not isinstance(weights, list):
+        raise ValueError(f'Invalid or missing {weights_field}')
+    if not criteria_types or not isinstance(criteria_types, list):
+        raise ValueError('Invalid or missing criteria_types')
+    return alternatives, weights, criteria_types
+
+
+def reject_distance(data, feature):
+    """Refuse a fuzzy distance kernel on a feature that ranks crisp samples"""
+    if data.get('distance', 'vertex') != 'vertex':
+        raise ValueError(f'{feature} ranks crisp realizations of the fuzzy numbers '
+                         'and does not support distance')
+
+
+def parse_top_k(data):
+    """Read the optional top_k request field; None means rank everything"""
+    top_k = data.get('top_k')
+    if top_k is None:
+        return None
+    if isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1:
+        raise ValueError('top_k must be a positive integer')
+    return top_k
+
+
+def parse_precision(data):
+    """Read the optional precision field as a NumPy dtype, float64 by default"""
+    precision = data.get('precision', 'float64')
+    if precision not in PRECISIONS:
+        raise ValueError("precision must be 'float64' or 'float32'")
+    return PRECISIONS[precision]
+
+
+def share_session(session_id, session):
+    """Make a session reachable from every worker, if sharing is enabled.
+
+    A re-weighting session's matrix moves into shared memory; an
+    incremental session is saved to incremental_sessions.
+    """
+    if shared_matrices is None:
+        return
+    if not isinstance(session, DecisionSession):
+        try:
+            incremental_sessions.create(session_id, session)
+            session.shared = True
+        except sqlite3.Error:
+            pass
+        return
+    try:
+        session.normalized = shared_matrices.publish(
+            session_id, session.normalized,
+            {'criteria_types': session.criteria_types.tolist(), 'distance': session.distance})
+        session.shared = True
+    except (OSError, sqlite3.Error):
+        # No usable /dev/shm (e.g. on Lambda): the session stays worker-local
+        pass
+
+
+def find_session(session_id):
+    """This worker's session, or a shared one published by another worker"""
+    session = session_store.get(session_id)
+    if session is not None:
+        if (isinstance(session, DecisionSession) and getattr(session, 'shared', False)
+                and not shared_matrices.touch(session_id)):
+            # Deleted or expired through another worker
+            session_store.delete(session_id)
+            return None
+        return session
+
+    if shared_matrices is None:
+        return None
+    try:
+        attached = shared_matrices.attach(session_id)
+        if attached is None:
+            session = incremental_sessions.load(session_id)
+    except (OSError, sqlite3.Error):
+        return None
+    if attached is None:
+        if session is not None:
+            session.shared = True
+            session_store.create(session, session_id)
+        return session
+
+    view, meta = attached
+    session = DecisionSession(view, meta['criteria_types'], view.dtype,
+                              meta.get('distance') or 'vertex')
+    session.shared = True
+    session_store.create(session, session_id)
+    return session
+
+
+def resolve_data_path(relative_path):
+    """Resolve a client-supplied path inside TOPSIS_DATA_DIR, or raise ValueError"""
+    data_dir = os.environ.get('TOPSIS_DATA_DIR')
+    if not data_dir:
+        raise ValueError('TOPSIS_DATA_DIR is not configured on this service')
+    if not relative_path or not isinstance(relative_path, str):
+        raise ValueError('Invalid or missing path')
+
+    root = os.path.realpath(data_dir)
+    path = os.path.realpath(os.path.join(root, relative_path))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError('Path must stay inside TOPSIS_DATA_DIR')
+    return path
+
+
+def resolve_output_path(relative_path, matrix_path):
+    """Resolve an optional output .npy path, which must not be the input matrix"""
+    if relative_path is None:
+        return None
+    path = resolve_data_path(relative_path)
+    if path == os.path.realpath(matrix_path):
+        raise ValueError('output_path must not be the input matrix')
+    return path
+
+
+def ranking_response(cc, top_k, data):
+    """Success payload for a closeness array, with a summary when truncated.
+
+    By default rankings are a list of per-alternative dicts. With
+    "response_format": "columnar", or an Accept header asking for msgpack or
+    .npy, they are encoded as parallel order/closeness/rank arrays instead.
+    """
+    response_format = data.get('response_format', 'records')
+    if response_format not in ('records', 'columnar'):
+        raise ValueError("response_format must be 'records' or 'columnar'")
+
+    mimetype = request.accept_mimetypes.best_match(RESPONSE_TYPES, default=JSON_TYPE)
+    if response_format == 'records' and mimetype == JSON_TYPE:
+        response = {
+            'success': True,
+            'rankings': rankings_from_closeness(cc, top_k)
+        }
+        if top_k is not None:
+            response['summary'] = closeness_summary(cc)
+        return jsonify(response)
+
+    response = {
+        'success': True,
+        **columnar_rankings(cc, top_k_order(cc, top_k))
+    }
+    if top_k is not None:
+        response['summary'] = closeness_summary(cc)
+    body, mimetype = encode_columnar(response, mimetype)
+    return Response(body, mimetype=mimetype)
 
 
 @app.route('/health', methods=['GET'])
@@ -296,47 +608,94 @@ def health():
     return jsonify({'status': 'healthy', 'service': 'fuzzy-topsis'})
 
 
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({'success': True, **result_cache.stats()})
+
+
 @app.route('/api/fuzzy-topsis/analyze', methods=['POST'])
 def analyze():
     try:
-        print("Received request at /api/fuzzy-topsis/analyze")
-        print("Headers:", request.headers)
-        data = request.json
-        print("Data received")
-
-        # Parse alternatives (fuzzy numbers)
-        alternatives = []
-        for alt in data['alternatives']:
-            fuzzy_alt = []
-            for criterion in alt:
-                fuzzy_alt.append(TriangularFuzzyNumber(
-                    criterion['lower'],
-                    criterion['most_likely'],
-                    criterion['upper']
-                ))
-            alternatives.append(fuzzy_alt)
+        data, alternatives = read_analyze_request(request, fuzzy=True)
 
-        # Parse weights (fuzzy numbers)
-        weights = []
-        for w in data['weights']:
-            weights.append(TriangularFuzzyNumber(
-                w['lower'],
-                w['most_likely'],
-                w['upper']
-            ))
+        # Parse alternatives and weights straight into (n, m, 3) / (m, 3) arrays
+        alternatives, weights, criteria_types = validate_topsis_payload(data, alternatives)
+        dtype = parse_precision(data)
+        if not isinstance(alternatives, np.ndarray):
+            alternatives = fuzzy_array(alternatives, dtype)
+        weights = fuzzy_array(weights, dtype)
 
-        # Parse criteria types
-        criteria_types = data['criteria_types']
+        top_k = parse_top_k(data)
 
-        # Run fuzzy TOPSIS
-        topsis = FuzzyTOPSIS(alternatives, weights, criteria_types)
-        rankings = topsis.rank()
+        # Run fuzzy TOPSIS, reusing a cached result for identical inputs
+        topsis = VectorizedFuzzyTOPSIS(alternatives, weights, criteria_types, dtype,
+                                       data.get('distance', 'vertex'))
+        key = cache_key(f'fuzzy-topsis:{topsis.alternatives.dtype}:{topsis.distance}',
+                        topsis.alternatives, topsis.weights, topsis.criteria_types)
+        cc, source = result_cache.get_or_compute(key, topsis.closeness)
 
+        response = ranking_response(cc, top_k, data)
+        response.headers['X-Cache'] = source
+        return response
+
+    except UnsupportedFormat as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 415
+    except (KeyError, TypeError, ValueError) as e:
         return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/fuzzy-topsis/alpha-cut', methods=['POST'])
+def analyze_alpha_cut():
+    """Closeness intervals per alpha level, ranked by their defuzzified value"""
+    try:
+        data, alternatives = read_analyze_request(request, fuzzy=True)
+
+        alternatives, weights, criteria_types = validate_topsis_payload(data, alternatives)
+        dtype = parse_precision(data)
+        if not isinstance(alternatives, np.ndarray):
+            alternatives = fuzzy_array(alternatives, dtype)
+        weights = fuzzy_array(weights, dtype)
+        top_k = parse_top_k(data)
+
+        topsis = AlphaCutFuzzyTOPSIS(alternatives, weights, criteria_types,
+                                     data.get('alpha_levels', 11), dtype)
+        cc, cc_lower, cc_upper = topsis.closeness()
+
+        rankings = rankings_from_closeness(cc, top_k)
+        for row in rankings:
+            i = row['alternative_index']
+            row['closeness_intervals'] = np.stack([cc_lower[:, i], cc_upper[:, i]], axis=1).tolist()
+
+        result = {
             'success': True,
+            'alpha_levels': topsis.levels.tolist(),
             'rankings': rankings
-        })
+        }
+        if top_k is not None:
+            result['summary'] = closeness_summary(cc)
+        return jsonify(result)
 
+    except UnsupportedFormat as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 415
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -347,56 +706,422 @@ def analyze():
 @app.route('/api/crisp-topsis/analyze', methods=['POST'])
 def analyze_crisp():
     try:
-        data = request.json
+        data, matrix = read_analyze_request(request, fuzzy=False)
 
-        # Parse request data
-        alternatives = data.get('alternatives')
-        weights = data.get('weights')
-        criteria_types = data.get('criteria_types')
+        # Parse request data (binary and columnar bodies arrive as an ndarray)
+        alternatives, weights, criteria_types = validate_topsis_payload(data, matrix)
 
-        # Validate inputs
-        if not alternatives or not isinstance(alternatives, list):
+        # Validate dimensions
+        if len(alternatives) == 0:
             return jsonify({
                 'success': False,
-                'error': 'Invalid or missing alternatives'
+                'error': 'No alternatives provided'
             }), 400
 
-        if not weights or not isinstance(weights, list):
+        n_criteria = len(alternatives[0])
+        if len(weights) != n_criteria or len(criteria_types) != n_criteria:
             return jsonify({
                 'success': False,
-                'error': 'Invalid or missing weights'
+                'error': 'Weights and criteria_types must match number of criteria'
             }), 400
 
-        if not criteria_types or not isinstance(criteria_types, list):
+        top_k = parse_top_k(data)
+        dtype = parse_precision(data)
+
+        # Run crisp TOPSIS, reusing a cached result for identical inputs
+        topsis = CrispTOPSIS(alternatives, weights, criteria_types, dtype)
+        key = cache_key(f'crisp-topsis:{topsis.alternatives.dtype}',
+                        topsis.alternatives, topsis.weights, topsis.criteria_types)
+        cc, source = result_cache.get_or_compute(key, topsis.closeness)
+
+        response = ranking_response(cc, top_k, data)
+        response.headers['X-Cache'] = source
+        return response
+
+    except UnsupportedFormat as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 415
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Calculation error: {str(e)}'
+        }), 500
+
+
+
+@app.route('/api/promethee/analyze', methods=['POST'])
+def analyze_promethee():
+    """PROMETHEE II net-flow ranking of a crisp decision matrix"""
+    try:
+        data, matrix = read_analyze_request(request, fuzzy=False)
+
+        alternatives, weights, criteria_types = validate_topsis_payload(data, matrix)
+
+        if len(alternatives) > PROMETHEE_MAX_ALTERNATIVES:
             return jsonify({
                 'success': False,
-                'error': 'Invalid or missing criteria_types'
+                'error': f'PROMETHEE supports at most {PROMETHEE_MAX_ALTERNATIVES} alternatives'
             }), 400
 
-        # Validate dimensions
-        if len(alternatives) == 0:
+        engine = PrometheeII(
+            alternatives, weights, criteria_types,
+            preference=data.get('preference', 'usual'),
+            indifference=data.get('indifference'),
+            preference_threshold=data.get('preference_threshold'),
+            dtype=parse_precision(data)
+        )
+        top_k = parse_top_k(data)
+        parallel = engine.n_alternatives ** 2 >= PROMETHEE_PARALLEL_PAIRS
+        plus, minus, net = engine.flows(batch_pool if parallel else None)
+
+        result = {
+            'success': True,
+            'rankings': [
+                {
+                    'alternative_index': int(i),
+                    'net_flow': float(net[i]),
+                    'positive_flow': float(plus[i]),
+                    'negative_flow': float(minus[i]),
+                    'rank': rank
+                }
+                for rank, i in enumerate(top_k_order(net, top_k), 1)
+            ]
+        }
+        if top_k is not None:
+            result['total'] = engine.n_alternatives
+        return jsonify(result)
+
+    except UnsupportedFormat as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 415
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Calculation error: {str(e)}'
+        }), 500
+
+
+@app.route('/api/ensemble/analyze', methods=['POST'])
+def analyze_ensemble():
+    """TOPSIS, VIKOR, WASPAS and EDAS on one shared normalized matrix, plus a consensus"""
+    try:
+        data, matrix = read_analyze_request(request, fuzzy=False)
+
+        alternatives, weights, criteria_types = validate_topsis_payload(data, matrix)
+        methods = data.get('methods', list(METHODS))
+        consensus = data.get('consensus', 'borda')
+
+        if not isinstance(methods, list):
             return jsonify({
                 'success': False,
-                'error': 'No alternatives provided'
+                'error': 'methods must be a list'
             }), 400
 
-        n_criteria = len(alternatives[0])
-        if len(weights) != n_criteria or len(criteria_types) != n_criteria:
+        if consensus == 'copeland' and len(alternatives) > COPELAND_MAX_ALTERNATIVES:
             return jsonify({
                 'success': False,
-                'error': 'Weights and criteria_types must match number of criteria'
+                'error': f'Copeland consensus supports at most {COPELAND_MAX_ALTERNATIVES} '
+                         'alternatives; use borda'
             }), 400
 
-        # Run crisp TOPSIS
-        topsis = CrispTOPSIS(alternatives, weights, criteria_types)
-        rankings = topsis.rank()
+        shared = SharedDecisionMatrix(alternatives, weights, criteria_types, parse_precision(data))
+        scores, _, consensus_scores = run_ensemble(shared, methods, consensus, data)
+        method_rankings, consensus_rankings = ensemble_rankings(
+            scores, consensus_scores, parse_top_k(data))
 
         return jsonify({
             'success': True,
-            'rankings': rankings
+            'methods': method_rankings,
+            'consensus': {
+                'method': consensus,
+                'rankings': consensus_rankings
+            }
         })
 
-    except ValueError as e:
+    except UnsupportedFormat as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 415
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Calculation error: {str(e)}'
+        }), 500
+
+
+def ranking_vectors(records):
+    """Site indices, scores and ranks from analyze-endpoint ranking records"""
+    if not isinstance(records, list) or not records:
+        raise ValueError('rankings must be a non-empty list of ranking records')
+    return (
+        np.array([r['alternative_index'] for r in records], dtype=np.int64),
+        np.array([r['closeness_coefficient'] for r in records], dtype=float),
+        np.array([r['rank'] for r in records], dtype=np.int64)
+    )
+
+
+def problem_closeness(problem, problem_type):
+    """Closeness of a fuzzy or crisp problem given in the analyze body layout"""
+    if not isinstance(problem, dict):
+        raise ValueError(f'{problem_type} must be an object')
+    item = BatchProblem(problem_type, problem.get('alternatives'), problem.get('weights'),
+                        problem.get('criteria_types'), dtype=parse_precision(problem),
+                        distance=problem.get('distance', 'vertex'))
+    return closeness_group(item.type, item.values[None], item.weights[None],
+                           item.criteria_types[None], item.distance)[0]
+
+
+@app.route('/api/rankings/compare', methods=['POST'])
+def compare_ranking_results():
+    """Rank changes and rank correlations between a fuzzy and a crisp ranking"""
+    try:
+        data = request.json
+
+        if 'fuzzy_rankings' in data or 'crisp_rankings' in data:
+            # Ranking records, possibly top-k: compare the sites present in both
+            fuzzy_index, fuzzy_scores, fuzzy_ranks = ranking_vectors(data.get('fuzzy_rankings'))
+            crisp_index, crisp_scores, crisp_ranks = ranking_vectors(data.get('crisp_rankings'))
+            sites, fuzzy_at, crisp_at = np.intersect1d(
+                fuzzy_index, crisp_index, assume_unique=True, return_indices=True)
+            comparison = compare_rankings(fuzzy_scores[fuzzy_at], crisp_scores[crisp_at],
+                                          fuzzy_ranks[fuzzy_at], crisp_ranks[crisp_at])
+        elif 'fuzzy_scores' in data or 'crisp_scores' in data:
+            # Closeness vectors aligned by site index
+            comparison = compare_rankings(data.get('fuzzy_scores'), data.get('crisp_scores'))
+            sites = np.arange(len(comparison['sites']['fuzzy_score']))
+        elif 'fuzzy' in data or 'crisp' in data:
+            # Two problems in the analyze body layout, ranked here
+            comparison = compare_rankings(problem_closeness(data.get('fuzzy'), 'fuzzy'),
+                                          problem_closeness(data.get('crisp'), 'crisp'))
+            sites = np.arange(len(comparison['sites']['fuzzy_score']))
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Provide fuzzy_rankings and crisp_rankings, fuzzy_scores and '
+                         'crisp_scores, or fuzzy and crisp problems'
+            }), 400
+
+        result = {
+            'success': True,
+            'metrics': comparison['metrics']
+        }
+        if data.get('include_sites', True):
+            result['sites'] = {
+                'alternative_index': sites.tolist(),
+                **{name: values.tolist() for name, values in comparison['sites'].items()}
+            }
+        return jsonify(result)
+
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Calculation error: {str(e)}'
+        }), 500
+
+
+@app.route('/api/topsis/compare', methods=['POST'])
+def analyze_fuzzy_and_crisp():
+    """Fuzzy and crisp rankings of one fuzzy payload, with comparison metrics"""
+    try:
+        data, alternatives = read_analyze_request(request, fuzzy=True)
+
+        alternatives, weights, criteria_types = validate_topsis_payload(data, alternatives)
+        dtype = parse_precision(data)
+        if not isinstance(alternatives, np.ndarray):
+            alternatives = fuzzy_array(alternatives, dtype)
+        weights = fuzzy_array(weights, dtype)
+        top_k = parse_top_k(data)
+
+        # Parsed once; the crisp problem is derived from the same arrays
+        fuzzy = VectorizedFuzzyTOPSIS(alternatives, weights, criteria_types, dtype,
+                                      data.get('distance', 'vertex'))
+        defuzzification = data.get('defuzzification', 'most_likely')
+        crisp = CrispTOPSIS(np.ascontiguousarray(crisp_values(fuzzy.alternatives, defuzzification)),
+                            crisp_values(fuzzy.weights, defuzzification),
+                            fuzzy.criteria_types.tolist(), dtype)
+
+        # Same cache entries as the two analyze endpoints
+        fuzzy_cc, fuzzy_source = result_cache.get_or_compute(
+            cache_key(f'fuzzy-topsis:{fuzzy.alternatives.dtype}:{fuzzy.distance}',
+                      fuzzy.alternatives, fuzzy.weights, fuzzy.criteria_types),
+            fuzzy.closeness)
+        crisp_cc, crisp_source = result_cache.get_or_compute(
+            cache_key(f'crisp-topsis:{crisp.alternatives.dtype}',
+                      crisp.alternatives, crisp.weights, crisp.criteria_types),
+            crisp.closeness)
+
+        comparison = compare_rankings(fuzzy_cc, crisp_cc)
+        result = {
+            'success': True,
+            'defuzzification': defuzzification,
+            'fuzzy': {'rankings': rankings_from_closeness(fuzzy_cc, top_k)},
+            'crisp': {'rankings': rankings_from_closeness(crisp_cc, top_k)},
+            'metrics': comparison['metrics']
+        }
+        if top_k is not None:
+            result['fuzzy']['summary'] = closeness_summary(fuzzy_cc)
+            result['crisp']['summary'] = closeness_summary(crisp_cc)
+
+        response = jsonify(result)
+        response.headers['X-Cache'] = f'fuzzy={fuzzy_source}, crisp={crisp_source}'
+        return response
+
+    except UnsupportedFormat as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 415
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/crisp-topsis/sensitivity', methods=['POST'])
+def crisp_sensitivity():
+    """Weight interval per criterion over which the current top-k order holds"""
+    try:
+        data, matrix = read_analyze_request(request, fuzzy=False)
+
+        alternatives, weights, criteria_types = validate_topsis_payload(data, matrix)
+
+        model = CrispWeightModel(alternatives, weights, criteria_types)
+        top_k = parse_top_k(data) or 1
+
+        return jsonify({
+            'success': True,
+            **model.top_k_stability(top_k)
+        })
+
+    except UnsupportedFormat as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 415
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Calculation error: {str(e)}'
+        }), 500
+
+
+@app.route('/api/crisp-topsis/weight-sweep', methods=['POST'])
+def crisp_weight_sweep():
+    """Ranking on each segment of one criterion's weight range, with the breakpoints"""
+    try:
+        data, matrix = read_analyze_request(request, fuzzy=False)
+
+        alternatives, weights, criteria_types = validate_topsis_payload(data, matrix)
+        criterion = data.get('criterion')
+        weight_range = data.get('range')
+
+        if isinstance(criterion, bool) or not isinstance(criterion, int):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid or missing criterion'
+            }), 400
+
+        if not isinstance(weight_range, list) or len(weight_range) != 2:
+            return jsonify({
+                'success': False,
+                'error': 'range must be a [low, high] list'
+            }), 400
+
+        model = CrispWeightModel(alternatives, weights, criteria_types)
+        sweep = model.weight_sweep(criterion, weight_range[0], weight_range[1],
+                                   top_k=parse_top_k(data),
+                                   max_breakpoints=SWEEP_MAX_BREAKPOINTS)
+
+        return jsonify({
+            'success': True,
+            **sweep
+        })
+
+    except UnsupportedFormat as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 415
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Calculation error: {str(e)}'
+        }), 500
+
+
+def run_sobol(data, model):
+    """Sobol indices of the top sites' closeness for a crisp or fuzzy closeness model"""
+    samples = data.get('samples', 1024)
+    if isinstance(samples, bool) or not isinstance(samples, int) or samples < 2:
+        raise ValueError('samples must be an integer of at least 2')
+    if samples * (model.n_criteria + 2) > SOBOL_MAX_EVALUATIONS:
+        raise ValueError(f'samples * (criteria + 2) must not exceed {SOBOL_MAX_EVALUATIONS}')
+
+    engine = SobolWeightSensitivity(model, top_k=data.get('top_k', 10),
+                                    distribution=data.get('distribution', 'uniform'),
+                                    spread=float(data.get('spread', 0.5)))
+    return engine.run(samples, sampling=data.get('sampling', 'halton'), seed=data.get('seed', 0))
+
+
+@app.route('/api/crisp-topsis/sobol', methods=['POST'])
+def crisp_sobol():
+    """First-order and total Sobol indices of the weights for the top sites' closeness"""
+    try:
+        data, matrix = read_analyze_request(request, fuzzy=False)
+        alternatives, weights, criteria_types = validate_topsis_payload(data, matrix)
+        model = CrispTopCloseness(alternatives, weights, criteria_types)
+        return jsonify({
+            'success': True,
+            **run_sobol(data, model)
+        })
+
+    except UnsupportedFormat as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 415
+    except (KeyError, TypeError, ValueError) as e:
         return jsonify({
             'success': False,
             'error': f'Invalid input data: {str(e)}'
@@ -408,7 +1133,797 @@ def analyze_crisp():
         }), 500
 
 
+@app.route('/api/fuzzy-topsis/sobol', methods=['POST'])
+def fuzzy_sobol():
+    """Sobol indices of the fuzzy weights for the top sites' closeness"""
+    try:
+        data, matrix = read_analyze_request(request, fuzzy=True)
+        alternatives, weights, criteria_types = validate_topsis_payload(data, matrix)
+        if matrix is None:
+            alternatives = fuzzy_array(alternatives)
+        model = FuzzyTopCloseness(alternatives, fuzzy_array(weights),
+                                  criteria_types, data.get('distance', 'vertex'))
+        return jsonify({
+            'success': True,
+            **run_sobol(data, model)
+        })
+
+    except UnsupportedFormat as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 415
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Calculation error: {str(e)}'
+        }), 500
+
+
+@app.route('/api/fuzzy-topsis/analyze-scenarios', methods=['POST'])
+def analyze_scenarios():
+    """Rank one fuzzy decision matrix against K fuzzy weight sets"""
+    try:
+        data = request.json
+
+        alternatives, weight_sets, criteria_types = validate_topsis_payload(
+            data, None, weights_field='weight_sets')
+        alternatives = fuzzy_array(alternatives)
+        weight_sets = np.stack([fuzzy_array(w) for w in weight_sets])
+
+        topsis = VectorizedFuzzyTOPSIS(alternatives, weight_sets[0], criteria_types,
+                                       distance=data.get('distance', 'vertex'))
+
+        return jsonify({
+            'success': True,
+            'scenario_rankings': topsis.rank_scenarios(weight_sets)
+        })
+
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/crisp-topsis/analyze-scenarios', methods=['POST'])
+def analyze_crisp_scenarios():
+    """Rank one crisp decision matrix against K weight vectors"""
+    try:
+        data = request.json
+
+        alternatives, weight_sets, criteria_types = validate_topsis_payload(
+            data, None, weights_field='weight_sets')
+
+        n_criteria = len(alternatives[0])
+        if len(criteria_types) != n_criteria or any(len(w) != n_criteria for w in weight_sets):
+            return jsonify({
+                'success': False,
+                'error': 'Weight sets and criteria_types must match number of criteria'
+            }), 400
+
+        topsis = CrispTOPSIS(alternatives, weight_sets[0], criteria_types)
+
+        return jsonify({
+            'success': True,
+            'scenario_rankings': topsis.rank_scenarios(weight_sets)
+        })
+
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Calculation error: {str(e)}'
+        }), 500
+
+
+@app.route('/api/fuzzy-topsis/rank-stability', methods=['POST'])
+def rank_stability():
+    """Monte Carlo rank probabilities for a fuzzy decision problem"""
+    try:
+        data = request.json
+
+        alternatives, weights, criteria_types = validate_topsis_payload(data, None)
+        reject_distance(data, 'rank-stability')
+        engine = MonteCarloTOPSIS(fuzzy_array(alternatives), fuzzy_array(weights), criteria_types,
+                                  seed=data.get('seed'))
+        result = engine.run(
+            tolerance=float(data.get('tolerance', 0.01)),
+            batch_size=int(data.get('batch_size', 200)),
+            min_samples=data.get('min_samples'),
+            max_samples=int(data.get('max_samples', 20000)),
+            confidence=float(data.get('confidence', 0.95)),
+            max_rank=data.get('max_rank')
+        )
+
+        return jsonify({
+            'success': True,
+            **result
+        })
+
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/crisp-topsis/bootstrap-ranks', methods=['POST'])
+def bootstrap_ranks():
+    """Rank intervals from bootstrap resampling of each site's yearly irradiance"""
+    try:
+        data, matrix = read_analyze_request(request, fuzzy=False)
+
+        alternatives, weights, criteria_types = validate_topsis_payload(data, matrix)
+        yearly = data.get('yearly')
+        resamples = data.get('resamples', 1000)
+
+        if not yearly or not isinstance(yearly, list):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid or missing yearly'
+            }), 400
+
+        if isinstance(resamples, bool) or not isinstance(resamples, int) \
+                or not 1 <= resamples <= BOOTSTRAP_MAX_RESAMPLES:
+            return jsonify({
+                'success': False,
+                'error': f'resamples must be an integer between 1 and {BOOTSTRAP_MAX_RESAMPLES}'
+            }), 400
+
+        engine = BootstrapRankConfidence(alternatives, weights, criteria_types, yearly,
+                                         criterion=data.get('criterion', 0),
+                                         seed=data.get('seed', 0))
+        result = engine.run(
+            resamples=resamples,
+            confidence=float(data.get('confidence', 0.95)),
+            max_rank=data.get('max_rank'),
+            chunk_bytes=BOOTSTRAP_CHUNK_BYTES
+        )
+
+        return jsonify({
+            'success': True,
+            **result
+        })
+
+    except UnsupportedFormat as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 415
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Calculation error: {str(e)}'
+        }), 500
+
+
+@app.route('/api/sessions', methods=['POST'])
+def create_session():
+    """Upload a decision matrix once and keep it normalized for re-weighting"""
+    try:
+        data = request.json
+
+        session_type = data.get('type', 'fuzzy')
+        criteria_types = data.get('criteria_types')
+
+        if not data.get('alternatives') or not isinstance(data['alternatives'], list):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid or missing alternatives'
+            }), 400
+
+        if not criteria_types or not isinstance(criteria_types, list):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid or missing criteria_types'
+            }), 400
+
+        # With weights the session is incremental: alternatives can then be
+        # added, updated and removed in place. Without weights it keeps the
+        # normalized matrix for re-weighting; normalization does not depend on
+        # the weights, so unit weights are used.
+        weights = data.get('weights')
+        n_criteria = len(criteria_types)
+        dtype = parse_precision(data)
+        if weights and dtype != np.float64:
+            raise ValueError('Incremental sessions only support float64 precision')
+
+        if session_type == 'fuzzy':
+            alternatives = fuzzy_array(data['alternatives'], dtype)
+            fuzzy_weights = fuzzy_array(weights) if weights else np.ones((n_criteria, 3))
+            topsis = VectorizedFuzzyTOPSIS(alternatives, fuzzy_weights, criteria_types, dtype,
+                                           data.get('distance', 'vertex'))
+            if weights:
+                session = topsis.incremental()
+            else:
+                session = DecisionSession(topsis.normalize_fuzzy_matrix(), criteria_types, dtype,
+                                          topsis.distance)
+        elif session_type == 'crisp':
+            topsis = CrispTOPSIS(data['alternatives'], weights or np.ones(n_criteria),
+                                 criteria_types, dtype)
+            if topsis.alternatives.ndim != 2 or topsis.n_criteria != n_criteria:
+                raise ValueError('criteria_types must match number of criteria')
+            if weights:
+                session = topsis.incremental()
+            else:
+                session = DecisionSession(topsis.normalize_matrix(), criteria_types, dtype)
+        else:
+            return jsonify({
+                'success': False,
+                'error': "type must be 'fuzzy' or 'crisp'"
+            }), 400
+
+        session_id = session_store.create(session)
+        share_session(session_id, session)
+        incremental = not isinstance(session, DecisionSession)
+
+        return jsonify({
+            'success': True,
+            'session_id': session_id,
+            'type': session_type,
+            'n_alternatives': session.n_alternatives,
+            'n_criteria': session.n_criteria,
+            'incremental': incremental,
+            'precision': str(np.dtype(dtype)),
+            'distance': getattr(session, 'distance', None),
+            'shared': getattr(session, 'shared', False),
+            'rankings': session.rank() if incremental else None,
+            'ttl_seconds': session_store.ttl
+        })
+
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/sessions/<session_id>/rank', methods=['POST'])
+def rank_session(session_id):
+    """Re-rank a stored decision matrix with new weights"""
+    session = find_session(session_id)
+    if session is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown or expired session'
+        }), 404
+
+    if not isinstance(session, DecisionSession):
+        return jsonify({
+            'success': False,
+            'error': 'Incremental sessions have fixed weights'
+        }), 400
+
+    try:
+        weights = request.json.get('weights')
+        if not weights or not isinstance(weights, list):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid or missing weights'
+            }), 400
+
+        if session.fuzzy:
+            if not all(isinstance(w, dict) for w in weights):
+                return jsonify({
+                    'success': False,
+                    'error': 'Fuzzy sessions need {lower, most_likely, upper} weights'
+                }), 400
+            weights = fuzzy_array(weights)
+
+        return ranking_response(session.closeness(weights), parse_top_k(request.json), request.json)
+
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def edit_incremental_session(session_id, edit):
+    """Apply an add/update/remove edit to an incremental session"""
+    session = find_session(session_id)
+    if session is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown or expired session'
+        }), 404
+
+    if isinstance(session, DecisionSession):
+        return jsonify({
+            'success': False,
+            'error': 'Session was created without weights and cannot be edited'
+        }), 400
+
+    try:
+        values = None
+        if request.method in ('POST', 'PUT'):
+            values = request.json.get('values')
+            if not values or not isinstance(values, list):
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid or missing values'
+                }), 400
+            if isinstance(session, IncrementalFuzzyTOPSIS):
+                if not all(isinstance(v, dict) for v in values):
+                    return jsonify({
+                        'success': False,
+                        'error': 'Fuzzy sessions need {lower, most_likely, upper} values'
+                    }), 400
+                values = fuzzy_array(values)
+
+        if getattr(session, 'shared', False):
+            edited = incremental_sessions.edit(
+                session_id, session, lambda engine: edit(engine, values))
+            if edited is None:
+                # Deleted or expired through another worker
+                session_store.delete(session_id)
+                return jsonify({
+                    'success': False,
+                    'error': 'Unknown or expired session'
+                }), 404
+            if edited[0] is not session:
+                session_store.create(edited[0], session_id)
+            session, result = edited
+        else:
+            result = edit(session, values)
+
+        return jsonify({
+            'success': True,
+            **result,
+            'n_alternatives': session.n_alternatives
+        })
+
+    except KeyError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e.args[0])
+        }), 404
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/sessions/<session_id>/alternatives', methods=['POST'])
+def add_alternative(session_id):
+    """Add one alternative and return the rank changes it caused"""
+    def edit(session, values):
+        alternative_index, changes = session.add(values)
+        return {'alternative_index': alternative_index, 'changes': changes}
+    return edit_incremental_session(session_id, edit)
+
+
+@app.route('/api/sessions/<session_id>/alternatives/<int:alternative_id>', methods=['PUT'])
+def update_alternative(session_id, alternative_id):
+    """Replace one alternative's values and return the rank changes"""
+    return edit_incremental_session(
+        session_id, lambda session, values: {'changes': session.update(alternative_id, values)})
+
+
+@app.route('/api/sessions/<session_id>/alternatives/<int:alternative_id>', methods=['DELETE'])
+def remove_alternative(session_id, alternative_id):
+    """Remove one alternative and return the rank changes"""
+    return edit_incremental_session(
+        session_id, lambda session, values: {'changes': session.remove(alternative_id)})
+
+
+@app.route('/api/sessions/<session_id>', methods=['DELETE'])
+def delete_session(session_id):
+    released = False
+    if shared_matrices is not None:
+        try:
+            released = shared_matrices.release(session_id)
+            released = incremental_sessions.delete(session_id) or released
+        except sqlite3.Error:
+            pass
+    if not session_store.delete(session_id) and not released:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown or expired session'
+        }), 404
+    return jsonify({'success': True})
+
+
+@app.route('/api/sessions/stats', methods=['GET'])
+def session_stats():
+    return jsonify({
+        'success': True,
+        **session_store.stats(),
+        'shared': shared_matrices.stats() if shared_matrices is not None else None,
+        'incremental': incremental_sessions.stats() if incremental_sessions is not None else None
+    })
+
+
+@app.route('/api/streaming-topsis/analyze', methods=['POST'])
+def analyze_streaming():
+    """Rank a .npy matrix under TOPSIS_DATA_DIR block by block"""
+    try:
+        data = request.json
+
+        matrix_path = resolve_data_path(data.get('matrix_path'))
+        output_path = resolve_output_path(data.get('output_path'), matrix_path)
+
+        if not os.path.isfile(matrix_path):
+            return jsonify({
+                'success': False,
+                'error': 'Matrix file not found'
+            }), 404
+
+        weights = data.get('weights')
+        criteria_types = data.get('criteria_types')
+        if not weights or not isinstance(weights, list):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid or missing weights'
+            }), 400
+
+        matrix_type = data.get('type', 'crisp')
+        block_rows = int(data.get('block_rows', 65536))
+        dtype = parse_precision(data)
+        if matrix_type == 'fuzzy':
+            engine = StreamingFuzzyTOPSIS(matrix_path, fuzzy_array(weights), criteria_types,
+                                          block_rows, dtype, data.get('distance', 'vertex'))
+        elif matrix_type == 'crisp':
+            engine = StreamingCrispTOPSIS(matrix_path, weights, criteria_types, block_rows, dtype)
+        else:
+            return jsonify({
+                'success': False,
+                'error': "type must be 'fuzzy' or 'crisp'"
+            }), 400
+
+        top_k = parse_top_k(data)
+        result = engine.run(top_k=100 if top_k is None else top_k, output_path=output_path)
+        if output_path is not None:
+            result['output_path'] = data['output_path']
+
+        return jsonify({
+            'success': True,
+            **result
+        })
+
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def job_params(job_type, data):
+    """Validate a job submission and turn it into arrays for the pool.
+
+    Each job type takes the same fields as its synchronous endpoint, so
+    errors surface as a 400 on submit rather than as a failed job.
+    """
+    if job_type == 'fuzzy-topsis':
+        matrix = data.get('alternatives')
+        matrix = columnar_array(matrix, fuzzy=True) if isinstance(matrix, dict) else None
+        alternatives, weights, criteria_types = validate_topsis_payload(data, matrix)
+        dtype = parse_precision(data)
+        topsis = VectorizedFuzzyTOPSIS(
+            fuzzy_array(alternatives, dtype) if matrix is None else alternatives,
+            fuzzy_array(weights, dtype),
+            criteria_types,
+            dtype,
+            data.get('distance', 'vertex')
+        )
+        return {
+            'alternatives': topsis.alternatives,
+            'weights': topsis.weights,
+            'criteria_types': topsis.criteria_types,
+            'distance': topsis.distance,
+            'top_k': parse_top_k(data)
+        }
+
+    if job_type == 'crisp-topsis':
+        matrix = data.get('alternatives')
+        matrix = columnar_array(matrix, fuzzy=False) if isinstance(matrix, dict) else None
+        alternatives, weights, criteria_types = validate_topsis_payload(data, matrix)
+        topsis = CrispTOPSIS(alternatives, weights, criteria_types, parse_precision(data))
+        if (topsis.alternatives.ndim != 2 or topsis.weights.shape != (topsis.n_criteria,)
+                or len(topsis.criteria_types) != topsis.n_criteria):
+            raise ValueError('Weights and criteria_types must match number of criteria')
+        return {
+            'alternatives': topsis.alternatives,
+            'weights': topsis.weights,
+            'criteria_types': list(topsis.criteria_types),
+            'top_k': parse_top_k(data)
+        }
+
+    if job_type == 'rank-stability':
+        alternatives, weights, criteria_types = validate_topsis_payload(data, None)
+        reject_distance(data, 'rank-stability')
+        engine = MonteCarloTOPSIS(fuzzy_array(alternatives), fuzzy_array(weights), criteria_types)
+        return {
+            'alternatives': engine.alternatives,
+            'weights': engine.weights,
+            'criteria_types': engine.criteria_types,
+            'seed': data.get('seed'),
+            'options': {
+                'tolerance': float(data.get('tolerance', 0.01)),
+                'batch_size': int(data.get('batch_size', 200)),
+                'min_samples': data.get('min_samples'),
+                'max_samples': int(data.get('max_samples', 20000)),
+                'confidence': float(data.get('confidence', 0.95)),
+                'max_rank': data.get('max_rank')
+            }
+        }
+
+    if job_type == 'streaming-topsis':
+        matrix_type = data.get('type', 'crisp')
+        if matrix_type not in ('fuzzy', 'crisp'):
+            raise ValueError("matrix type must be 'fuzzy' or 'crisp'")
+        matrix_path = resolve_data_path(data.get('matrix_path'))
+        if not os.path.isfile(matrix_path):
+            raise ValueError('Matrix file not found')
+        output_path = data.get('output_path')
+        weights = data.get('weights')
+        if not weights or not isinstance(weights, list):
+            raise ValueError('Invalid or missing weights')
+        top_k = parse_top_k(data)
+        return {
+            'type': matrix_type,
+            'matrix_path': matrix_path,
+            'output_path': resolve_output_path(output_path, matrix_path),
+            'output_name': output_path,
+            'weights': fuzzy_array(weights) if matrix_type == 'fuzzy' else weights,
+            'criteria_types': data.get('criteria_types'),
+            'block_rows': int(data.get('block_rows', 65536)),
+            'dtype': parse_precision(data),
+            'distance': data.get('distance', 'vertex'),
+            'top_k': 100 if top_k is None else top_k
+        }
+
+    raise ValueError('job_type must be one of fuzzy-topsis, crisp-topsis, rank-stability, streaming-topsis')
+
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Queue an analysis in the job pool and return its id straight away"""
+    try:
+        data = request.json
+        # streaming-topsis already uses "type" for the matrix kind
+        job_type = data.get('job_type')
+        job_id = job_manager.submit(job_type, job_params(job_type, data))
+
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f'/api/jobs/{job_id}',
+            'events_url': f'/api/jobs/{job_id}/events',
+            'result_url': f'/api/jobs/{job_id}/result'
+        }), 202
+
+    except JobQueueFull as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 429
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid input data: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_manager.store.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown or expired job'
+        }), 404
+    return jsonify({'success': True, **job})
+
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    job = job_manager.store.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown or expired job'
+        }), 404
+
+    if job['status'] != 'succeeded':
+        return jsonify({
+            'success': False,
+            'status': job['status'],
+            'error': job['error'] or f"Job is {job['status']}"
+        }), 409
+
+    return jsonify({'success': True, **job_manager.store.result(job_id)})
+
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running job, or discard a finished one"""
+    job = job_manager.store.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown or expired job'
+        }), 404
+
+    if job['status'] in FINISHED:
+        job_manager.store.delete(job_id)
+        return jsonify({'success': True, 'status': job['status'], 'deleted': True})
+
+    job_manager.cancel(job_id)
+    return jsonify({'success': True, **job_manager.store.get(job_id)})
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Server-Sent Events stream of a job's progress until it finishes"""
+    if job_manager.store.get(job_id) is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown or expired job'
+        }), 404
+
+    if not job_event_streams.acquire(blocking=False):
+        return jsonify({
+            'success': False,
+            'error': 'Too many open event streams; poll GET /api/jobs/<job_id> instead'
+        }), 503
+
+    interval = float(os.environ.get('TOPSIS_JOB_EVENT_INTERVAL', 0.5))
+
+    def stream():
+        last_state = None
+        started = last_sent = time.monotonic()
+        idle_heartbeats = 0
+        while True:
+            job = job_manager.store.get(job_id)
+            if job is None:
+                yield 'event: expired\ndata: {}\n\n'
+                return
+
+            state = (job['status'], job['progress'], job['message'])
+            if state != last_state:
+                event = job['status'] if job['status'] in FINISHED else 'progress'
+                yield f'event: {event}\ndata: {json.dumps(job)}\n\n'
+                last_state, last_sent = state, time.monotonic()
+                idle_heartbeats = 0
+            elif time.monotonic() - last_sent > JOB_EVENT_HEARTBEAT_SECONDS:
+                if idle_heartbeats >= JOB_EVENT_IDLE_HEARTBEATS:
+                    yield f'event: timeout\ndata: {json.dumps(job)}\n\n'
+                    return
+                # Comment line keeps proxies from closing an idle stream
+                yield ': keep-alive\n\n'
+                last_sent = time.monotonic()
+                idle_heartbeats += 1
+
+            if job['status'] in FINISHED:
+                return
+            if time.monotonic() - started > JOB_EVENT_MAX_SECONDS:
+                yield f'event: timeout\ndata: {json.dumps(job)}\n\n'
+                return
+            time.sleep(interval)
+
+    response = Response(stream(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Runs when the server closes the response, even if the client left early
+    response.call_on_close(job_event_streams.release)
+    return response
+
+
+@app.route('/api/jobs/stats', methods=['GET'])
+def jobs_stats():
+    return jsonify({'success': True, **job_manager.store.stats()})
+
+
+def parse_batch_problem(problem):
+    if not isinstance(problem, dict):
+        raise ValueError('Each problem must be an object')
+    return BatchProblem(
+        problem.get('type'),
+        problem.get('alternatives'),
+        problem.get('weights'),
+        problem.get('criteria_types'),
+        parse_top_k(problem),
+        parse_precision(problem),
+        problem.get('distance', 'vertex')
+    )
+
+
+@app.route('/api/batch', methods=['POST'])
+def analyze_batch():
+    """Rank many independent fuzzy and crisp problems in one request"""
+    try:
+        data = request.json
+
+        problems = data.get('problems')
+        if not problems or not isinstance(problems, list):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid or missing problems'
+            }), 400
+
+        if len(problems) > BATCH_MAX_PROBLEMS:
+            return jsonify({
+                'success': False,
+                'error': f'At most {BATCH_MAX_PROBLEMS} problems per batch'
+            }), 400
+
+        # Invalid problems are reported in place instead of failing the batch
+        items = []
+        for problem in problems:
+            try:
+                items.append(parse_batch_problem(problem))
+            except (KeyError, TypeError, ValueError) as e:
+                items.append(e)
+
+        results, info = run_batch(items, batch_pool, parallel_cells=BATCH_PARALLEL_CELLS)
+        for problem, result in zip(problems, results):
+            if isinstance(problem, dict) and 'id' in problem:
+                result['id'] = problem['id']
+
+        return jsonify({
+            'success': True,
+            'results': results,
+            **info
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 if __name__ == '__main__':
-    import os
     port = int(os.environ.get('PORT', 5001))
     app.run(host='0.0.0.0', port=port, debug=False)
@@ -0,0 +1,144 @@
+import numpy as np
+
+from fuzzy_kernels import distance_kernel
+from request_formats import columnar_array
+from vectorized_topsis import (
+    closeness_summary,
+    crisp_closeness_batch,
+    fuzzy_array,
+    fuzzy_closeness_batch,
+    rankings_from_closeness
+)
+
+
+class BatchProblem:
+    """One validated item of a /api/batch request.
+
+    type: 'fuzzy' or 'crisp'
+    alternatives: list-of-rows JSON as on the analyze endpoints, or the
+        columnar object accepted by request_formats.columnar_array
+    weights, criteria_types: as on the analyze endpoints
+    dtype: float64 (default) or float32
+    distance: cell distance kernel for fuzzy problems (fuzzy_kernels)
+    """
+
+    def __init__(self, problem_type, alternatives, weights, criteria_types, top_k=None,
+                 dtype=float, distance='vertex'):
+        if problem_type not in ('fuzzy', 'crisp'):
+            raise ValueError("type must be 'fuzzy' or 'crisp'")
+        if not alternatives or not isinstance(alternatives, (list, dict)):
+            raise ValueError('Invalid or missing alternatives')
+        if not weights or not isinstance(weights, list):
+            raise ValueError('Invalid or missing weights')
+        if not criteria_types or not isinstance(criteria_types, list):
+            raise ValueError('Invalid or missing criteria_types')
+
+        fuzzy = problem_type == 'fuzzy'
+        if isinstance(alternatives, dict):
+            values = columnar_array(alternatives, fuzzy).astype(dtype, copy=False)
+        elif fuzzy:
+            values = fuzzy_array(alternatives, dtype)
+        else:
+            values = np.asarray(alternatives, dtype=dtype)
+
+        self.type = problem_type
+        self.values = values
+        self.weights = fuzzy_array(weights, dtype) if fuzzy else np.asarray(weights, dtype=dtype)
+        self.criteria_types = np.asarray(criteria_types, dtype=bool)
+        self.top_k = top_k
+        self.distance = distance if fuzzy else None
+        if fuzzy:
+            distance_kernel(distance)
+
+        cell_shape = (3,) if fuzzy else ()
+        if values.ndim != 2 + len(cell_shape) or values.shape[2:] != cell_shape:
+            raise ValueError('alternatives must have shape ' + ('(n, m, 3)' if fuzzy else '(n, m)'))
+        n_criteria = values.shape[1]
+        if (self.weights.shape != (n_criteria,) + cell_shape
+                or self.criteria_types.shape != (n_criteria,)):
+            raise ValueError('Weights and criteria_types must match number of criteria')
+
+    @property
+    def group_key(self):
+        """Problems with the same type, distance, shape and precision are stacked into one tensor"""
+        return (self.type, self.distance, self.values.dtype.name) + self.values.shape
+
+
+def closeness_group(problem_type, values, weights, criteria_types, distance=None):
+    """Closeness of K stacked same-shape problems, shape (K, n).
+
+    Module-level so it can run in a pool process.
+    """
+    if problem_type == 'fuzzy':
+        return fuzzy_closeness_batch(values, weights, criteria_types, values.dtype, distance)
+    return crisp_closeness_batch(values, weights, criteria_types, values.dtype)
+
+
+def problem_result(cc, top_k):
+    result = {'success': True, 'rankings': rankings_from_closeness(cc, top_k)}
+    if top_k is not None:
+        result['summary'] = closeness_summary(cc)
+    return result
+
+
+def run_batch(items, pool=None, parallel_cells=2_000_000, chunk_bytes=64 * 1024 * 1024):
+    """Score a list of BatchProblem items, or exceptions for invalid ones.
+
+    Valid problems are grouped by (type, distance, precision, n, m). Each group is
+    stacked into one tensor and scored in a single vectorized pass, in
+    chunks of at most chunk_bytes of input. When there is more than one chunk and the
+    batch holds at least parallel_cells input values, the chunks run
+    across `pool` (a jobs.ProcessPool) instead of in this thread.
+
+    Returns (results, info): one result per item in input order, each
+    either a ranking payload or {'success': False, 'error': ...}.
+    """
+    results = [None] * len(items)
+    groups = {}
+    for index, item in enumerate(items):
+        if isinstance(item, Exception):
+            results[index] = {'success': False, 'error': f'Invalid input data: {item}'}
+        else:
+            groups.setdefault(item.group_key, []).append(index)
+
+    tasks = []
+    for indices in groups.values():
+        first = items[indices[0]]
+        chunk = max(1, chunk_bytes // max(first.values.nbytes, 1))
+        for start in range(0, len(indices), chunk):
+            part = indices[start:start + chunk]
+            tasks.append((part, (
+                first.type,
+                np.stack([items[i].values for i in part]),
+                np.stack([items[i].weights for i in part]),
+                np.stack([items[i].criteria_types for i in part]),
+                first.distance
+            )))
+
+    cells = sum(args[1].size for _, args in tasks)
+    parallel = pool is not None and len(tasks) > 1 and cells >= parallel_cells
+    if parallel:
+        futures = [pool.submit(closeness_group, *args) for _, args in tasks]
+        outcomes = []
+        for future in futures:
+            try:
+                outcomes.append(future.result())
+            except Exception as e:
+                outcomes.append(e)
+    else:
+        outcomes = []
+        for _, args in tasks:
+            try:
+                outcomes.append(closeness_group(*args))
+            except Exception as e:
+                outcomes.append(e)
+
+    # A failing chunk only fails its own problems
+    for (part, _), outcome in zip(tasks, outcomes):
+        for row, index in enumerate(part):
+            if isinstance(outcome, Exception):
+                results[index] = {'success': False, 'error': f'Calculation error: {outcome}'}
+            else:
+                results[index] = problem_result(outcome[row], items[index].top_k)
+
+    return results, {'groups': len(groups), 'chunks': len(tasks), 'parallel': parallel}
@@ -0,0 +1,70 @@
+"""
+Microbenchmark every registered fuzzy distance kernel and defuzzifier.
+
+Usage:
+    python benchmarks/fuzzy_kernels.py [n ...]
+
+For an (n, 8, 3) weighted TFN tensor of each size n, every kernel in
+fuzzy_kernels.DISTANCE_KERNELS is timed against an ideal solution of
+shape (8, 3), reporting best-of-5 time and nanoseconds per cell, followed
+by a full VectorizedFuzzyTOPSIS closeness run with that kernel. Every
+defuzzifier in DEFUZZIFIERS is timed on the same tensor. Kernels added
+to the registry are picked up automatically.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fuzzy_kernels import DEFUZZIFIERS, DISTANCE_KERNELS  # noqa: E402
+from vectorized_topsis import VectorizedFuzzyTOPSIS  # noqa: E402
+
+N_CRITERIA = 8
+
+
+def best_time(fn, repeats=5):
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def fuzzy_problem(n, rng):
+    crisp = rng.uniform(1, 100, (n, N_CRITERIA))
+    spread = rng.uniform(0, 10, (n, N_CRITERIA, 1))
+    values = crisp[:, :, None] + spread * np.array([-1.0, 0.0, 1.0])
+    values[:, :, 0] = np.maximum(values[:, :, 0], 0.1)
+    w = rng.dirichlet(np.ones(N_CRITERIA))
+    weights = np.stack([w * 0.8, w, w * 1.2], axis=1)
+    return values, weights, rng.random(N_CRITERIA) < 0.6
+
+
+def main(sizes):
+    rng = np.random.default_rng(0)
+    for n in sizes:
+        values, weights, criteria_types = fuzzy_problem(n, rng)
+        cells = n * N_CRITERIA
+        ideal = values.max(axis=0)
+        print(f'n={n}, m={N_CRITERIA}')
+        print(f"  {'kernel':<20}{'ms':>9}{'ns/cell':>9}{'closeness ms':>14}")
+        for name, kernel in DISTANCE_KERNELS.items():
+            seconds, _ = best_time(lambda: kernel(values, ideal))
+            topsis = VectorizedFuzzyTOPSIS(values, weights, criteria_types, distance=name)
+            total, _ = best_time(topsis.closeness, repeats=3)
+            print(f'  {name:<20}{seconds * 1000:>9.2f}{seconds / cells * 1e9:>9.2f}'
+                  f'{total * 1000:>14.1f}')
+        print(f"  {'defuzzifier':<20}{'ms':>9}{'ns/cell':>9}")
+        for name, defuzzify in DEFUZZIFIERS.items():
+            seconds, _ = best_time(lambda: defuzzify(values))
+            print(f'  {name:<20}{seconds * 1000:>9.2f}{seconds / cells * 1e9:>9.2f}')
+        print()
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 100000, 1000000])
@@ -0,0 +1,85 @@
+"""
+Check float32 TOPSIS against float64 and measure what it saves.
+
+Usage:
+    python benchmarks/precision_tolerance.py [n ...]
+
+For crisp and fuzzy matrices of each size n, both precisions are run on
+the same inputs. The script prints the largest closeness difference, how
+many rank positions agree, input bytes and best-of-3 time. It exits with
+status 1 if any closeness coefficient differs by more than
+CLOSENESS_TOLERANCE.
+
+That bound is the documented contract of "precision": "float32". Since
+every float32 coefficient is within CLOSENESS_TOLERANCE of its float64
+value, two sites can only swap ranks if their float64 closeness differs
+by less than 2 * CLOSENESS_TOLERANCE.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import CrispTOPSIS  # noqa: E402
+from vectorized_topsis import VectorizedFuzzyTOPSIS, ranks_from_closeness  # noqa: E402
+
+CLOSENESS_TOLERANCE = 1e-6
+N_CRITERIA = 8
+
+
+def best_time(fn, repeats=3):
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def problems(n, rng):
+    """Crisp and fuzzy problems with site-like value ranges"""
+    scales = rng.uniform(1, 5000, N_CRITERIA)
+    criteria_types = rng.random(N_CRITERIA) < 0.6
+
+    crisp = rng.uniform(0.1, 1.0, (n, N_CRITERIA)) * scales
+    yield 'crisp', crisp, rng.dirichlet(np.ones(N_CRITERIA)), criteria_types, CrispTOPSIS
+
+    spread = rng.uniform(0, 0.2, (n, N_CRITERIA, 1)) * scales[:, None]
+    fuzzy = crisp[:, :, None] + spread * np.array([-1.0, 0.0, 1.0])
+    fuzzy[:, :, 0] = np.maximum(fuzzy[:, :, 0], 0.01)
+    w = rng.dirichlet(np.ones(N_CRITERIA))
+    weights = np.stack([w * 0.8, w, w * 1.2], axis=1)
+    yield 'fuzzy', fuzzy, weights, criteria_types, VectorizedFuzzyTOPSIS
+
+
+def main(sizes):
+    rng = np.random.default_rng(0)
+    failed = False
+    print(f"{'n':>9}  {'type':<6}{'max |dcc|':>12}{'same rank':>11}{'max shift':>11}"
+          f"{'MB f64':>9}{'MB f32':>9}{'ms f64':>9}{'ms f32':>9}")
+    for n in sizes:
+        for name, values, weights, criteria_types, engine in problems(n, rng):
+            runs = {}
+            for dtype in (np.float64, np.float32):
+                topsis = engine(values.astype(dtype), weights, criteria_types, dtype)
+                seconds, cc = best_time(topsis.closeness)
+                runs[dtype] = (topsis.alternatives.nbytes, seconds, cc)
+
+            cc64, cc32 = runs[np.float64][2], runs[np.float32][2]
+            error = float(np.max(np.abs(cc32.astype(np.float64) - cc64)))
+            shift = np.abs(ranks_from_closeness(cc32) - ranks_from_closeness(cc64))
+            failed |= error > CLOSENESS_TOLERANCE
+            print(f'{n:>9}  {name:<6}{error:>12.2e}{np.mean(shift == 0):>10.1%}{int(shift.max()):>11}'
+                  f'{runs[np.float64][0] / 1e6:>9.1f}{runs[np.float32][0] / 1e6:>9.1f}'
+                  f'{runs[np.float64][1] * 1000:>9.1f}{runs[np.float32][1] * 1000:>9.1f}')
+
+    print(f'\ntolerance {CLOSENESS_TOLERANCE:.0e}: ' + ('FAILED' if failed else 'ok'))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main([int(arg) for arg in sys.argv[1:]] or [1000, 100000, 1000000]))
@@ -0,0 +1,79 @@
+"""
+Benchmark ranking response encodings against the original jsonify path.
+
+Usage:
+    python benchmarks/response_encoding.py [n ...]
+
+For each size n it reports payload bytes and best-of-5 encode time for the
+list-of-dicts jsonify response and each columnar encoding available here.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import response_formats  # noqa: E402
+from app import app  # noqa: E402
+from flask import jsonify  # noqa: E402
+from response_formats import (  # noqa: E402
+    MSGPACK_TYPE,
+    NPY_TYPE,
+    columnar_rankings,
+    dumps_json,
+    encode_columnar
+)
+from vectorized_topsis import rankings_from_closeness, top_k_order  # noqa: E402
+
+
+def best_time(fn, repeats=5):
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def encoders(cc):
+    def records_jsonify():
+        with app.app_context():
+            return jsonify({'success': True, 'rankings': rankings_from_closeness(cc)}).get_data()
+
+    def columnar_payload():
+        return {'success': True, **columnar_rankings(cc, top_k_order(cc))}
+
+    def columnar_stdlib():
+        codec, response_formats.orjson = response_formats.orjson, None
+        try:
+            return dumps_json(columnar_payload())
+        finally:
+            response_formats.orjson = codec
+
+    yield 'jsonify (records)', records_jsonify
+    yield 'json stdlib (columnar)', columnar_stdlib
+    if response_formats.orjson is not None:
+        yield 'orjson (columnar)', lambda: dumps_json(columnar_payload())
+    if response_formats.msgpack is not None:
+        yield 'msgpack (columnar)', lambda: encode_columnar(columnar_payload(), MSGPACK_TYPE)[0]
+    yield 'npy (columnar)', lambda: encode_columnar(columnar_payload(), NPY_TYPE)[0]
+
+
+def main(sizes):
+    rng = np.random.default_rng(0)
+    print(f"{'n':>9}  {'encoding':<24}{'bytes':>12}{'encode ms':>12}{'vs jsonify':>12}")
+    for n in sizes:
+        cc = rng.random(n)
+        baseline = None
+        for name, fn in encoders(cc):
+            seconds, body = best_time(fn)
+            baseline = baseline or seconds
+            print(f'{n:>9}  {name:<24}{len(body):>12,}{seconds * 1000:>12.2f}{baseline / seconds:>11.1f}x')
+        print()
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,267 @@
+"""
+Scaling benchmark of the TOPSIS engines, with regression baselines.
+
+Usage:
+    python benchmarks/scaling.py [--sizes N ...] [--criteria M ...]
+                                 [--engines NAME ...] [--repeats R]
+                                 [--max-cells C] [--save FILE]
+                                 [--compare FILE] [--tolerance T]
+
+For every engine, n in --sizes (default 10 to 1,000,000) and m in
+--criteria (default 4 to 32), a synthetic site matrix is encoded as the
+JSON body the analyze endpoints receive. Three stages are timed
+separately (best of --repeats):
+
+    parse      json.loads and building the engine, as the endpoint does
+    rank       engine.rank()
+    serialize  jsonify of the rankings response
+
+Peak traced memory (tracemalloc) of each stage comes from one extra,
+untimed run. Engines:
+
+    crisp          CrispTOPSIS, /api/crisp-topsis/analyze
+    fuzzy          VectorizedFuzzyTOPSIS, /api/fuzzy-topsis/analyze
+    fuzzy-objects  the object-based FuzzyTOPSIS (capped at 100,000 cells)
+
+Configurations over --max-cells (default 4,000,000) cells are skipped.
+After the table, the scaling exponent of rank time in n is printed per
+engine and m (1.0 means linear).
+
+--save writes the results as a JSON baseline. --compare reads one and
+exits with status 1 if any stage got slower, or used more memory, by more
+than --tolerance (default 0.25, i.e. 25%). Differences under 1 ms or 1 MiB
+are treated as noise. Baselines are only comparable on the same machine.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from flask import jsonify
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import CrispTOPSIS, FuzzyTOPSIS, TriangularFuzzyNumber, app  # noqa: E402
+from vectorized_topsis import VectorizedFuzzyTOPSIS, fuzzy_array  # noqa: E402
+
+STAGES = ('parse', 'rank', 'serialize')
+OBJECT_MAX_CELLS = 100_000
+NOISE_MS = 1.0
+NOISE_MIB = 1.0
+
+
+def best_time(fn, repeats=5):
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_memory(fn):
+    """Peak traced allocation of one call, in MiB"""
+    tracemalloc.start()
+    try:
+        result = fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak / 2 ** 20, result
+
+
+def site_matrix(n, m, rng):
+    """Synthetic (n, m) site values with solar-like criterion ranges"""
+    scales = rng.uniform(1, 1000, m)
+    return rng.uniform(0.1, 1, (n, m)) * scales
+
+
+def tfn(low, mid, high):
+    return {'lower': low, 'most_likely': mid, 'upper': high}
+
+
+def crisp_body(n, m, rng):
+    matrix = site_matrix(n, m, rng).round(4)
+    return json.dumps({
+        'alternatives': matrix.tolist(),
+        'weights': (rng.dirichlet(np.ones(m))).round(4).tolist(),
+        'criteria_types': (rng.random(m) < 0.6).tolist()
+    })
+
+
+def fuzzy_body(n, m, rng):
+    mid = site_matrix(n, m, rng)
+    cells = np.stack([mid * 0.9, mid, mid * 1.1], axis=-1).round(4).tolist()
+    weights = rng.dirichlet(np.ones(m))
+    return json.dumps({
+        'alternatives': [[tfn(*cell) for cell in row] for row in cells],
+        'weights': [tfn(w * 0.8, w, w * 1.2) for w in weights.round(4)],
+        'criteria_types': (rng.random(m) < 0.6).tolist()
+    })
+
+
+def parse_crisp(body):
+    data = json.loads(body)
+    return CrispTOPSIS(data['alternatives'], data['weights'], data['criteria_types'])
+
+
+def parse_fuzzy(body):
+    data = json.loads(body)
+    return VectorizedFuzzyTOPSIS(fuzzy_array(data['alternatives']),
+                                 fuzzy_array(data['weights']), data['criteria_types'])
+
+
+def parse_fuzzy_objects(body):
+    data = json.loads(body)
+    to_tfn = lambda v: TriangularFuzzyNumber(v['lower'], v['most_likely'], v['upper'])
+    return FuzzyTOPSIS([[to_tfn(cell) for cell in row] for row in data['alternatives']],
+                       [to_tfn(w) for w in data['weights']], data['criteria_types'])
+
+
+# Engine name -> (request body builder, parser, cell limit or None)
+ENGINES = {
+    'crisp': (crisp_body, parse_crisp, None),
+    'fuzzy': (fuzzy_body, parse_fuzzy, None),
+    'fuzzy-objects': (fuzzy_body, parse_fuzzy_objects, OBJECT_MAX_CELLS)
+}
+
+
+def serialize(rankings):
+    with app.app_context():
+        return jsonify({'success': True, 'rankings': rankings}).get_data()
+
+
+def run_case(engine, n, m, repeats, rng):
+    build_body, parse, _ = ENGINES[engine]
+    body = build_body(n, m, rng)
+    # Long stages are timed once; repeating them only adds wall time
+    runs = 1 if n * m >= 1_000_000 else repeats
+
+    parse_s, topsis = best_time(lambda: parse(body), runs)
+    rank_s, rankings = best_time(topsis.rank, runs)
+    serialize_s, payload = best_time(lambda: serialize(rankings), runs)
+
+    parse_mib, topsis = peak_memory(lambda: parse(body))
+    rank_mib, rankings = peak_memory(topsis.rank)
+    serialize_mib, _ = peak_memory(lambda: serialize(rankings))
+
+    return {
+        'engine': engine,
+        'n': n,
+        'm': m,
+        'request_bytes': len(body),
+        'response_bytes': len(payload),
+        'parse_ms': parse_s * 1000,
+        'rank_ms': rank_s * 1000,
+        'serialize_ms': serialize_s * 1000,
+        'parse_peak_mib': parse_mib,
+        'rank_peak_mib': rank_mib,
+        'serialize_peak_mib': serialize_mib
+    }
+
+
+def scaling_exponents(results):
+    """Least-squares slope of log(rank time) against log(n) per (engine, m)"""
+    groups = {}
+    for row in results:
+        groups.setdefault((row['engine'], row['m']), []).append(row)
+    exponents = {}
+    for (engine, m), rows in groups.items():
+        # Tiny sizes are dominated by fixed overhead
+        rows = [row for row in rows if row['n'] >= 1000] or rows
+        if len(rows) < 2:
+            continue
+        slope = np.polyfit(np.log([row['n'] for row in rows]),
+                           np.log([max(row['rank_ms'], 1e-6) for row in rows]), 1)[0]
+        exponents[f'{engine}/m={m}'] = float(slope)
+    return exponents
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of results against a baseline, as printable lines"""
+    previous = {(row['engine'], row['n'], row['m']): row for row in baseline['results']}
+    regressions = []
+    for row in results:
+        old = previous.get((row['engine'], row['n'], row['m']))
+        if old is None:
+            continue
+        for stage in STAGES:
+            for suffix, noise in (('_ms', NOISE_MS), ('_peak_mib', NOISE_MIB)):
+                key = stage + suffix
+                now, before = row[key], old[key]
+                if now > before * (1 + tolerance) and now - before > noise:
+                    regressions.append(
+                        f"{row['engine']} n={row['n']} m={row['m']} {key}: "
+                        f'{before:.2f} -> {now:.2f} ({now / before - 1:+.0%})'
+                    )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10, 100, 1000, 10000, 100000, 1000000])
+    parser.add_argument('--criteria', type=int, nargs='+', default=[4, 8, 16, 32])
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--max-cells', type=int, default=4_000_000)
+    parser.add_argument('--save')
+    parser.add_argument('--compare')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    results = []
+    print(f"{'engine':<14}{'n':>9}{'m':>4}{'parse ms':>11}{'rank ms':>11}{'serialize ms':>14}"
+          f"{'parse MiB':>11}{'rank MiB':>10}{'serialize MiB':>15}")
+    for engine in args.engines:
+        limit = ENGINES[engine][2]
+        for m in args.criteria:
+            for n in args.sizes:
+                cells = n * m
+                if cells > args.max_cells or (limit is not None and cells > limit):
+                    continue
+                row = run_case(engine, n, m, args.repeats, rng)
+                results.append(row)
+                print(f"{engine:<14}{n:>9}{m:>4}{row['parse_ms']:>11.2f}{row['rank_ms']:>11.2f}"
+                      f"{row['serialize_ms']:>14.2f}{row['parse_peak_mib']:>11.1f}"
+                      f"{row['rank_peak_mib']:>10.1f}{row['serialize_peak_mib']:>15.1f}")
+
+    exponents = scaling_exponents(results)
+    if exponents:
+        print('\nrank time ~ n^k')
+        for name, slope in exponents.items():
+            print(f'  {name:<24}k = {slope:.2f}')
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'machine': platform.machine(),
+                'repeats': args.repeats,
+                'scaling_exponents': exponents,
+                'results': results
+            }, f, indent=2)
+        print(f'\nBaseline written to {args.save}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:')
+            for line in regressions:
+                print(f'  {line}')
+            return 1
+        print(f'\nNo regressions beyond {args.tolerance:.0%} against {args.compare}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
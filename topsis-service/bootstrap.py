@@ -0,0 +1,98 @@
+import numpy as np
+
+from monte_carlo import RankTally
+from vectorized_topsis import crisp_closeness_batch
+
+
+class BootstrapRankConfidence:
+    """Rank confidence intervals from year-to-year resampling of one criterion.
+
+    Each resample redraws every site's years with replacement from its own
+    yearly aggregates (e.g. annual mean GHI) and replaces the criterion's
+    column with the resampled mean; the other criteria stay fixed. Resamples
+    are ranked with crisp TOPSIS in chunks of shape (chunk, n, m), and only
+    running rank counts and closeness moments are kept between chunks.
+
+    Years are drawn from uniform doubles, one per (resample, site, year), so
+    the random stream, and therefore the result, depends only on the seed
+    and never on the chunk size.
+    """
+
+    def __init__(self, alternatives, weights, criteria_types, yearly, criterion=0, seed=0):
+        """
+        alternatives: array-like of shape (n, m); column `criterion` is replaced
+        weights: array-like of shape (m,)
+        criteria_types: List of booleans (True for benefit, False for cost)
+        yearly: array-like of shape (n, Y), the yearly aggregates of each site
+        criterion: index of the resampled criterion
+        seed: seed of the resampling; the default makes results reproducible
+        """
+        self.alternatives = np.ascontiguousarray(alternatives, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        self.criteria_types = np.asarray(criteria_types, dtype=bool)
+        self.yearly = np.ascontiguousarray(yearly, dtype=float)
+        self.criterion = criterion
+        self.seed = seed
+
+        if self.alternatives.ndim != 2 or self.alternatives.shape[0] == 0:
+            raise ValueError('alternatives must be a non-empty (n, m) matrix')
+        self.n_alternatives, self.n_criteria = self.alternatives.shape
+        if (self.weights.shape != (self.n_criteria,)
+                or self.criteria_types.shape != (self.n_criteria,)):
+            raise ValueError('Weights and criteria_types must match number of criteria')
+        if isinstance(criterion, bool) or not isinstance(criterion, int) \
+                or not 0 <= criterion < self.n_criteria:
+            raise ValueError('criterion must be a valid criterion index')
+        if self.yearly.ndim != 2 or self.yearly.shape[0] != self.n_alternatives:
+            raise ValueError('yearly values must have shape (n, years)')
+        if self.yearly.shape[1] < 2 or not np.all(np.isfinite(self.yearly)):
+            raise ValueError('yearly values need at least two finite years per site')
+
+        self.n_years = self.yearly.shape[1]
+
+    def chunk_size(self, chunk_bytes):
+        """Resamples per chunk so the chunk's tensors stay within chunk_bytes"""
+        n, m, years = self.n_alternatives, self.n_criteria, self.n_years
+        # Uniform draws and year indices (n * years), plus the resampled
+        # matrix and crisp_closeness_batch's temporaries (about 4 * n * m)
+        per_resample = 8 * n * (2 * years + 4 * m)
+        return max(1, int(chunk_bytes // per_resample))
+
+    def resample_closeness(self, rng, size):
+        """Closeness for `size` resamples, shape (size, n)"""
+        draws = rng.random((size, self.n_alternatives, self.n_years))
+        years = (draws * self.n_years).astype(np.intp)
+        means = np.take_along_axis(self.yearly[None], years, axis=2).mean(axis=2)
+
+        matrix = np.repeat(self.alternatives[None], size, axis=0)
+        matrix[:, :, self.criterion] = means
+        return crisp_closeness_batch(matrix, self.weights, self.criteria_types)
+
+    def run(self, resamples=1000, confidence=0.95, max_rank=None, chunk_bytes=64 * 1024 * 1024):
+        """Draw `resamples` bootstrap samples and summarize each site's rank.
+
+        max_rank limits the rank counts to ranks 1..max_rank, with worse
+        ranks pooled, as in MonteCarloTOPSIS.run; both count ranks with
+        monte_carlo.RankTally.
+        """
+        resamples = int(resamples)
+        if resamples < 1:
+            raise ValueError('resamples must be positive')
+        if not 0 < confidence < 1:
+            raise ValueError('confidence must be between 0 and 1')
+
+        chunk = self.chunk_size(chunk_bytes)
+        rng = np.random.default_rng(self.seed)
+
+        tally = RankTally(self.n_alternatives, max_rank)
+        for start in range(0, resamples, chunk):
+            tally.add(self.resample_closeness(rng, min(chunk, resamples - start)))
+
+        return {
+            'resamples': resamples,
+            'seed': self.seed,
+            'confidence': confidence,
+            'max_rank': tally.tracked,
+            'chunk_size': chunk,
+            'sites': tally.sites(confidence, median=True)
+        }
@@ -0,0 +1,124 @@
+import numpy as np
+
+from vectorized_topsis import ranks_from_closeness
+
+
+def dense_ranks(values):
+    """0-based dense ranks: equal values share a rank, order is preserved"""
+    _, inverse = np.unique(values, return_inverse=True)
+    return inverse.reshape(-1)
+
+
+def count_inversions(values):
+    """Pairs i < j with values[i] > values[j], by bottom-up merge sort.
+
+    Each merge level is vectorized over all runs: runs of width w are
+    already sorted, so the left-run elements greater than a right-run
+    element are found with one searchsorted on block-offset keys, and
+    the runs are merged with one stable sort of those keys. O(n log n).
+    """
+    values = dense_ranks(values).astype(np.int64)
+    n = len(values)
+    positions = np.arange(n)
+    inversions = 0
+    width = 1
+    while width < n:
+        block = positions // (2 * width)
+        # Keys are globally sorted within each run, and runs follow block order
+        keys = block * n + values
+        left = (positions // width) % 2 == 0
+        left_keys = keys[left]
+        right_keys = keys[~left]
+        # Left-run elements of the same block that are > each right element
+        block_end = np.searchsorted(left_keys, (block[~left] + 1) * n, side='left')
+        inversions += int(np.sum(block_end - np.searchsorted(left_keys, right_keys, side='right')))
+        values = np.sort(keys, kind='stable') - block * n
+        width *= 2
+    return inversions
+
+
+def _tied_pairs(values):
+    """Number of pairs with equal values"""
+    _, counts = np.unique(values, return_counts=True)
+    return int(np.sum(counts * (counts - 1) // 2))
+
+
+def kendall_tau_b(x, y):
+    """Kendall's tau-b with tie correction, in O(n log n) (Knight's algorithm).
+
+    Sorting by (x, y) makes every discordant pair an inversion of y, which
+    count_inversions finds without comparing all pairs.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    n = len(x)
+    total = n * (n - 1) // 2
+    order = np.lexsort((y, x))
+    x, y = x[order], y[order]
+
+    x_ties = _tied_pairs(x)
+    y_ties = _tied_pairs(y)
+    joint_ties = _tied_pairs(dense_ranks(x) * n + dense_ranks(y))
+    discordant = count_inversions(y)
+
+    denominator = np.sqrt(float(total - x_ties)) * np.sqrt(float(total - y_ties))
+    if denominator == 0:
+        return 0.0
+    return float((total - x_ties - y_ties + joint_ties - 2 * discordant) / denominator)
+
+
+def average_ranks(values):
+    """1-based ranks of values in descending order, ties sharing their mean rank"""
+    _, inverse, counts = np.unique(-np.asarray(values), return_inverse=True, return_counts=True)
+    first = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    return (first + (counts + 1) / 2)[inverse.reshape(-1)]
+
+
+def spearman(x, y):
+    """Spearman's rho: Pearson correlation of the tie-averaged ranks"""
+    rx, ry = average_ranks(x), average_ranks(y)
+    rx, ry = rx - rx.mean(), ry - ry.mean()
+    denominator = np.sqrt(np.sum(rx ** 2) * np.sum(ry ** 2))
+    return float(np.sum(rx * ry) / denominator) if denominator > 0 else 0.0
+
+
+def compare_rankings(fuzzy_scores, crisp_scores, fuzzy_ranks=None, crisp_ranks=None):
+    """Per-site changes and agreement metrics of two rankings of the same sites.
+
+    Scores are closeness coefficients aligned by site. Ranks (1 = best)
+    default to the stable descending order of the scores, as on the
+    analyze endpoints. rank_change is fuzzy_rank - crisp_rank and
+    score_difference is crisp - fuzzy, as in the dashboard's comparison
+    view. Correlations are computed on the scores, so tied scores are
+    handled as ties.
+    """
+    fuzzy_scores = np.asarray(fuzzy_scores, dtype=float)
+    crisp_scores = np.asarray(crisp_scores, dtype=float)
+    if fuzzy_scores.ndim != 1 or fuzzy_scores.shape != crisp_scores.shape:
+        raise ValueError('Both rankings must cover the same sites')
+    if len(fuzzy_scores) == 0:
+        raise ValueError('No sites to compare')
+
+    fuzzy_ranks = ranks_from_closeness(fuzzy_scores) + 1 if fuzzy_ranks is None \
+        else np.asarray(fuzzy_ranks, dtype=np.int64)
+    crisp_ranks = ranks_from_closeness(crisp_scores) + 1 if crisp_ranks is None \
+        else np.asarray(crisp_ranks, dtype=np.int64)
+
+    rank_change = fuzzy_ranks - crisp_ranks
+    score_difference = crisp_scores - fuzzy_scores
+    return {
+        'sites': {
+            'fuzzy_rank': fuzzy_ranks,
+            'crisp_rank': crisp_ranks,
+            'rank_change': rank_change,
+            'fuzzy_score': fuzzy_scores,
+            'crisp_score': crisp_scores,
+            'score_difference': score_difference
+        },
+        'metrics': {
+            'sites_with_rank_changes': int(np.count_nonzero(rank_change)),
+            'max_rank_difference': int(np.abs(rank_change).max()),
+            'average_score_difference': float(np.abs(score_difference).mean()),
+            'rank_correlation': spearman(fuzzy_scores, crisp_scores),
+            'kendall_tau_b': kendall_tau_b(fuzzy_scores, crisp_scores)
+        }
+    }
@@ -24,6 +24,25 @@ pip install -r requirements.txt -t lambda-package/
 REM Copy application files
 echo Copying application files...
 copy app.py lambda-package\
+copy vectorized_topsis.py lambda-package\
+copy monte_carlo.py lambda-package\
+copy sessions.py lambda-package\
+copy incremental.py lambda-package\
+copy streaming_topsis.py lambda-package\
+copy request_formats.py lambda-package\
+copy response_formats.py lambda-package\
+copy result_cache.py lambda-package\
+copy jobs.py lambda-package\
+copy batch.py lambda-package\
+copy shared_matrices.py lambda-package\
+copy sensitivity.py lambda-package\
+copy alpha_cut_topsis.py lambda-package\
+copy fuzzy_kernels.py lambda-package\
+copy promethee.py lambda-package\
+copy ensemble.py lambda-package\
+copy comparison.py lambda-package\
+copy bootstrap.py lambda-package\
+copy sobol.py lambda-package\
 copy lambda_handler.py lambda-package\
 
 REM Create ZIP file (requires PowerShell)
@@ -32,7 +32,7 @@ pip install -r requirements.txt -t lambda-package/
 
 # Copy application files
 echo "Copying application files..."
-cp app.py lambda-package/
+cp app.py vectorized_topsis.py monte_carlo.py sessions.py incremental.py streaming_topsis.py request_formats.py response_formats.py result_cache.py jobs.py batch.py shared_matrices.py sensitivity.py alpha_cut_topsis.py fuzzy_kernels.py promethee.py ensemble.py comparison.py bootstrap.py sobol.py lambda-package/
 cp lambda_handler.py lambda-package/
 
 # Create ZIP file
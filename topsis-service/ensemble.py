@@ -0,0 +1,186 @@
+import numpy as np
+
+from vectorized_topsis import ranks_from_closeness, top_k_order
+
+CONSENSUS_METHODS = ('borda', 'copeland')
+
+
+class SharedDecisionMatrix:
+    """Normalized and weighted tensors every ensemble method is computed from.
+
+    The matrix is vector-normalized once, as in CrispTOPSIS. VIKOR, WASPAS
+    and EDAS only use per-column ratios or ranges, which vector
+    normalization leaves unchanged, so they run on the same normalized
+    matrix as TOPSIS.
+    """
+
+    def __init__(self, alternatives, weights, criteria_types, dtype=float):
+        self.alternatives = np.asarray(alternatives, dtype=dtype)
+        self.weights = np.asarray(weights, dtype=dtype)
+        self.benefit = np.asarray(criteria_types, dtype=bool)
+
+        if self.alternatives.ndim != 2 or self.alternatives.shape[0] == 0:
+            raise ValueError('alternatives must be a non-empty (n, m) matrix')
+        self.n_alternatives, self.n_criteria = self.alternatives.shape
+        if (self.weights.shape != (self.n_criteria,)
+                or self.benefit.shape != (self.n_criteria,)):
+            raise ValueError('Weights and criteria_types must match number of criteria')
+
+        norms = np.sqrt(np.sum(self.alternatives ** 2, axis=0, dtype=np.float64))
+        norms[norms == 0] = 1
+        self.normalized = self.alternatives / norms.astype(self.alternatives.dtype)
+        self.weighted = self.normalized * self.weights
+
+        col_max = self.normalized.max(axis=0)
+        col_min = self.normalized.min(axis=0)
+        # Best and worst normalized value per criterion
+        self.best = np.where(self.benefit, col_max, col_min)
+        self.worst = np.where(self.benefit, col_min, col_max)
+
+    def require_non_negative(self, method):
+        if np.any(self.alternatives < 0):
+            raise ValueError(f'{method} requires non-negative criteria values')
+
+
+def _ratio(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator),
+                     where=denominator != 0)
+
+
+def topsis_scores(shared, options):
+    """Closeness coefficient; higher is better"""
+    pis, nis = shared.best * shared.weights, shared.worst * shared.weights
+    d_plus = np.sqrt(np.sum((shared.weighted - pis) ** 2, axis=1))
+    d_minus = np.sqrt(np.sum((shared.weighted - nis) ** 2, axis=1))
+    denominator = d_plus + d_minus
+    denominator[denominator == 0] = 1
+    return d_minus / denominator
+
+
+def vikor_scores(shared, options):
+    """Compromise index Q; lower is better.
+
+    Q = v * (S - S*) / (S- - S*) + (1 - v) * (R - R*) / (R- - R*), where S
+    is the weighted sum and R the largest weighted regret of a site, and v
+    is the weight of the group-utility strategy (default 0.5).
+    """
+    v = float(options.get('vikor_v', 0.5))
+    if not 0 <= v <= 1:
+        raise ValueError('vikor_v must be between 0 and 1')
+    regret = shared.weights * _ratio(shared.best - shared.normalized, shared.best - shared.worst)
+    group_utility = regret.sum(axis=1)
+    individual_regret = regret.max(axis=1)
+    return (v * _ratio(group_utility - group_utility.min(), np.ptp(group_utility))
+            + (1 - v) * _ratio(individual_regret - individual_regret.min(), np.ptp(individual_regret)))
+
+
+def waspas_scores(shared, options):
+    """Joint generalized criterion Q = lambda * WSM + (1 - lambda) * WPM; higher is better"""
+    shared.require_non_negative('WASPAS')
+    lam = float(options.get('waspas_lambda', 0.5))
+    if not 0 <= lam <= 1:
+        raise ValueError('waspas_lambda must be between 0 and 1')
+    # Linear max normalization: x / max for benefit, min / x for cost
+    values = shared.normalized
+    linear = np.where(
+        shared.benefit,
+        _ratio(values, shared.best),
+        np.divide(shared.best, values, out=np.ones_like(values), where=values > 0)
+    )
+    weighted_sum = linear @ shared.weights
+    weighted_product = np.prod(linear ** shared.weights, axis=1)
+    return lam * weighted_sum + (1 - lam) * weighted_product
+
+
+def edas_scores(shared, options):
+    """Appraisal score from distances to the average solution; higher is better"""
+    shared.require_non_negative('EDAS')
+    average = shared.normalized.mean(axis=0)
+    above = _ratio(np.maximum(shared.normalized - average, 0), average)
+    below = _ratio(np.maximum(average - shared.normalized, 0), average)
+    positive = np.where(shared.benefit, above, below) @ shared.weights
+    negative = np.where(shared.benefit, below, above) @ shared.weights
+    normalized_positive = _ratio(positive, positive.max())
+    normalized_negative = 1 - _ratio(negative, negative.max())
+    return (normalized_positive + normalized_negative) / 2
+
+
+# Method name -> (kernel(shared, options) returning scores of shape (n,),
+# whether higher scores rank first)
+METHODS = {
+    'topsis': (topsis_scores, True),
+    'vikor': (vikor_scores, False),
+    'waspas': (waspas_scores, True),
+    'edas': (edas_scores, True)
+}
+
+
+def method_order_key(scores, descending):
+    """Values whose descending stable sort is the method's ranking"""
+    return scores if descending else -scores
+
+
+def borda_scores(ranks):
+    """Borda count from zero-based rank positions of shape (M, n)"""
+    n = ranks.shape[1]
+    return (n - 1 - ranks).sum(axis=0)
+
+
+def copeland_scores(ranks, block_cells=4_000_000):
+    """Copeland score (pairwise majority wins - losses) from ranks of shape (M, n).
+
+    Site a beats b when more methods rank a above b. Pairs are compared
+    in row blocks of at most block_cells values, so memory stays bounded.
+    """
+    n_methods, n = ranks.shape
+    scores = np.zeros(n, dtype=np.int64)
+    rows = max(1, block_cells // max(n_methods * n, 1))
+    for start in range(0, n, rows):
+        block = ranks[:, start:start + rows]
+        # votes[a, b] > 0 when a is ahead of b in more methods
+        votes = np.sign(ranks[:, None, :] - block[:, :, None]).sum(axis=0)
+        scores[start:start + rows] = np.sign(votes).sum(axis=1)
+    return scores
+
+
+def run_ensemble(shared, methods, consensus='borda', options=None):
+    """Scores and rank positions of each method plus the consensus scores.
+
+    Returns (scores, ranks, consensus_scores): scores maps method name to
+    an (n,) array, ranks is (M, n) zero-based positions in `methods`
+    order, and consensus_scores ranks descending. A method listed more
+    than once is run once, so it gets a single vote in the consensus.
+    """
+    options = options or {}
+    unknown = [name for name in methods if name not in METHODS]
+    if not methods or unknown:
+        raise ValueError(f"methods must be a non-empty list of {', '.join(METHODS)}")
+    if consensus not in CONSENSUS_METHODS:
+        raise ValueError(f"consensus must be one of {', '.join(CONSENSUS_METHODS)}")
+    methods = list(dict.fromkeys(methods))
+
+    scores = {}
+    keys = []
+    for name in methods:
+        kernel, descending = METHODS[name]
+        scores[name] = kernel(shared, options)
+        keys.append(method_order_key(scores[name], descending))
+    ranks = ranks_from_closeness(np.stack(keys))
+
+    consensus_scores = borda_scores(ranks) if consensus == 'borda' else copeland_scores(ranks)
+    return scores, ranks, consensus_scores
+
+
+def ensemble_rankings(scores, consensus_scores, top_k=None):
+    """Ranking payloads for each method and the consensus"""
+    def rows(values, descending):
+        order = top_k_order(method_order_key(values, descending), top_k)
+        return [
+            {'alternative_index': int(i), 'score': float(values[i]), 'rank': rank}
+            for rank, i in enumerate(order, 1)
+        ]
+
+    return (
+        {name: rows(values, METHODS[name][1]) for name, values in scores.items()},
+        rows(consensus_scores, True)
+    )
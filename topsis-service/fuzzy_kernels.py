@@ -0,0 +1,82 @@
+import numpy as np
+
+# Cell distance kernels: f(x, y) over TFN arrays of shape (..., 3) that
+# broadcast against each other, returning distances of shape (...).
+DISTANCE_KERNELS = {}
+
+# Defuzzifiers: f(x) over TFN arrays of shape (..., 3), returning crisp
+# values of shape (...).
+DEFUZZIFIERS = {}
+
+
+def register_distance(name):
+    """Decorator adding a whole-array distance kernel to DISTANCE_KERNELS"""
+    def register(kernel):
+        DISTANCE_KERNELS[name] = kernel
+        return kernel
+    return register
+
+
+def register_defuzzifier(name):
+    """Decorator adding a defuzzifier to DEFUZZIFIERS.
+
+    Every defuzzifier also registers the distance |D(x) - D(y)| under the
+    same name, so it can be selected as a distance kernel.
+    """
+    def register(defuzzify):
+        DEFUZZIFIERS[name] = defuzzify
+        DISTANCE_KERNELS[name] = lambda x, y: np.abs(defuzzify(x) - defuzzify(y))
+        return defuzzify
+    return register
+
+
+def distance_kernel(name):
+    if name not in DISTANCE_KERNELS:
+        raise ValueError(f"distance must be one of {', '.join(DISTANCE_KERNELS)}")
+    return DISTANCE_KERNELS[name]
+
+
+def defuzzifier(name):
+    if name not in DEFUZZIFIERS:
+        raise ValueError(f"defuzzification must be one of {', '.join(DEFUZZIFIERS)}")
+    return DEFUZZIFIERS[name]
+
+
+def crisp_values(values, method='most_likely'):
+    """Crisp (...) array from TFNs (..., 3): the most likely value or a defuzzifier"""
+    if method == 'most_likely':
+        return values[..., 1]
+    if method not in DEFUZZIFIERS:
+        raise ValueError(f"defuzzification must be one of most_likely, {', '.join(DEFUZZIFIERS)}")
+    return DEFUZZIFIERS[method](values)
+
+
+@register_distance('vertex')
+def vertex_distance(x, y):
+    """sqrt(((a1-a2)^2 + (b1-b2)^2 + (c1-c2)^2) / 3), as in FuzzyTOPSIS.fuzzy_distance"""
+    return np.sqrt((1 / 3) * np.sum((x - y) ** 2, axis=-1))
+
+
+@register_distance('hamming')
+def hamming_distance(x, y):
+    """(|a1-a2| + |b1-b2| + |c1-c2|) / 3"""
+    return (1 / 3) * np.sum(np.abs(x - y), axis=-1)
+
+
+@register_defuzzifier('graded-mean')
+def graded_mean(x):
+    """Graded mean integration representation (a + 4b + c) / 6"""
+    return (x[..., 0] + 4 * x[..., 1] + x[..., 2]) / 6
+
+
+@register_defuzzifier('centroid')
+def centroid(x):
+    """Centroid (a + b + c) / 3 of the membership triangle"""
+    return (x[..., 0] + x[..., 1] + x[..., 2]) / 3
+
+
+# The Euclidean distance between the centroid points (x0, y0) of two
+# triangles reduces to |x0 - x0'|, since every normal triangle has
+# y0 = 1/3. It is the 'centroid' kernel, kept under the name the
+# literature uses for the metric.
+DISTANCE_KERNELS['euclidean-centroid'] = DISTANCE_KERNELS['centroid']
@@ -0,0 +1,529 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from fuzzy_kernels import distance_kernel
+from vectorized_topsis import normalize_fuzzy_columns
+
+# second_row markers: no second value exists / second value must be rescanned
+NO_ROW = -1
+STALE = -2
+
+
+class ColumnExtremes:
+    """Best and second-best value per column, maintained under row edits.
+
+    Tracks maxima; feed negated keys to track minima. When the row holding
+    a column's best value is deleted, the second-best is promoted in O(1)
+    and itself marked stale. A column is rescanned in O(n) only when a
+    deletion hits a best value whose runner-up is already stale.
+    """
+
+    def __init__(self, keys):
+        """keys: array of shape (n, k) with one tracked column per key"""
+        self.best = np.full(keys.shape[1], -np.inf)
+        self.best_row = np.full(keys.shape[1], NO_ROW)
+        self.second = np.full(keys.shape[1], -np.inf)
+        self.second_row = np.full(keys.shape[1], NO_ROW)
+        self.rescan(np.ones(keys.shape[1], dtype=bool), keys)
+
+    def rescan(self, cols, keys, exclude=None):
+        """Recompute best and second-best from scratch for the masked columns"""
+        cols = np.flatnonzero(cols)
+        if cols.size == 0:
+            return
+
+        values = keys[:, cols].astype(float, copy=True)
+        if exclude is not None:
+            values[exclude] = -np.inf
+
+        n = values.shape[0]
+        best_row = np.full(cols.size, NO_ROW)
+        best = np.full(cols.size, -np.inf)
+        second_row = np.full(cols.size, NO_ROW)
+        second = np.full(cols.size, -np.inf)
+
+        live = n - (0 if exclude is None else 1)
+        if live >= 1:
+            best_row = values.argmax(axis=0)
+            best = values[best_row, np.arange(cols.size)]
+        if live >= 2:
+            values[best_row, np.arange(cols.size)] = -np.inf
+            second_row = values.argmax(axis=0)
+            second = values[second_row, np.arange(cols.size)]
+
+        # Columns with no live finite key carry no row pointer
+        self.best[cols] = best
+        self.best_row[cols] = np.where(np.isfinite(best), best_row, NO_ROW)
+        self.second[cols] = second
+        self.second_row[cols] = np.where(np.isfinite(second), second_row, NO_ROW)
+
+    def insert(self, row, key, cols=None):
+        """Account for a new row's keys (optionally only in the masked columns)"""
+        if cols is None:
+            cols = np.ones(self.best.shape, dtype=bool)
+
+        above = cols & (key > self.best)
+        self.second[above] = self.best[above]
+        self.second_row[above] = self.best_row[above]
+        self.best[above] = key[above]
+        self.best_row[above] = row
+
+        below = cols & ~above & (self.second_row != STALE) & (key > self.second)
+        self.second[below] = key[below]
+        self.second_row[below] = row
+
+    def remove(self, row, keys):
+        """Drop a row's keys; keys is the (n, k) matrix still containing the row"""
+        hit = self.best_row == row
+        promote = hit & (self.second_row >= 0)
+        self.best[promote] = self.second[promote]
+        self.best_row[promote] = self.second_row[promote]
+        self.second_row[promote] = STALE
+
+        self.second_row[~hit & (self.second_row == row)] = STALE
+
+        # Best removed with no known runner-up: full column scan
+        self.rescan(hit & ~promote, keys, exclude=row)
+
+    def move(self, src, dst):
+        """Follow a row that was relocated from src to dst"""
+        self.best_row[self.best_row == src] = dst
+        self.second_row[self.second_row == src] = dst
+
+
+class _IncrementalTOPSIS(ABC):
+    """Shared row bookkeeping for the incremental engines.
+
+    Alternatives keep a stable id for their lifetime; rows are stored
+    contiguously and a deletion moves the last row into the hole. Each edit
+    returns the list of alternatives whose rank changed. Subclasses keep
+    their per-row arrays and the derived state behind the abstract hooks.
+    """
+
+    def _init_rows(self, n):
+        self.n_alternatives = n
+        self.ids = np.arange(n)
+        self.next_id = n
+        self.positions = {i: i for i in range(n)}
+        self.ranks = np.zeros(n, dtype=np.int64)
+
+    @abstractmethod
+    def _row_arrays(self):
+        """Per-row arrays, all with n rows of capacity"""
+
+    @abstractmethod
+    def _set_row_arrays(self, arrays):
+        """Replace the per-row arrays, in _row_arrays order"""
+
+    def _reserve_row(self):
+        """Make room for one more row, doubling capacity when full"""
+        arrays = self._row_arrays()
+        if self.n_alternatives == len(self.ids):
+            capacity = max(4, 2 * len(self.ids))
+            grown = []
+            for array in arrays + [self.ids, self.ranks]:
+                bigger = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+                bigger[:self.n_alternatives] = array[:self.n_alternatives]
+                grown.append(bigger)
+            self._set_row_arrays(grown[:-2])
+            self.ids, self.ranks = grown[-2:]
+
+        row = self.n_alternatives
+        self.n_alternatives += 1
+        self.ids[row] = self.next_id
+        self.ranks[row] = -1
+        self.positions[self.next_id] = row
+        self.next_id += 1
+        return row
+
+    def _move_last_into(self, row):
+        """Overwrite row with the last row and shrink by one"""
+        last = self.n_alternatives - 1
+        del self.positions[int(self.ids[row])]
+        if row != last:
+            for array in self._row_arrays() + [self.ids, self.ranks]:
+                array[row] = array[last]
+            self.positions[int(self.ids[row])] = row
+        self.n_alternatives -= 1
+        return last
+
+    def row_of(self, alternative_id):
+        if alternative_id not in self.positions:
+            raise KeyError(f'Unknown alternative {alternative_id}')
+        return self.positions[alternative_id]
+
+    @abstractmethod
+    def _check_values(self, values):
+        """Validate one alternative's values and return them as an array"""
+
+    @abstractmethod
+    def _snapshot(self):
+        """Copy of the extremes an edit may move, passed back to _insert/_refresh"""
+
+    @abstractmethod
+    def _insert(self, row, values, before):
+        """Store values in a reserved row and update the derived state"""
+
+    @abstractmethod
+    def _remove(self, row):
+        """Drop a row from the derived state before it is overwritten"""
+
+    @abstractmethod
+    def _moved(self, src, dst):
+        """Follow a row relocated from src to dst"""
+
+    @abstractmethod
+    def _refresh(self, before):
+        """Bring the derived state up to date after a removal"""
+
+    @abstractmethod
+    def closeness(self):
+        """Closeness coefficients of the live rows, shape (n,)"""
+
+    @property
+    def nbytes(self):
+        arrays = self._row_arrays() + [self.ids, self.ranks]
+        return sum(array.nbytes for array in arrays)
+
+    def _order(self, cc):
+        # Ties go to the lower id, matching a full rebuild over the id-ordered list
+        return np.lexsort((self.ids[:self.n_alternatives], -cc))
+
+    def _rank_diff(self, removed=None):
+        """Re-rank and report alternatives whose rank moved"""
+        n = self.n_alternatives
+        cc = self.closeness()
+        new_ranks = np.empty(n, dtype=np.int64)
+        new_ranks[self._order(cc)] = np.arange(1, n + 1)
+
+        moved = np.flatnonzero(new_ranks != self.ranks[:n])
+        changes = [
+            {
+                'alternative_index': int(self.ids[i]),
+                'previous_rank': int(self.ranks[i]) if self.ranks[i] > 0 else None,
+                'rank': int(new_ranks[i]),
+                'closeness_coefficient': float(cc[i])
+            }
+            for i in moved
+        ]
+        if removed is not None:
+            changes.append({
+                'alternative_index': removed[0],
+                'previous_rank': removed[1],
+                'rank': None,
+                'closeness_coefficient': None
+            })
+
+        self.ranks[:n] = new_ranks
+        changes.sort(key=lambda c: (c['rank'] is None, c['rank']))
+        return changes
+
+    def rank(self):
+        """Full ranking in the same format as the batch engines"""
+        cc = self.closeness()
+        return [
+            {
+                'alternative_index': int(self.ids[i]),
+                'closeness_coefficient': float(cc[i]),
+                'rank': rank
+            }
+            for rank, i in enumerate(self._order(cc), 1)
+        ]
+
+    def add(self, values):
+        """Append an alternative; returns (new id, rank changes)"""
+        values = self._check_values(values)
+        before = self._snapshot()
+        row = self._reserve_row()
+        self._insert(row, values, before)
+        return int(self.ids[row]), self._rank_diff()
+
+    def update(self, alternative_id, values):
+        """Replace an alternative's values; returns rank changes"""
+        values = self._check_values(values)
+        row = self.row_of(alternative_id)
+        before = self._snapshot()
+        self._remove(row)
+        self._insert(row, values, before)
+        return self._rank_diff()
+
+    def remove(self, alternative_id):
+        """Delete an alternative; returns rank changes"""
+        row = self.row_of(alternative_id)
+        if self.n_alternatives == 1:
+            raise ValueError('Cannot remove the last alternative')
+
+        previous_rank = int(self.ranks[row])
+        before = self._snapshot()
+        self._remove(row)
+        last = self._move_last_into(row)
+        self._moved(last, row)
+        self._refresh(before)
+        return self._rank_diff(removed=(alternative_id, previous_rank))
+
+
+class IncrementalCrispTOPSIS(_IncrementalTOPSIS):
+    """Crisp TOPSIS that absorbs single-row edits without a rebuild.
+
+    Keeps column sums of squares, the raw-unit column extremes and the
+    squared deviations of every cell from the ideal solutions. An edit
+    updates the sums in O(m) and rescans deviations only for columns whose
+    extreme moved (O(n) each). Vector normalization shifts every column
+    norm on each edit, so distances are refreshed with one (n, m) matvec;
+    the matrix itself is never re-normalized.
+    """
+
+    def __init__(self, alternatives, weights, criteria_types):
+        self.values = np.array(alternatives, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        benefit = np.asarray(criteria_types, dtype=bool)
+
+        if self.values.ndim != 2:
+            raise ValueError('alternatives must have shape (n, m)')
+        n, self.n_criteria = self.values.shape
+        if self.weights.shape != (self.n_criteria,) or benefit.shape != (self.n_criteria,):
+            raise ValueError('Weights and criteria_types must match number of criteria')
+
+        # With a negative weight the best weighted value comes from the raw minimum
+        self.prefers_max = benefit ^ (self.weights < 0)
+        self._init_rows(n)
+        self.sum_squares = np.sum(self.values ** 2, axis=0)
+        self.col_max = ColumnExtremes(self.values)
+        self.col_min = ColumnExtremes(-self.values)
+        self.dev_plus = np.zeros_like(self.values)
+        self.dev_minus = np.zeros_like(self.values)
+        self._refresh_deviations(np.ones(self.n_criteria, dtype=bool))
+        self._rank_diff()
+
+    def _row_arrays(self):
+        return [self.values, self.dev_plus, self.dev_minus]
+
+    def _set_row_arrays(self, arrays):
+        self.values, self.dev_plus, self.dev_minus = arrays
+
+    def _ideals(self):
+        pis = np.where(self.prefers_max, self.col_max.best, -self.col_min.best)
+        nis = np.where(self.prefers_max, -self.col_min.best, self.col_max.best)
+        return pis, nis
+
+    def _refresh_deviations(self, cols):
+        """Recompute squared deviations of whole columns, O(n) each"""
+        if not cols.any():
+            return
+        n = self.n_alternatives
+        pis, nis = self._ideals()
+        block = self.values[:n, cols]
+        self.dev_plus[:n, cols] = (block - pis[cols]) ** 2
+        self.dev_minus[:n, cols] = (block - nis[cols]) ** 2
+
+    def _check_values(self, values):
+        values = np.asarray(values, dtype=float)
+        if values.shape != (self.n_criteria,):
+            raise ValueError('values must match number of criteria')
+        return values
+
+    def _snapshot(self):
+        return self.col_max.best.copy(), self.col_min.best.copy()
+
+    def _changed(self, before):
+        return (self.col_max.best != before[0]) | (self.col_min.best != before[1])
+
+    def _insert(self, row, values, before):
+        self.values[row] = values
+        self.sum_squares += values ** 2
+        self.col_max.insert(row, values)
+        self.col_min.insert(row, -values)
+
+        changed = self._changed(before)
+        self._refresh_deviations(changed)
+
+        pis, nis = self._ideals()
+        self.dev_plus[row] = (values - pis) ** 2
+        self.dev_minus[row] = (values - nis) ** 2
+
+    def _remove(self, row):
+        n = self.n_alternatives
+        self.sum_squares -= self.values[row] ** 2
+        self.col_max.remove(row, self.values[:n])
+        self.col_min.remove(row, -self.values[:n])
+
+    def _moved(self, src, dst):
+        self.col_max.move(src, dst)
+        self.col_min.move(src, dst)
+
+    def _refresh(self, before):
+        self._refresh_deviations(self._changed(before))
+
+    def closeness(self):
+        n = self.n_alternatives
+        norms = np.sqrt(np.maximum(self.sum_squares, 0))
+        norms[norms == 0] = 1
+        scale = (self.weights / norms) ** 2
+
+        d_plus = np.sqrt(self.dev_plus[:n] @ scale)
+        d_minus = np.sqrt(self.dev_minus[:n] @ scale)
+        denominator = d_plus + d_minus
+        denominator[denominator == 0] = 1
+        return d_minus / denominator
+
+
+class IncrementalFuzzyTOPSIS(_IncrementalTOPSIS):
+    """Fuzzy TOPSIS that absorbs single-row edits without a rebuild.
+
+    Keeps the normalization scale of each column (max upper or min positive
+    lower, with runner-ups), the weighted matrix, per-component extremes of
+    the weighted matrix and per-cell distances. A column is
+    re-normalized only when its scale changes and its distances are
+    recomputed only when its FPIS/FNIS changes, each O(n), after which the
+    row distances are re-summed in O(n * m); otherwise an edit touches just
+    the edited row, O(m).
+    """
+
+    def __init__(self, alternatives, weights, criteria_types, distance='vertex'):
+        self.values = np.array(alternatives, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        self.benefit = np.asarray(criteria_types, dtype=bool)
+        self.distance = distance
+        self.kernel = distance_kernel(distance)
+
+        if self.values.ndim != 3 or self.values.shape[2] != 3:
+            raise ValueError('alternatives must have shape (n, m, 3)')
+        n, self.n_criteria = self.values.shape[:2]
+        if self.weights.shape != (self.n_criteria, 3):
+            raise ValueError('weights must have shape (m, 3)')
+        if self.benefit.shape != (self.n_criteria,):
+            raise ValueError('criteria_types must match number of criteria')
+
+        self._init_rows(n)
+        self.scales = ColumnExtremes(self._scale_keys(self.values))
+        self.weighted = normalize_fuzzy_columns(
+            self.values, self.benefit, self._scale()) * self.weights
+        self.w_max = ColumnExtremes(self._flat(self.weighted))
+        self.w_min = ColumnExtremes(-self._flat(self.weighted))
+
+        self.cell_plus = np.zeros((n, self.n_criteria))
+        self.cell_minus = np.zeros((n, self.n_criteria))
+        self.d_plus = np.zeros(n)
+        self.d_minus = np.zeros(n)
+        self._refresh_columns(np.ones(self.n_criteria, dtype=bool))
+        self._rank_diff()
+
+    def __getstate__(self):
+        # Defuzzifier kernels are lambdas, so the kernel is pickled by name
+        state = self.__dict__.copy()
+        del state['kernel']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.kernel = distance_kernel(self.distance)
+
+    def _row_arrays(self):
+        return [self.values, self.weighted, self.cell_plus, self.cell_minus,
+                self.d_plus, self.d_minus]
+
+    def _set_row_arrays(self, arrays):
+        (self.values, self.weighted, self.cell_plus, self.cell_minus,
+         self.d_plus, self.d_minus) = arrays
+
+    @staticmethod
+    def _flat(weighted):
+        return weighted.reshape(weighted.shape[0], -1)
+
+    def _scale_keys(self, values):
+        """Keys whose column maximum is the normalization scale"""
+        lower = values[:, :, 0]
+        cost_key = np.where(lower > 0, -lower, -np.inf)
+        return np.where(self.benefit, values[:, :, 2], cost_key)
+
+    def _scale(self):
+        return np.where(self.benefit, self.scales.best, -self.scales.best)
+
+    def _ideals(self):
+        col_max = self.w_max.best.reshape(self.n_criteria, 3)
+        col_min = -self.w_min.best.reshape(self.n_criteria, 3)
+        benefit = self.benefit[:, None]
+        return np.where(benefit, col_max, col_min), np.where(benefit, col_min, col_max)
+
+    def _cells(self, weighted, fpis, fnis):
+        return self.kernel(weighted, fpis), self.kernel(weighted, fnis)
+
+    def _refresh_columns(self, cols):
+        """Recompute cell distances of whole columns and the row sums"""
+        if not cols.any():
+            return
+        n = self.n_alternatives
+        fpis, fnis = self._ideals()
+        self.cell_plus[:n, cols], self.cell_minus[:n, cols] = self._cells(
+            self.weighted[:n, cols], fpis[cols], fnis[cols])
+        # Summed from the cells, not patched by differences: patching leaves
+        # rounding residue that turns an all-zero row into closeness 1
+        self.d_plus[:n] = self.cell_plus[:n].sum(axis=1)
+        self.d_minus[:n] = self.cell_minus[:n].sum(axis=1)
+
+    def _check_values(self, values):
+        values = np.asarray(values, dtype=float)
+        if values.shape != (self.n_criteria, 3):
+            raise ValueError('values must have shape (m, 3)')
+        return values
+
+    def _snapshot(self):
+        return self.scales.best.copy(), self.w_max.best.copy(), self.w_min.best.copy()
+
+    def _renormalize(self, before):
+        """Re-normalize columns whose scale moved; returns columns whose ideals moved"""
+        n = self.n_alternatives
+        rescaled = self.scales.best != before[0]
+        if rescaled.any():
+            self.weighted[:n, rescaled] = normalize_fuzzy_columns(
+                self.values[:n, rescaled], self.benefit[rescaled],
+                self._scale()[rescaled]) * self.weights[rescaled]
+            flat_cols = np.repeat(rescaled, 3)
+            self.w_max.rescan(flat_cols, self._flat(self.weighted[:n]))
+            self.w_min.rescan(flat_cols, -self._flat(self.weighted[:n]))
+
+        ideal_moved = (self.w_max.best != before[1]) | (self.w_min.best != before[2])
+        return rescaled | ideal_moved.reshape(self.n_criteria, 3).any(axis=1)
+
+    def _insert(self, row, values, before):
+        self.values[row] = values
+        self.scales.insert(row, self._scale_keys(values[None])[0])
+
+        # Only the new row needs normalizing unless a column scale moved;
+        # rescaled columns are rescanned as a whole by _renormalize
+        rescaled = self.scales.best != before[0]
+        self.weighted[row] = normalize_fuzzy_columns(
+            values[None], self.benefit, self._scale())[0] * self.weights
+        flat_keep = np.repeat(~rescaled, 3)
+        self.w_max.insert(row, self.weighted[row].ravel(), flat_keep)
+        self.w_min.insert(row, -self.weighted[row].ravel(), flat_keep)
+
+        self.cell_plus[row] = 0
+        self.cell_minus[row] = 0
+        self._refresh_columns(self._renormalize(before))
+
+        # The edited row's own distances, whatever the ideals did
+        fpis, fnis = self._ideals()
+        self.cell_plus[row], self.cell_minus[row] = self._cells(self.weighted[row], fpis, fnis)
+        self.d_plus[row] = self.cell_plus[row].sum()
+        self.d_minus[row] = self.cell_minus[row].sum()
+
+    def _remove(self, row):
+        n = self.n_alternatives
+        self.scales.remove(row, self._scale_keys(self.values[:n]))
+        self.w_max.remove(row, self._flat(self.weighted[:n]))
+        self.w_min.remove(row, -self._flat(self.weighted[:n]))
+
+    def _moved(self, src, dst):
+        for tracker in (self.scales, self.w_max, self.w_min):
+            tracker.move(src, dst)
+
+    def _refresh(self, before):
+        self._refresh_columns(self._renormalize(before))
+
+    def closeness(self):
+        n = self.n_alternatives
+        denominator = self.d_plus[:n] + self.d_minus[:n]
+        return np.divide(self.d_minus[:n], denominator,
+                         out=np.zeros_like(denominator), where=denominator > 0)
@@ -0,0 +1,366 @@
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from monte_carlo import MonteCarloTOPSIS
+from shared_matrices import pid_alive
+from streaming_topsis import StreamingCrispTOPSIS, StreamingFuzzyTOPSIS
+from vectorized_topsis import (
+    VectorizedFuzzyTOPSIS,
+    closeness_summary,
+    crisp_closeness_batch,
+    rankings_from_closeness
+)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once its cancellation was requested"""
+
+
+class JobQueueFull(Exception):
+    """Raised when the node already has max_active queued or running jobs"""
+
+
+class JobStore:
+    """Job state in a SQLite file shared by request workers and pool processes.
+
+    Any gunicorn worker can answer a poll, cancel or result request for a
+    job submitted to another one, and pool processes write their progress
+    and results straight into the file. Finished jobs are kept for `ttl`
+    seconds and purged lazily.
+    """
+
+    def __init__(self, path, ttl=3600):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+
+    def _connection(self):
+        # One connection per thread and process, as in result_cache.SQLiteTier
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'id TEXT PRIMARY KEY, type TEXT NOT NULL, status TEXT NOT NULL, '
+                'progress REAL NOT NULL DEFAULT 0, message TEXT, error TEXT, result TEXT, '
+                'cancel_requested INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, '
+                'started_at REAL, finished_at REAL, expires_at REAL, owner_pid INTEGER)'
+            )
+            try:
+                # Job files written before owners were tracked
+                connection.execute('ALTER TABLE jobs ADD COLUMN owner_pid INTEGER')
+            except sqlite3.OperationalError:
+                pass
+            connection.execute('CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at)')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def purge_expired(self):
+        self.reap_orphaned()
+        self._connection().execute('DELETE FROM jobs WHERE expires_at < ?', (time.time(),))
+
+    def reap_orphaned(self):
+        """Fail queued or running jobs whose owner process is gone"""
+        connection = self._connection()
+        rows = connection.execute(
+            'SELECT id, owner_pid FROM jobs WHERE status IN (?, ?)', (QUEUED, RUNNING)
+        ).fetchall()
+        for row in rows:
+            if row['owner_pid'] is None or not pid_alive(row['owner_pid']):
+                self.finish(row['id'], FAILED, error='Job was orphaned by a worker that exited')
+
+    def create(self, job_type):
+        job_id = uuid.uuid4().hex
+        self._connection().execute(
+            'INSERT INTO jobs (id, type, status, created_at, owner_pid) VALUES (?, ?, ?, ?, ?)',
+            (job_id, job_type, QUEUED, time.time(), os.getpid())
+        )
+        return job_id
+
+    def get(self, job_id):
+        """Job status without its result, or None if unknown or expired"""
+        self.purge_expired()
+        row = self._connection().execute(
+            'SELECT id, type, status, progress, message, error, created_at, started_at, '
+            'finished_at, expires_at FROM jobs WHERE id = ?', (job_id,)
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def result(self, job_id):
+        row = self._connection().execute(
+            'SELECT result FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return json.loads(row['result']) if row is not None and row['result'] else None
+
+    def start(self, job_id):
+        """Mark a queued job running; False if it was cancelled meanwhile"""
+        cursor = self._connection().execute(
+            'UPDATE jobs SET status = ?, started_at = ?, owner_pid = ? '
+            'WHERE id = ? AND status = ? AND cancel_requested = 0',
+            (RUNNING, time.time(), os.getpid(), job_id, QUEUED)
+        )
+        return cursor.rowcount == 1
+
+    def set_progress(self, job_id, progress, message=None):
+        """Record progress; returns True if cancellation was requested"""
+        connection = self._connection()
+        connection.execute(
+            'UPDATE jobs SET progress = ?, message = COALESCE(?, message) '
+            'WHERE id = ? AND status = ?',
+            (progress, message, job_id, RUNNING)
+        )
+        row = connection.execute(
+            'SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return row is None or bool(row['cancel_requested'])
+
+    def finish(self, job_id, status, result=None, error=None):
+        """Store the outcome of a job that has not finished yet"""
+        now = time.time()
+        self._connection().execute(
+            'UPDATE jobs SET status = ?, progress = CASE WHEN ? THEN 1 ELSE progress END, '
+            'result = ?, error = ?, finished_at = ?, expires_at = ? '
+            'WHERE id = ? AND status IN (?, ?)',
+            (status, status == SUCCEEDED, None if result is None else json.dumps(result),
+             error, now, now + self.ttl, job_id, QUEUED, RUNNING)
+        )
+
+    def request_cancel(self, job_id):
+        connection = self._connection()
+        connection.execute(
+            'UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status IN (?, ?)',
+            (job_id, QUEUED, RUNNING)
+        )
+        # Queued jobs never reach start(), so finish them here
+        self.finish_if_queued(job_id)
+
+    def finish_if_queued(self, job_id):
+        now = time.time()
+        self._connection().execute(
+            'UPDATE jobs SET status = ?, finished_at = ?, expires_at = ? '
+            'WHERE id = ? AND status = ?',
+            (CANCELLED, now, now + self.ttl, job_id, QUEUED)
+        )
+
+    def delete(self, job_id):
+        cursor = self._connection().execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+        return cursor.rowcount == 1
+
+    def count_active(self):
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)', (QUEUED, RUNNING)
+        ).fetchone()[0]
+
+    def stats(self):
+        self.purge_expired()
+        counts = dict(self._connection().execute(
+            'SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+        return {'jobs': counts, 'path': self.path, 'ttl_seconds': self.ttl}
+
+
+class ProgressReporter:
+    """Progress callback handed to the engines inside a pool process.
+
+    Writes are throttled to one every `interval` seconds; each write also
+    checks for a cancellation request and raises JobCancelled if found.
+    """
+
+    def __init__(self, store, job_id, interval=0.25):
+        self.store = store
+        self.job_id = job_id
+        self.interval = interval
+        self._last = 0.0
+
+    def __call__(self, fraction, message=None):
+        now = time.monotonic()
+        if message is None and now - self._last < self.interval:
+            return
+        self._last = now
+        if self.store.set_progress(self.job_id, min(max(float(fraction), 0.0), 1.0), message):
+            raise JobCancelled()
+
+
+def run_fuzzy_topsis(params, progress):
+    topsis = VectorizedFuzzyTOPSIS(params['alternatives'], params['weights'],
+                                   params['criteria_types'], params['alternatives'].dtype,
+                                   params.get('distance', 'vertex'))
+    progress(0.0, 'normalizing')
+    normalized = topsis.normalize_fuzzy_matrix()
+    progress(0.3, 'weighting')
+    weighted = topsis.calculate_weighted_matrix(normalized)
+    fpis, fnis = topsis.calculate_ideal_solutions(weighted)
+    progress(0.5, 'computing distances')
+    d_plus, d_minus = topsis.calculate_distances(weighted, fpis, fnis)
+    cc = topsis.calculate_closeness_coefficients(d_plus, d_minus)
+    progress(0.9, 'ranking')
+    return analyze_result(cc, params.get('top_k'))
+
+
+def run_crisp_topsis(params, progress):
+    progress(0.0, 'computing closeness')
+    cc = crisp_closeness_batch(params['alternatives'], params['weights'],
+                               params['criteria_types'], params['alternatives'].dtype)
+    progress(0.9, 'ranking')
+    return analyze_result(cc, params.get('top_k'))
+
+
+def run_rank_stability(params, progress):
+    engine = MonteCarloTOPSIS(params['alternatives'], params['weights'],
+                              params['criteria_types'], seed=params.get('seed'))
+    progress(0.0, 'sampling')
+    return engine.run(progress=progress, **params['options'])
+
+
+def run_streaming_topsis(params, progress):
+    if params['type'] == 'fuzzy':
+        engine = StreamingFuzzyTOPSIS(params['matrix_path'], params['weights'],
+                                      params['criteria_types'], params['block_rows'],
+                                      params['dtype'], params['distance'])
+    else:
+        engine = StreamingCrispTOPSIS(params['matrix_path'], params['weights'],
+                                      params['criteria_types'], params['block_rows'],
+                                      params['dtype'])
+    progress(0.0, 'streaming')
+    result = engine.run(top_k=params['top_k'], output_path=params['output_path'],
+                        progress=progress)
+    result['output_path'] = params.get('output_name')
+    return result
+
+
+def analyze_result(cc, top_k):
+    """Same payload as the synchronous analyze endpoints' records format"""
+    result = {'rankings': rankings_from_closeness(cc, top_k)}
+    if top_k is not None:
+        result['summary'] = closeness_summary(cc)
+    return result
+
+
+# Job type -> function(params, progress) returning a JSON-serializable result
+JOB_RUNNERS = {
+    'fuzzy-topsis': run_fuzzy_topsis,
+    'crisp-topsis': run_crisp_topsis,
+    'rank-stability': run_rank_stability,
+    'streaming-topsis': run_streaming_topsis
+}
+
+
+def execute_job(store_path, ttl, job_id, job_type, params):
+    """Pool process entry point: run one job and store its outcome"""
+    store = JobStore(store_path, ttl)
+    if not store.start(job_id):
+        return
+    try:
+        result = JOB_RUNNERS[job_type](params, ProgressReporter(store, job_id))
+    except JobCancelled:
+        store.finish(job_id, CANCELLED)
+    except Exception as e:
+        store.finish(job_id, FAILED, error=str(e))
+    else:
+        store.finish(job_id, SUCCEEDED, result=result)
+
+
+class ProcessPool:
+    """Bounded process pool created on first use in the current process.
+
+    Creating it lazily gives each forked gunicorn worker its own pool. It
+    uses the spawn start method so children do not inherit the worker's
+    threads, and is rebuilt once if a crashed child broke it.
+    """
+
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def executor(self):
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def submit(self, fn, *args):
+        try:
+            return self.executor().submit(fn, *args)
+        except BrokenProcessPool:
+            with self._lock:
+                self._executor = None
+            return self.executor().submit(fn, *args)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class JobManager:
+    """Runs jobs in a ProcessPool owned by this request worker.
+
+    At most max_active jobs may be queued or running across the node;
+    further submissions raise JobQueueFull.
+    """
+
+    def __init__(self, store, max_workers=2, max_active=32):
+        self.store = store
+        self.max_active = max_active
+        self.pool = ProcessPool(max_workers)
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, job_type, params):
+        """Queue a job and return its id"""
+        if job_type not in JOB_RUNNERS:
+            raise ValueError(f"job_type must be one of {', '.join(JOB_RUNNERS)}")
+        self.store.purge_expired()
+        if self.store.count_active() >= self.max_active:
+            raise JobQueueFull(f'Too many active jobs (limit {self.max_active})')
+
+        job_id = self.store.create(job_type)
+        future = self.pool.submit(
+            execute_job, self.store.path, self.store.ttl, job_id, job_type, params)
+
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda f: self._job_done(job_id, f))
+        return job_id
+
+    def _job_done(self, job_id, future):
+        with self._lock:
+            self._futures.pop(job_id, None)
+        if future.cancelled():
+            self.store.finish_if_queued(job_id)
+        elif future.exception() is not None:
+            # The child died or the params could not be pickled
+            self.store.finish(job_id, FAILED, error=str(future.exception()))
+
+    def cancel(self, job_id):
+        """Request cancellation; running jobs stop at their next progress report"""
+        self.store.request_cancel(job_id)
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.cancel()
+
+    def shutdown(self):
+        self.pool.shutdown()
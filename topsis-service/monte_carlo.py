@@ -0,0 +1,184 @@
+import numpy as np
+
+from vectorized_topsis import crisp_closeness_batch, ranks_from_closeness
+
+
+def sample_triangular(tfn, size, rng):
+    """Draw samples from triangular distributions by inverse CDF.
+
+    tfn: array of shape (..., 3) as (lower, most_likely, upper)
+    size: number of samples; the result has shape (size, ...)
+
+    Unlike Generator.triangular this accepts degenerate (crisp) numbers
+    where lower == upper, which the fuzzy site data produces for exact
+    values.
+    """
+    lower, mode, upper = tfn[..., 0], tfn[..., 1], tfn[..., 2]
+    width = upper - lower
+    u = rng.random((size,) + lower.shape)
+
+    # Fraction of the probability mass to the left of the mode
+    split = np.divide(mode - lower, width, out=np.zeros_like(width), where=width > 0)
+
+    left = lower + np.sqrt(u * width * (mode - lower))
+    right = upper - np.sqrt((1 - u) * width * (upper - mode))
+    return np.where(u < split, left, right)
+
+
+class RankTally:
+    """Running rank counts and closeness moments over batches of rankings.
+
+    Ranks 1..max_rank are counted per site, with everything worse pooled
+    into a final bucket, so memory stays O(n * max_rank) however many
+    samples are added.
+    """
+
+    def __init__(self, n_alternatives, max_rank=None):
+        n = n_alternatives
+        self.tracked = n if max_rank is None else max(1, min(int(max_rank), n))
+        self.buckets = self.tracked + 1
+        self.counts = np.zeros((n, self.buckets), dtype=np.int64)
+        self.rank_sum = np.zeros(n)
+        self.cc_sum = np.zeros(n)
+        self.cc_sq_sum = np.zeros(n)
+        self.row_offsets = np.arange(n) * self.buckets
+        self.samples = 0
+
+    def add(self, cc):
+        """Rank a batch of closeness vectors of shape (batch, n) and count it"""
+        n = self.counts.shape[0]
+        ranks = ranks_from_closeness(cc)
+        bucket = np.minimum(ranks, self.tracked) + self.row_offsets
+        self.counts += np.bincount(
+            bucket.ravel(), minlength=n * self.buckets).reshape(n, self.buckets)
+        self.rank_sum += ranks.sum(axis=0)
+        self.cc_sum += cc.sum(axis=0)
+        self.cc_sq_sum += (cc ** 2).sum(axis=0)
+        self.samples += cc.shape[0]
+
+    def probabilities(self):
+        """Rank probabilities of shape (n, max_rank + 1), last column pooled"""
+        return self.counts / self.samples
+
+    def sites(self, confidence, median=False, probabilities=False):
+        """Per-site mean rank, percentile rank interval and closeness moments.
+
+        median adds each site's median rank; probabilities adds its
+        probability of every tracked rank. Ranks in the pooled bucket are
+        reported as None.
+        """
+        probs = self.probabilities()
+        cdf = np.cumsum(probs, axis=1)
+        tail = (1 - confidence) / 2
+        # Small slack so an exact cumulative tail still counts as reached
+        rank_lower = np.argmax(cdf >= tail - 1e-12, axis=1)
+        rank_median = np.argmax(cdf >= 0.5 - 1e-12, axis=1)
+        rank_upper = np.argmax(cdf >= 1 - tail - 1e-12, axis=1)
+
+        cc_mean = self.cc_sum / self.samples
+        cc_std = np.sqrt(np.maximum(self.cc_sq_sum / self.samples - cc_mean ** 2, 0))
+
+        def rank_or_none(bucket):
+            # The pooled column means "worse than max_rank"
+            return int(bucket) + 1 if bucket < self.tracked else None
+
+        sites = []
+        for i in range(self.counts.shape[0]):
+            site = {
+                'alternative_index': i,
+                'mean_rank': float(self.rank_sum[i] / self.samples + 1)
+            }
+            if median:
+                site['median_rank'] = rank_or_none(rank_median[i])
+            site['rank_interval'] = [rank_or_none(rank_lower[i]), rank_or_none(rank_upper[i])]
+            site['mean_closeness'] = float(cc_mean[i])
+            site['closeness_std'] = float(cc_std[i])
+            if probabilities:
+                site['rank_probabilities'] = probs[i, :self.tracked].tolist()
+            sites.append(site)
+        return sites
+
+
+class MonteCarloTOPSIS:
+    """Rank-stability analysis of fuzzy TOPSIS inputs by Monte Carlo sampling.
+
+    Each sample draws every criterion value and weight from its triangular
+    distribution and ranks the realization with crisp TOPSIS. Samples are
+    drawn and ranked in vectorized batches of shape (batch, n, m), and only
+    running rank counts and closeness moments are kept between batches.
+    """
+
+    def __init__(self, alternatives, weights, criteria_types, seed=None):
+        """
+        alternatives: array-like of shape (n, m, 3) as (lower, most_likely, upper)
+        weights: array-like of shape (m, 3)
+        criteria_types: List of booleans (True for benefit, False for cost)
+        seed: optional seed for reproducible sampling
+        """
+        self.alternatives = np.ascontiguousarray(alternatives, dtype=float)
+        self.weights = np.ascontiguousarray(weights, dtype=float)
+        self.criteria_types = np.asarray(criteria_types, dtype=bool)
+
+        if self.alternatives.ndim != 3 or self.alternatives.shape[2] != 3:
+            raise ValueError('alternatives must have shape (n, m, 3)')
+
+        self.n_alternatives, self.n_criteria = self.alternatives.shape[:2]
+
+        if self.weights.shape != (self.n_criteria, 3):
+            raise ValueError('weights must have shape (m, 3)')
+        if self.criteria_types.shape != (self.n_criteria,):
+            raise ValueError('criteria_types must match number of criteria')
+
+        self.rng = np.random.default_rng(seed)
+
+    def sample_closeness(self, batch_size):
+        """Closeness coefficients for one batch of samples, shape (batch, n)"""
+        values = sample_triangular(self.alternatives, batch_size, self.rng)
+        weights = sample_triangular(self.weights, batch_size, self.rng)
+        return crisp_closeness_batch(values, weights, self.criteria_types)
+
+    def run(self, tolerance=0.01, batch_size=200, min_samples=None,
+            max_samples=20000, confidence=0.95, max_rank=None, progress=None):
+        """Sample until the rank probabilities converge.
+
+        Sampling stops once the largest Monte Carlo standard error of any
+        rank probability, sqrt(p * (1 - p) / N), is at most `tolerance`.
+        Stable rankings (p close to 0 or 1) converge after a few batches;
+        contested ones keep sampling up to `max_samples`.
+
+        max_rank limits the rank-probability matrix to ranks 1..max_rank,
+        with everything worse pooled into a final column, so memory stays
+        O(n * max_rank) for large site lists.
+
+        progress, if given, is called after every batch with the fraction of
+        max_samples drawn so far.
+        """
+        if tolerance <= 0:
+            raise ValueError('tolerance must be positive')
+        if not 0 < confidence < 1:
+            raise ValueError('confidence must be between 0 and 1')
+
+        batch_size = max(1, int(batch_size))
+        min_samples = batch_size if min_samples is None else int(min_samples)
+
+        tally = RankTally(self.n_alternatives, max_rank)
+        standard_error = np.inf
+
+        while tally.samples < max_samples:
+            tally.add(self.sample_closeness(min(batch_size, max_samples - tally.samples)))
+
+            p = tally.probabilities()
+            standard_error = float(np.sqrt(np.max(p * (1 - p)) / tally.samples))
+            if tally.samples >= min_samples and standard_error <= tolerance:
+                break
+            if progress is not None:
+                progress(tally.samples / max_samples)
+
+        return {
+            'samples': tally.samples,
+            'converged': bool(standard_error <= tolerance),
+            'max_standard_error': standard_error,
+            'confidence': confidence,
+            'max_rank': tally.tracked,
+            'sites': tally.sites(confidence, probabilities=True)
+        }
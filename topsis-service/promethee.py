@@ -0,0 +1,125 @@
+import numpy as np
+
+PREFERENCE_FUNCTIONS = ('usual', 'linear')
+
+
+def band_flows(engine, starts):
+    """Flow contributions of the row bands beginning at `starts`.
+
+    Module-level so bands can run in a pool process.
+    """
+    plus = np.zeros(engine.n_alternatives)
+    minus = np.zeros(engine.n_alternatives)
+    for start in starts:
+        band_plus, band_minus = engine.band_flows(start)
+        plus += band_plus
+        minus += band_minus
+    return plus, minus
+
+
+class PrometheeII:
+    """PROMETHEE II outranking flows over a crisp (n, m) decision matrix.
+
+    The aggregated preference of site a over b is
+    pi(a, b) = sum_j w_j * P_j(d_j(a, b)), with weights scaled to sum to 1
+    and d_j signed so that larger is better on every criterion. The
+    positive flow of a is its mean preference over the other sites, the
+    negative flow the mean preference of the others over it, and sites are
+    ranked by net flow = positive - negative.
+
+    The n x n preference matrix is never built. Pairs are processed in
+    tile x tile blocks of the upper triangle, and one difference tensor
+    gives both pi(a, b) and pi(b, a), so memory is O(tile^2 * m).
+
+    preference: 'usual' (P = 1 when d > 0) or 'linear' (0 up to the
+    indifference threshold q, rising linearly to 1 at the preference
+    threshold p). q and p are per-criterion arrays in criterion units.
+    """
+
+    def __init__(self, alternatives, weights, criteria_types, preference='usual',
+                 indifference=None, preference_threshold=None, tile=256, dtype=float):
+        self.alternatives = np.ascontiguousarray(alternatives, dtype=dtype)
+        self.weights = np.asarray(weights, dtype=float)
+        self.criteria_types = np.asarray(criteria_types, dtype=bool)
+
+        if self.alternatives.ndim != 2 or self.alternatives.shape[0] == 0:
+            raise ValueError('alternatives must be a non-empty (n, m) matrix')
+        self.n_alternatives, self.n_criteria = self.alternatives.shape
+        if (self.weights.shape != (self.n_criteria,)
+                or self.criteria_types.shape != (self.n_criteria,)):
+            raise ValueError('Weights and criteria_types must match number of criteria')
+        if np.any(self.weights < 0) or self.weights.sum() <= 0:
+            raise ValueError('Weights must be non-negative and not all zero')
+        if preference not in PREFERENCE_FUNCTIONS:
+            raise ValueError(f"preference must be one of {', '.join(PREFERENCE_FUNCTIONS)}")
+
+        self.preference = preference
+        if preference == 'linear':
+            if preference_threshold is None:
+                raise ValueError("preference_threshold is required for 'linear' preference")
+            self.q = np.zeros(self.n_criteria) if indifference is None \
+                else np.asarray(indifference, dtype=float)
+            self.p = np.asarray(preference_threshold, dtype=float)
+            if self.q.shape != (self.n_criteria,) or self.p.shape != (self.n_criteria,):
+                raise ValueError('Thresholds must match number of criteria')
+            if np.any(self.q < 0) or np.any(self.p <= self.q):
+                raise ValueError('Thresholds must satisfy 0 <= indifference < preference_threshold')
+
+        self.tile = max(1, int(tile))
+        # Weights scaled to sum to 1, in the working precision
+        self.scaled_weights = (self.weights / self.weights.sum()).astype(dtype)
+        # Cost criteria are negated so that larger is better everywhere
+        self.oriented = np.where(self.criteria_types, self.alternatives, -self.alternatives)
+
+    def preference_degrees(self, d):
+        """P_j(d) for differences d of shape (..., m)"""
+        if self.preference == 'usual':
+            return (d > 0).astype(d.dtype)
+        return np.clip((d - self.q) / (self.p - self.q), 0, 1).astype(d.dtype)
+
+    def band_flows(self, start):
+        """Unnormalized flow sums from tiles (I, J) with I the band at `start` and J >= I.
+
+        Returns (plus, minus), each of shape (n,), where plus[a] sums
+        pi(a, b) and minus[a] sums pi(b, a) over the pairs in the band.
+        """
+        n, tile = self.n_alternatives, self.tile
+        plus = np.zeros(n)
+        minus = np.zeros(n)
+        rows = slice(start, min(start + tile, n))
+        band = self.oriented[rows]
+        for col_start in range(start, n, tile):
+            cols = slice(col_start, min(col_start + tile, n))
+            d = band[:, None, :] - self.oriented[None, cols, :]        # (tile, tile, m)
+            forward = self.preference_degrees(d) @ self.scaled_weights   # pi(a, b)
+            backward = self.preference_degrees(-d) @ self.scaled_weights  # pi(b, a)
+            if col_start == start:
+                # Diagonal tile: pairs below the diagonal are its transpose
+                upper = np.triu(np.ones(forward.shape, dtype=bool), 1)
+                forward = np.where(upper, forward, 0)
+                backward = np.where(upper, backward, 0)
+            plus[rows] += forward.sum(axis=1)
+            minus[cols] += forward.sum(axis=0)
+            minus[rows] += backward.sum(axis=1)
+            plus[cols] += backward.sum(axis=0)
+        return plus, minus
+
+    def flows(self, pool=None, tasks_per_worker=4):
+        """(positive, negative, net) flows, each of shape (n,).
+
+        With a jobs.ProcessPool the row bands are spread over its workers,
+        interleaved so every task gets a similar share of the triangle.
+        """
+        starts = list(range(0, self.n_alternatives, self.tile))
+        if pool is None or len(starts) < 2:
+            plus, minus = band_flows(self, starts)
+        else:
+            n_tasks = min(len(starts), pool.max_workers * tasks_per_worker)
+            futures = [pool.submit(band_flows, self, starts[i::n_tasks]) for i in range(n_tasks)]
+            parts = [future.result() for future in futures]
+            plus = sum(part[0] for part in parts)
+            minus = sum(part[1] for part in parts)
+
+        others = max(self.n_alternatives - 1, 1)
+        plus, minus = plus / others, minus / others
+        return plus, minus, plus - minus
@@ -0,0 +1,140 @@
+import json
+
+import numpy as np
+
+# Content types accepted by the analyze endpoints besides application/json
+OCTET_STREAM = 'application/octet-stream'
+NPY_TYPES = ('application/x-npy', 'application/npy')
+
+PARAMS_HEADER = 'X-Topsis-Params'
+SHAPE_HEADER = 'X-Matrix-Shape'
+
+
+class UnsupportedFormat(Exception):
+    """Raised for a request body in a content type the service does not read"""
+
+
+def columnar_array(alternatives, fuzzy):
+    """Struct-of-arrays JSON into an (n, m) or (n, m, 3) float array.
+
+    Crisp: {"columns": [[n values], ...m columns]}
+    Fuzzy: {"lower": [...], "most_likely": [...], "upper": [...]}, each
+    holding m columns of n values.
+
+    Each key becomes one homogeneous float list, so parsing allocates no
+    per-cell dicts.
+    """
+    if fuzzy:
+        parts = [np.asarray(alternatives[key], dtype=float)
+                 for key in ('lower', 'most_likely', 'upper')]
+        if any(p.ndim != 2 or p.shape != parts[0].shape for p in parts):
+            raise ValueError('lower, most_likely and upper must be equal-size lists of columns')
+        # (3, m, n) -> (n, m, 3)
+        return np.ascontiguousarray(np.stack(parts).transpose(2, 1, 0))
+
+    columns = np.asarray(alternatives['columns'], dtype=float)
+    if columns.ndim != 2:
+        raise ValueError('columns must be a list of equal-length columns')
+    return np.ascontiguousarray(columns.T)
+
+
+def _parse_shape(value):
+    try:
+        shape = tuple(int(part) for part in value.split(','))
+    except (AttributeError, ValueError):
+        raise ValueError(f'{SHAPE_HEADER} must look like "n,m" or "n,m,3"')
+    if len(shape) not in (2, 3) or any(dim < 1 for dim in shape):
+        raise ValueError(f'{SHAPE_HEADER} must look like "n,m" or "n,m,3"')
+    return shape
+
+
+def raw_float64_array(body, shape):
+    """View a raw little-endian float64 body as an array without copying"""
+    expected = int(np.prod(shape)) * 8
+    if len(body) != expected:
+        raise ValueError(f'Body has {len(body)} bytes, shape {shape} needs {expected}')
+    return np.frombuffer(body, dtype='<f8').reshape(shape)
+
+
+def npy_array(body):
+    """View a .npy body as an array without copying the data section"""
+    view = memoryview(body)
+    header = _BytesReader(view)
+    version = np.lib.format.read_magic(header)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(header)
+    elif version in ((2, 0), (3, 0)):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(header)
+    else:
+        raise ValueError(f'Unsupported .npy version {version}')
+
+    if dtype.hasobject:
+        raise ValueError('.npy body must hold numbers, not Python objects')
+
+    count = int(np.prod(shape))
+    array = np.frombuffer(view, dtype=dtype, count=count, offset=header.position)
+    return array.reshape(shape, order='F' if fortran_order else 'C')
+
+
+class _BytesReader:
+    """Minimal file-like reader over a memoryview for the .npy header parser"""
+
+    def __init__(self, view):
+        self.view = view
+        self.position = 0
+
+    def read(self, size):
+        chunk = self.view[self.position:self.position + size].tobytes()
+        self.position += len(chunk)
+        return chunk
+
+
+def read_analyze_request(request, fuzzy):
+    """Read an analyze request in any supported layout.
+
+    Returns (data, alternatives). data holds the non-matrix fields
+    (weights, criteria_types, top_k, ...). alternatives is a float ndarray,
+    or None when the body uses the original list-of-rows JSON layout and
+    the caller should parse data['alternatives'] itself.
+
+    - application/json with a list: original array-of-rows layout
+    - application/json with an object: struct-of-arrays (columnar_array)
+    - application/octet-stream: raw little-endian float64 cells, shape in
+      the X-Matrix-Shape header
+    - application/x-npy: a .npy file
+
+    For the binary layouts the other fields travel as JSON in the
+    X-Topsis-Params header. Binary bodies are wrapped with np.frombuffer,
+    so the request bytes back the matrix directly.
+    """
+    mimetype = request.mimetype
+
+    if mimetype == 'application/json':
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            raise ValueError('Request body must be a JSON object')
+        alternatives = data.get('alternatives')
+        if isinstance(alternatives, dict):
+            return data, columnar_array(alternatives, fuzzy)
+        return data, None
+
+    if mimetype == OCTET_STREAM or mimetype in NPY_TYPES:
+        try:
+            data = json.loads(request.headers.get(PARAMS_HEADER, '{}'))
+        except json.JSONDecodeError:
+            raise ValueError(f'{PARAMS_HEADER} must be a JSON object')
+        if not isinstance(data, dict):
+            raise ValueError(f'{PARAMS_HEADER} must be a JSON object')
+
+        body = request.get_data(cache=False)
+        if mimetype == OCTET_STREAM:
+            alternatives = raw_float64_array(body, _parse_shape(request.headers.get(SHAPE_HEADER)))
+        else:
+            alternatives = npy_array(body)
+
+        expected_ndim = 3 if fuzzy else 2
+        if alternatives.ndim != expected_ndim or (fuzzy and alternatives.shape[2] != 3):
+            raise ValueError('alternatives must have shape ' + ('(n, m, 3)' if fuzzy else '(n, m)'))
+        return data, alternatives
+
+    raise UnsupportedFormat(f'Unsupported content type: {mimetype}')
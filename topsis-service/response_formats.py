@@ -0,0 +1,83 @@
+import io
+import json
+
+import numpy as np
+
+# Optional codecs: used when installed, otherwise the stdlib path is taken
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_TYPE = 'application/json'
+MSGPACK_TYPE = 'application/msgpack'
+NPY_TYPE = 'application/x-npy'
+
+# Media types a client can ask for through the Accept header, JSON first so
+# that */* and missing Accept headers keep getting JSON
+RESPONSE_TYPES = [JSON_TYPE] + ([MSGPACK_TYPE] if msgpack else []) + [NPY_TYPE]
+
+RANKING_DTYPE = np.dtype([
+    ('alternative_index', '<i8'),
+    ('closeness_coefficient', '<f8'),
+    ('rank', '<i8')
+])
+
+
+def columnar_rankings(cc, order):
+    """Rankings as parallel arrays instead of one dict per alternative.
+
+    order: alternative indices, best first; closeness and rank are aligned
+    with it.
+    """
+    return {
+        'order': order.astype(np.int64, copy=False),
+        'closeness': cc[order],
+        'rank': np.arange(1, len(order) + 1, dtype=np.int64)
+    }
+
+
+def _plain(value):
+    """Recursively turn ndarrays into lists for codecs without NumPy support"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+def dumps_json(payload):
+    """Encode to compact JSON bytes, with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_plain(payload), separators=(',', ':')).encode('utf-8')
+
+
+def dumps_npy(columns):
+    """Encode the ranking arrays as one structured .npy array"""
+    records = np.empty(len(columns['order']), dtype=RANKING_DTYPE)
+    records['alternative_index'] = columns['order']
+    records['closeness_coefficient'] = columns['closeness']
+    records['rank'] = columns['rank']
+
+    buffer = io.BytesIO()
+    np.save(buffer, records, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def encode_columnar(payload, mimetype):
+    """Encode a columnar ranking payload as (body, mimetype).
+
+    JSON and msgpack carry the whole payload. The .npy encoding carries only
+    the order/closeness/rank arrays, as a structured array.
+    """
+    if mimetype == MSGPACK_TYPE:
+        return msgpack.packb(_plain(payload)), MSGPACK_TYPE
+    if mimetype == NPY_TYPE:
+        return dumps_npy(payload), NPY_TYPE
+    return dumps_json(payload), JSON_TYPE
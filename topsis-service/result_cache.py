@@ -0,0 +1,249 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Bump when an engine change alters results, so old entries stop matching
+CACHE_VERSION = b'topsis-cache-v1'
+
+
+def cache_key(method, *arrays):
+    """Content hash of a method name and its input arrays.
+
+    Every array is canonicalized to C-ordered little-endian float64 and
+    hashed together with its shape, so the same numbers give the same key
+    whichever request layout they arrived in.
+    """
+    digest = hashlib.blake2b(CACHE_VERSION, digest_size=32)
+    digest.update(method.encode('utf-8'))
+    for array in arrays:
+        canonical = np.ascontiguousarray(array, dtype='<f8')
+        digest.update(repr(canonical.shape).encode('ascii'))
+        digest.update(canonical.data)
+    return digest.hexdigest()
+
+
+class MemoryTier:
+    """Per-process LRU of closeness arrays bounded by total bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if value.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key).nbytes
+            while self._entries and self._bytes + value.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+            self._entries[key] = value
+            self._bytes += value.nbytes
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'max_bytes': self.max_bytes}
+
+
+class SQLiteTier:
+    """Node-wide cache tier in a SQLite file shared by all gunicorn workers.
+
+    Entries carry their size and last access time; once the stored bytes
+    exceed max_bytes the least recently accessed entries are deleted. Hit
+    and miss counters live in the same file, so they cover every worker;
+    ResultCache flushes them in batches.
+    """
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+    def _connection(self):
+        # One connection per thread and process; forked workers reconnect
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+                'size INTEGER NOT NULL, last_access REAL NOT NULL)'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key):
+        connection = self._connection()
+        row = connection.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        connection.execute('UPDATE results SET last_access = ? WHERE key = ?', (time.time(), key))
+        return np.frombuffer(row[0], dtype='<f8')
+
+    def put(self, key, value):
+        size = value.nbytes
+        if size > self.max_bytes:
+            return
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(
+                'INSERT OR REPLACE INTO results (key, value, size, last_access) VALUES (?, ?, ?, ?)',
+                (key, np.ascontiguousarray(value, dtype='<f8').tobytes(), size, time.time())
+            )
+            total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+            if total > self.max_bytes:
+                # Walk entries oldest first until enough bytes are freed
+                excess = total - self.max_bytes
+                victims = []
+                for victim, victim_size in connection.execute(
+                        'SELECT key, size FROM results WHERE key != ? ORDER BY last_access', (key,)):
+                    victims.append((victim,))
+                    excess -= victim_size
+                    if excess <= 0:
+                        break
+                connection.executemany('DELETE FROM results WHERE key = ?', victims)
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def add_counts(self, deltas):
+        """Add {name: delta} to the node-wide counters in one transaction"""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.executemany(
+                'INSERT INTO counters (name, value) VALUES (?, ?) '
+                'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+                list(deltas.items())
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def stats(self):
+        connection = self._connection()
+        entries, stored = connection.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+        counters = dict(connection.execute('SELECT name, value FROM counters'))
+        return {
+            'entries': entries,
+            'bytes': stored,
+            'max_bytes': self.max_bytes,
+            'path': self.path,
+            'counters': counters
+        }
+
+
+class ResultCache:
+    """Two-tier content-addressed cache of TOPSIS closeness arrays.
+
+    Lookups try the in-process LRU first, then the shared SQLite tier, and
+    only then compute. Hits in the shared tier are promoted into memory.
+    A failing shared tier (locked or unwritable file) degrades to a miss
+    instead of failing the request.
+
+    Hit and miss counts are kept in process and added to the node-wide
+    counters at most every flush_seconds, so a memory hit never touches
+    the SQLite file.
+    """
+
+    def __init__(self, memory_bytes=64 * 1024 * 1024, shared_path=None,
+                 shared_bytes=512 * 1024 * 1024, flush_seconds=5.0):
+        self.memory = MemoryTier(memory_bytes)
+        self.shared = SQLiteTier(shared_path, shared_bytes) if shared_path else None
+        self.counters = {'memory_hits': 0, 'shared_hits': 0, 'misses': 0, 'shared_errors': 0}
+        self.flush_seconds = flush_seconds
+        self._pending = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+            if self.shared is None or name == 'shared_errors':
+                return
+            self._pending[name] = self._pending.get(name, 0) + 1
+            due = time.monotonic() - self._last_flush >= self.flush_seconds
+        if due:
+            self.flush_counters()
+
+    def flush_counters(self):
+        """Add the counts gathered since the last flush to the shared tier"""
+        if self.shared is None:
+            return
+        with self._lock:
+            deltas, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not deltas:
+            return
+        try:
+            self.shared.add_counts(deltas)
+        except sqlite3.Error:
+            # Keep the counts for the next flush
+            with self._lock:
+                for name, delta in deltas.items():
+                    self._pending[name] = self._pending.get(name, 0) + delta
+
+    def _shared_call(self, method, *args):
+        try:
+            return method(*args)
+        except sqlite3.Error:
+            self._count('shared_errors')
+            return None
+
+    def get_or_compute(self, key, compute):
+        """Return (closeness, source) with source 'memory', 'shared' or 'miss'"""
+        value = self.memory.get(key)
+        if value is not None:
+            self._count('memory_hits')
+            return value, 'memory'
+
+        if self.shared is not None:
+            value = self._shared_call(self.shared.get, key)
+            if value is not None:
+                self.memory.put(key, value)
+                self._count('shared_hits')
+                return value, 'shared'
+
+        value = np.ascontiguousarray(compute(), dtype=float)
+        value.setflags(write=False)
+        self._count('misses')
+        self.memory.put(key, value)
+        if self.shared is not None:
+            self._shared_call(self.shared.put, key, value)
+        return value, 'miss'
+
+    def stats(self):
+        self.flush_counters()
+        with self._lock:
+            worker = {'pid': os.getpid(), **self.counters}
+        return {
+            'worker': worker,
+            'memory': self.memory.stats(),
+            'shared': self._shared_call(self.shared.stats) if self.shared is not None else None
+        }
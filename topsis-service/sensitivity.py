@@ -0,0 +1,304 @@
+import numpy as np
+
+from vectorized_topsis import top_k_order
+
+
+def quadratic_roots(a2, a1, a0):
+    """Real roots of a2*s^2 + a1*s + a0 = 0, elementwise.
+
+    Returns an array of shape (..., 2) with NaN where a root does not
+    exist. Uses the cancellation-free form q = -(a1 + sign(a1)*sqrt(disc))/2,
+    roots q/a2 and a0/q, and falls back to the linear root when a2 is
+    negligible.
+    """
+    a2, a1, a0 = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (a2, a1, a0)))
+    scale = np.maximum(np.maximum(np.abs(a2), np.abs(a1)), np.abs(a0))
+    roots = np.full(a2.shape + (2,), np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        linear = np.abs(a2) <= 1e-12 * scale
+        has_linear = linear & (np.abs(a1) > 1e-12 * scale)
+        roots[..., 0] = np.where(has_linear, -a0 / a1, np.nan)
+
+        disc = a1 ** 2 - 4 * a2 * a0
+        quadratic = ~linear & (disc >= 0)
+        q = -0.5 * (a1 + np.copysign(np.sqrt(np.maximum(disc, 0)), a1))
+        roots[..., 0] = np.where(quadratic, q / a2, roots[..., 0])
+        roots[..., 1] = np.where(quadratic & (q != 0), a0 / q, np.nan)
+    return roots
+
+
+class CrispWeightModel:
+    """Crisp TOPSIS closeness as a closed-form function of the weights.
+
+    Vector normalization does not depend on the weights. For non-negative
+    weights the weighted ideals are the normalized column extremes scaled
+    by the weights, so
+
+        d+_i(w)^2 = sum_k w_k^2 * (r_ik - best_k)^2
+        d-_i(w)^2 = sum_k w_k^2 * (r_ik - worst_k)^2
+
+    With a single weight w_j = t varying, each squared distance is
+    A + t^2 * alpha, and sites i and l swap closeness exactly where
+    d-_i d+_l = d-_l d+_i. Squaring both sides turns this into a
+    quadratic in s = t^2, solved in closed form for all pairs at once.
+    """
+
+    def __init__(self, matrix, weights, criteria_types):
+        matrix = np.asarray(matrix, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        benefit = np.asarray(criteria_types, dtype=bool)
+
+        if matrix.ndim != 2 or matrix.shape[0] == 0:
+            raise ValueError('alternatives must be a non-empty (n, m) matrix')
+        self.n_alternatives, self.n_criteria = matrix.shape
+        if self.weights.shape != (self.n_criteria,) or benefit.shape != (self.n_criteria,):
+            raise ValueError('Weights and criteria_types must match number of criteria')
+        if not np.all(np.isfinite(matrix)):
+            raise ValueError('alternatives must be finite numbers')
+        if not np.all(np.isfinite(self.weights)):
+            raise ValueError('Weights must be finite numbers')
+        if np.any(self.weights < 0):
+            raise ValueError('Weights must be non-negative')
+
+        # Same normalization as CrispTOPSIS.normalize_matrix
+        norms = np.sqrt(np.sum(matrix ** 2, axis=0))
+        norms[norms == 0] = 1
+        normalized = matrix / norms
+
+        col_max, col_min = normalized.max(axis=0), normalized.min(axis=0)
+        best = np.where(benefit, col_max, col_min)
+        worst = np.where(benefit, col_min, col_max)
+
+        # Squared distances per unit weight, shape (n, m)
+        self.plus_sq = (normalized - best) ** 2
+        self.minus_sq = (normalized - worst) ** 2
+
+    def closeness(self, weights):
+        """Closeness for weight vectors of shape (m,) or (K, m) -> (n,) or (K, n)"""
+        squared = np.asarray(weights, dtype=float) ** 2
+        d_plus = np.sqrt(squared @ self.plus_sq.T)
+        d_minus = np.sqrt(squared @ self.minus_sq.T)
+        denominator = d_plus + d_minus
+        return np.divide(d_minus, denominator, out=np.zeros_like(denominator),
+                         where=denominator > 0)
+
+    def criterion_terms(self):
+        """(A, alpha, B, beta), each (n, m): column j holds the constant and
+        t^2 coefficients of d+^2 and d-^2 when w_j is replaced by t."""
+        squared = self.weights ** 2
+        plus_total = self.plus_sq @ squared
+        minus_total = self.minus_sq @ squared
+        return (
+            plus_total[:, None] - self.plus_sq * squared,
+            self.plus_sq,
+            minus_total[:, None] - self.minus_sq * squared,
+            self.minus_sq
+        )
+
+    def crossings(self, first, second, criteria=None):
+        """Weights t >= 0 at which sites first[p] and second[p] swap order.
+
+        first, second: index arrays of shape (P,). criteria: column indices
+        (default all). Returns t of shape (P, len(criteria), 2), NaN where
+        there is no crossing.
+        """
+        A, alpha, B, beta = (term if criteria is None else term[:, criteria]
+                             for term in self.criterion_terms())
+        Ai, Al = A[first], A[second]
+        ai, al = alpha[first], alpha[second]
+        Bi, Bl = B[first], B[second]
+        bi, bl = beta[first], beta[second]
+
+        # (B_i + s b_i)(A_l + s a_l) - (B_l + s b_l)(A_i + s a_i) = 0
+        roots = quadratic_roots(
+            bi * al - bl * ai,
+            Bi * al + bi * Al - Bl * ai - bl * Ai,
+            Bi * Al - Bl * Ai
+        )
+        with np.errstate(invalid='ignore'):
+            return np.where(roots >= 0, np.sqrt(roots), np.nan)
+
+    def top_k_stability(self, top_k=1):
+        """Per-criterion weight interval over which the top-k order holds.
+
+        Only adjacent sites can swap first as a weight moves, so the pairs
+        checked are consecutive top-k sites plus the k-th site against
+        every site outside the top k: n - 1 pairs per criterion.
+        """
+        n = self.n_alternatives
+        top_k = max(1, min(int(top_k), n))
+        cc = self.closeness(self.weights)
+        order = top_k_order(cc)
+        if n == 1:
+            first = second = np.empty(0, dtype=np.int64)
+        else:
+            first = np.concatenate([order[:top_k - 1], np.full(n - top_k, order[top_k - 1])])
+            second = np.concatenate([order[1:top_k], order[top_k:]])
+
+        crossings = self.crossings(first, second)            # (P, m, 2)
+        current = self.weights[None, :, None]
+        margin = 1e-12 * np.maximum(current, 1.0)
+        with np.errstate(invalid='ignore'):
+            above = np.where(crossings > current + margin, crossings, np.inf)
+            below = np.where(crossings < current - margin, crossings, -np.inf)
+        upper_t = above.min(axis=2)                           # (P, m)
+        lower_t = below.max(axis=2)
+
+        criteria = []
+        for j in range(self.n_criteria):
+            w = float(self.weights[j])
+            upper_pair = int(np.argmin(upper_t[:, j])) if len(first) else 0
+            lower_pair = int(np.argmax(lower_t[:, j])) if len(first) else 0
+            upper = float(upper_t[upper_pair, j]) if len(first) else np.inf
+            lower = float(lower_t[lower_pair, j]) if len(first) else -np.inf
+
+            def swap(pair, bound):
+                if not np.isfinite(bound):
+                    return None
+                return [int(first[pair]), int(second[pair])]
+
+            criteria.append({
+                'criterion_index': j,
+                'weight': w,
+                'weight_interval': [max(lower, 0.0), upper if np.isfinite(upper) else None],
+                'delta_interval': [max(lower, 0.0) - w, upper - w if np.isfinite(upper) else None],
+                'lower_swap': swap(lower_pair, lower),
+                'upper_swap': swap(upper_pair, upper)
+            })
+
+        return {
+            'top_k': top_k,
+            'order': order[:top_k].tolist(),
+            'closeness': cc[order[:top_k]].tolist(),
+            'criteria': criteria
+        }
+
+    def closeness_along(self, criterion, t, sites=None):
+        """Closeness of `sites` (default all) with w_criterion set to each t.
+
+        t: array of shape (T,); returns shape (T, len(sites)).
+        """
+        A, alpha, B, beta = (term[:, criterion] for term in self.criterion_terms())
+        if sites is not None:
+            A, alpha, B, beta = A[sites], alpha[sites], B[sites], beta[sites]
+        s = np.asarray(t, dtype=float)[:, None] ** 2
+        d_plus = np.sqrt(A + s * alpha)
+        d_minus = np.sqrt(B + s * beta)
+        denominator = d_plus + d_minus
+        return np.divide(d_minus, denominator, out=np.zeros_like(denominator),
+                         where=denominator > 0)
+
+    def weight_sweep(self, criterion, low, high, top_k=None, max_breakpoints=2000,
+                     chunk_pairs=500_000):
+        """Ranking as a piecewise-constant function of one weight over [low, high].
+
+        Each site's closeness is monotone in w_j (d-^2/d+^2 is a ratio of
+        two linear functions of w_j^2), so a site whose best closeness
+        over the range stays below the k-th best worst-case closeness can
+        never reach the top k and is dropped. For the remaining sites,
+        every pairwise crossing in the range is found in closed form,
+        chunk by chunk. The ranking is evaluated once per segment midpoint,
+        and segments with the same (top-k) order are merged; max_breakpoints
+        limits the merged result.
+        """
+        if not 0 <= criterion < self.n_criteria:
+            raise ValueError('criterion must be a valid criterion index')
+        low, high = float(low), float(high)
+        if not 0 <= low < high:
+            raise ValueError('range must satisfy 0 <= low < high')
+
+        n = self.n_alternatives
+        k = n if top_k is None else max(1, min(int(top_k), n))
+        ends = self.closeness_along(criterion, np.array([low, high]))
+        worst, best = ends.min(axis=0), ends.max(axis=0)
+        threshold = np.partition(worst, n - k)[n - k]
+        sites = np.flatnonzero(best >= threshold)
+
+        # Crossing weights of every candidate pair inside (low, high)
+        first_local, second_local = np.triu_indices(len(sites), 1)
+        found_t, found_pair = [], []
+        for start in range(0, len(first_local), chunk_pairs):
+            first = first_local[start:start + chunk_pairs]
+            second = second_local[start:start + chunk_pairs]
+            t = self.crossings(sites[first], sites[second], [criterion])[:, 0, :]
+            with np.errstate(invalid='ignore'):
+                inside = (t > low) & (t < high)
+            pair, root = np.nonzero(inside)
+            found_t.append(t[pair, root])
+            found_pair.append(pair + start)
+        found_t = np.concatenate(found_t) if found_t else np.empty(0)
+        found_pair = np.concatenate(found_pair) if found_pair else np.empty(0, dtype=np.int64)
+
+        # Crossings closer than rounding noise are one breakpoint
+        sort = np.argsort(found_t, kind='stable')
+        found_t, found_pair = found_t[sort], found_pair[sort]
+        if len(found_t):
+            new_group = np.diff(found_t) > 1e-12 * np.maximum(found_t[1:], 1.0)
+            group = np.concatenate([[0], np.cumsum(new_group)])
+            breakpoints = found_t[np.concatenate([[True], new_group])]
+        else:
+            group = np.empty(0, dtype=np.int64)
+            breakpoints = np.empty(0)
+        if top_k is None and len(breakpoints) > max_breakpoints:
+            # Every crossing changes the full order, so none would be merged
+            raise ValueError(f'{len(breakpoints)} breakpoints in range (limit {max_breakpoints}); '
+                             'narrow the range or set top_k')
+
+        bounds = np.concatenate([[low], breakpoints, [high]])
+        midpoints = (bounds[:-1] + bounds[1:]) / 2
+        rows = max(1, chunk_pairs // max(len(sites), 1))
+        orders = np.concatenate([
+            # Local indices of the (top-k) order on each segment
+            np.argsort(-self.closeness_along(criterion, midpoints[start:start + rows], sites),
+                       axis=1, kind='stable')[:, :k]
+            for start in range(0, len(midpoints), rows)
+        ])
+
+        # Keep a breakpoint only where the reported order changes
+        kept = np.flatnonzero(np.any(orders[1:] != orders[:-1], axis=1))
+        if len(kept) > max_breakpoints:
+            raise ValueError(f'{len(kept)} breakpoints in range (limit {max_breakpoints}); '
+                             'narrow the range or set top_k')
+        starts = np.concatenate([[0], kept + 1])
+        segment_bounds = np.concatenate([[low], breakpoints[kept], [high]])
+
+        segments = [
+            {
+                'weight_interval': [float(segment_bounds[i]), float(segment_bounds[i + 1])],
+                'order': sites[orders[start]].tolist()
+            }
+            for i, start in enumerate(starts)
+        ]
+
+        # Swaps at the kept breakpoints, each listed as [site ahead before,
+        # site ahead after]
+        at_kept = np.isin(group, kept)
+        pairs, pair_group = found_pair[at_kept], group[at_kept]
+        first, second = sites[first_local[pairs]], sites[second_local[pairs]]
+        A, alpha, B, beta = (term[:, criterion] for term in self.criterion_terms())
+        s = midpoints[pair_group] ** 2
+        # Order before the breakpoint: cc_i > cc_l  <=>  d-_i d+_l > d-_l d+_i
+        ahead = (np.sqrt((B[first] + s * beta[first]) * (A[second] + s * alpha[second]))
+                 >= np.sqrt((B[second] + s * beta[second]) * (A[first] + s * alpha[first])))
+        swaps = np.where(ahead[:, None], np.stack([first, second], 1),
+                         np.stack([second, first], 1))
+        split = np.searchsorted(pair_group, kept, side='right')[:-1]
+        crossings = [
+            {
+                'weight': float(breakpoints[b]),
+                'delta': float(breakpoints[b] - self.weights[criterion]),
+                'swaps': part.tolist()
+            }
+            for b, part in zip(kept, np.split(swaps, split))
+        ]
+
+        return {
+            'criterion_index': int(criterion),
+            'weight': float(self.weights[criterion]),
+            'range': [low, high],
+            'top_k': None if top_k is None else k,
+            'candidates': int(len(sites)),
+            'breakpoints': crossings,
+            'segments': segments
+        }
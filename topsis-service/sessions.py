@@ -0,0 +1,286 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from fuzzy_kernels import distance_kernel
+from vectorized_topsis import rankings_from_closeness
+
+
+class DecisionSession:
+    """Normalized decision matrix kept between re-weighting requests.
+
+    normalized: crisp matrix of shape (n, m) or fuzzy tensor of shape (n, m, 3)
+    criteria_types: List of booleans (True for benefit, False for cost)
+    dtype: float64 (default) or float32 for the stored matrix and re-weighting
+    distance: cell distance kernel of fuzzy sessions (fuzzy_kernels)
+
+    Column maxima and minima of the normalized matrix are computed once.
+    For non-negative weights the weighted ideal solutions are just those
+    statistics scaled by the weights, so a re-weight only needs the O(n*m)
+    distance pass.
+    """
+
+    def __init__(self, normalized, criteria_types, dtype=float, distance='vertex'):
+        self.normalized = np.ascontiguousarray(normalized, dtype=dtype)
+        self.normalized.setflags(write=False)
+        self.criteria_types = np.asarray(criteria_types, dtype=bool)
+        self.fuzzy = self.normalized.ndim == 3
+        self.distance = distance if self.fuzzy else None
+        if self.fuzzy:
+            self.kernel = distance_kernel(distance)
+        self.n_alternatives, self.n_criteria = self.normalized.shape[:2]
+
+        if self.criteria_types.shape != (self.n_criteria,):
+            raise ValueError('criteria_types must match number of criteria')
+
+        self.col_max = self.normalized.max(axis=0)
+        self.col_min = self.normalized.min(axis=0)
+        self.weight_shape = self.normalized.shape[1:]
+        # True once normalized lives in a shared_matrices block
+        self.shared = False
+
+    @property
+    def nbytes(self):
+        return self.normalized.nbytes + self.col_max.nbytes + self.col_min.nbytes
+
+    def calculate_ideal_solutions(self, weights, weighted):
+        """Ideal solutions from cached column statistics where possible"""
+        if np.all(weights >= 0):
+            col_max = self.col_max * weights
+            col_min = self.col_min * weights
+        else:
+            # Negative weights flip max and min, so fall back to a full scan
+            col_max = weighted.max(axis=0)
+            col_min = weighted.min(axis=0)
+
+        benefit = self.criteria_types[:, None] if self.fuzzy else self.criteria_types
+        pis = np.where(benefit, col_max, col_min)
+        nis = np.where(benefit, col_min, col_max)
+        return pis, nis
+
+    def closeness(self, weights):
+        """Closeness coefficients for a new weight vector"""
+        weights = np.asarray(weights, dtype=self.normalized.dtype)
+        if weights.shape != self.weight_shape:
+            raise ValueError(f'weights must have shape {self.weight_shape}')
+
+        weighted = self.normalized * weights
+        pis, nis = self.calculate_ideal_solutions(weights, weighted)
+
+        if self.fuzzy:
+            # The session's cell distance kernel, as in VectorizedFuzzyTOPSIS
+            d_plus = self.kernel(weighted, pis).sum(axis=1)
+            d_minus = self.kernel(weighted, nis).sum(axis=1)
+            denominator = d_plus + d_minus
+            return np.divide(d_minus, denominator, out=np.zeros_like(denominator),
+                             where=denominator > 0)
+
+        # Euclidean distance, as in CrispTOPSIS
+        d_plus = np.sqrt(np.sum((weighted - pis) ** 2, axis=1))
+        d_minus = np.sqrt(np.sum((weighted - nis) ** 2, axis=1))
+        denominator = d_plus + d_minus
+        denominator[denominator == 0] = 1
+        return d_minus / denominator
+
+    def rank(self, weights, top_k=None):
+        """Rank the stored alternatives under new weights"""
+        return rankings_from_closeness(self.closeness(weights), top_k)
+
+
+class SessionStore:
+    """Thread-safe in-process session store with TTL and memory-bounded LRU eviction.
+
+    Sessions expire `ttl` seconds after their last use. When adding a session
+    would push the total array footprint over `max_bytes`, the least recently
+    used sessions are evicted first. on_drop(session_id, session), if given,
+    is called for every session that expires, is evicted or is deleted.
+    """
+
+    def __init__(self, ttl=900, max_bytes=256 * 1024 * 1024, on_drop=None):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.on_drop = on_drop
+        self._sessions = OrderedDict()  # session_id -> (session, nbytes, last_used)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def _drop(self, session_id):
+        session, nbytes, _ = self._sessions.pop(session_id)
+        self._total_bytes -= nbytes
+        if self.on_drop is not None:
+            self.on_drop(session_id, session)
+
+    def _purge_expired(self, now):
+        # Entries are kept in last-used order, so expired ones are at the front
+        while self._sessions:
+            session_id, (_, _, last_used) = next(iter(self._sessions.items()))
+            if now - last_used < self.ttl:
+                break
+            self._drop(session_id)
+
+    def create(self, session, session_id=None):
+        """Store a session under a new or given id and return the id"""
+        # Sizes are recorded at creation so eviction accounting stays
+        # consistent even if an incremental session grows afterwards
+        nbytes = session.nbytes
+        if nbytes > self.max_bytes:
+            raise ValueError('Decision matrix exceeds the session memory budget')
+
+        session_id = session_id or uuid.uuid4().hex
+        with self._lock:
+            now = time.monotonic()
+            self._purge_expired(now)
+            if session_id in self._sessions:
+                self._drop(session_id)
+            while self._sessions and self._total_bytes + nbytes > self.max_bytes:
+                self._drop(next(iter(self._sessions)))
+
+            self._sessions[session_id] = (session, nbytes, now)
+            self._total_bytes += nbytes
+        return session_id
+
+    def get(self, session_id):
+        """Return a live session and refresh its TTL, or None"""
+        with self._lock:
+            now = time.monotonic()
+            self._purge_expired(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            self._sessions[session_id] = entry[:2] + (now,)
+            self._sessions.move_to_end(session_id)
+            return entry[0]
+
+    def delete(self, session_id):
+        """Remove a session; returns False if it did not exist"""
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            self._drop(session_id)
+            return True
+
+    def stats(self):
+        with self._lock:
+            self._purge_expired(time.monotonic())
+            return {
+                'sessions': len(self._sessions),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl
+            }
+
+
+class IncrementalSessionStore:
+    """Incremental sessions in a SQLite file every worker on the host can edit.
+
+    Each session is one row with the pickled engine and a version that is
+    bumped by every edit. edit() loads, edits and saves the engine while
+    holding the write lock, so edits that land on different workers are
+    applied one after another to the latest state. Workers keep the engine
+    they last saved in their SessionStore and only unpickle the row when
+    another worker has edited it since.
+    """
+
+    def __init__(self, path, ttl=900):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+
+    def _connection(self):
+        # One connection per thread and process, as in result_cache.SQLiteTier
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS incremental_sessions ('
+                'id TEXT PRIMARY KEY, version INTEGER NOT NULL, state BLOB NOT NULL, '
+                'last_used REAL NOT NULL)'
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def purge_expired(self):
+        self._connection().execute('DELETE FROM incremental_sessions WHERE last_used <= ?',
+                                   (time.time() - self.ttl,))
+
+    def create(self, session_id, engine):
+        self.purge_expired()
+        engine.version = 1
+        self._connection().execute(
+            'INSERT INTO incremental_sessions (id, version, state, last_used) VALUES (?, ?, ?, ?)',
+            (session_id, engine.version, pickle.dumps(engine, pickle.HIGHEST_PROTOCOL),
+             time.time())
+        )
+
+    def load(self, session_id):
+        """The latest engine of a live session, or None"""
+        row = self._connection().execute(
+            'SELECT version, state FROM incremental_sessions WHERE id = ? AND last_used > ?',
+            (session_id, time.time() - self.ttl)
+        ).fetchone()
+        if row is None:
+            return None
+        engine = pickle.loads(row['state'])
+        engine.version = row['version']
+        return engine
+
+    def edit(self, session_id, cached, apply):
+        """Run apply(engine) on the latest engine and save the result.
+
+        cached is this worker's copy, used as is when no other worker has
+        edited the session since it was saved. Returns (engine, result of
+        apply), or None if the session is unknown or expired.
+        """
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT version FROM incremental_sessions WHERE id = ? AND last_used > ?',
+                (session_id, time.time() - self.ttl)
+            ).fetchone()
+            if row is None:
+                connection.execute('ROLLBACK')
+                return None
+
+            engine = cached
+            if getattr(cached, 'version', None) != row['version']:
+                engine = pickle.loads(connection.execute(
+                    'SELECT state FROM incremental_sessions WHERE id = ?', (session_id,)
+                ).fetchone()['state'])
+            # Until the save commits the engine may not match the stored
+            # state, so a failed edit makes the next one reload it
+            engine.version = None
+            result = apply(engine)
+            version = row['version'] + 1
+            connection.execute(
+                'UPDATE incremental_sessions SET version = ?, state = ?, last_used = ? '
+                'WHERE id = ?',
+                (version, pickle.dumps(engine, pickle.HIGHEST_PROTOCOL), time.time(), session_id)
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        engine.version = version
+        return engine, result
+
+    def delete(self, session_id):
+        cursor = self._connection().execute(
+            'DELETE FROM incremental_sessions WHERE id = ?', (session_id,))
+        return cursor.rowcount == 1
+
+    def stats(self):
+        self.purge_expired()
+        sessions, stored = self._connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(LENGTH(state)), 0) FROM incremental_sessions'
+        ).fetchone()
+        return {'sessions': sessions, 'bytes': stored, 'ttl_seconds': self.ttl}
@@ -0,0 +1,272 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _untrack(block):
+    # Every process that opens a block registers it with its resource
+    # tracker, which unlinks it when that process exits, even if other
+    # workers still map it. Lifetime is managed by the registry instead.
+    resource_tracker.unregister(block._name, 'shared_memory')
+
+
+def _unlink(name):
+    # Opening registers the block with the tracker and unlink() unregisters
+    # it again, so the tracker's bookkeeping stays balanced
+    try:
+        block = SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    block.close()
+    block.unlink()
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SharedMatrixStore:
+    """Read-only decision matrices in named shared-memory blocks.
+
+    A matrix is published once by the worker that received it. Any other
+    worker on the host can then map the same block without copying it. A
+    SQLite registry holds the block names, shapes and metadata, plus one
+    attachment row per (block, worker pid) as the reference count.
+
+    A block is unlinked when it has been released (or has not been used
+    for `ttl` seconds) and no worker is attached to it anymore. Workers
+    detach on exit via close(). Attachments of workers that died without
+    detaching are reaped by checking whether their pid is still alive.
+    """
+
+    def __init__(self, path, ttl=900, prefix='topsis_'):
+        self.path = path
+        self.ttl = ttl
+        self.prefix = prefix
+        self._local = threading.local()
+        self._blocks = {}  # key -> SharedMemory mapped by this process
+        self._closing = []  # (key, SharedMemory) whose views are still referenced
+        self._reported = set()  # keys of _closing already logged by close()
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        # One connection per thread and process, as in result_cache.SQLiteTier
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS blocks ('
+                'key TEXT PRIMARY KEY, name TEXT NOT NULL, shape TEXT NOT NULL, '
+                'dtype TEXT NOT NULL, nbytes INTEGER NOT NULL, meta TEXT NOT NULL, '
+                'released INTEGER NOT NULL DEFAULT 0, last_used REAL NOT NULL)'
+            )
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS attachments ('
+                'key TEXT NOT NULL, pid INTEGER NOT NULL, PRIMARY KEY (key, pid))'
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @staticmethod
+    def _view(block, shape, dtype):
+        # np.frombuffer holds a buffer export for as long as the view (or
+        # any array derived from it) is alive, so block.close() raises
+        # BufferError instead of unmapping memory still in use.
+        # np.ndarray(buffer=...) keeps no export and would let it unmap.
+        view = np.frombuffer(block.buf, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+        view.setflags(write=False)
+        return view
+
+    def publish(self, key, array, meta):
+        """Copy an array into a new block and return a read-only view of it.
+
+        meta: JSON-serializable details other workers need to rebuild
+        their view (e.g. criteria_types). Raises OSError when shared memory
+        is unavailable or too small.
+        """
+        array = np.ascontiguousarray(array)
+        self.reap()
+        # Writing past the free space of /dev/shm raises SIGBUS rather than
+        # an error, so refuse up front
+        if os.path.isdir('/dev/shm'):
+            stat = os.statvfs('/dev/shm')
+            if array.nbytes > stat.f_bavail * stat.f_frsize:
+                raise OSError('Not enough shared memory for this matrix')
+        block = SharedMemory(name=self.prefix + key[:20], create=True, size=max(array.nbytes, 1))
+        _untrack(block)
+        np.frombuffer(block.buf, dtype=array.dtype, count=array.size)[...] = array.ravel()
+        view = self._view(block, array.shape, array.dtype)
+
+        connection = self._connection()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute(
+                'INSERT INTO blocks (key, name, shape, dtype, nbytes, meta, last_used) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, block.name, json.dumps(array.shape), array.dtype.str, array.nbytes,
+                 json.dumps(meta), time.time())
+            )
+            connection.execute('INSERT INTO attachments (key, pid) VALUES (?, ?)',
+                               (key, os.getpid()))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            block.close()
+            _unlink(block.name)
+            raise
+
+        with self._lock:
+            self._blocks[key] = block
+        return view
+
+    def attach(self, key):
+        """Map a live block read-only; returns (view, meta) or None"""
+        self.reap()
+        connection = self._connection()
+        row = connection.execute(
+            'SELECT name, shape, dtype, meta FROM blocks '
+            'WHERE key = ? AND released = 0 AND last_used > ?',
+            (key, time.time() - self.ttl)
+        ).fetchone()
+        if row is None:
+            return None
+
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is None:
+                try:
+                    block = SharedMemory(name=row['name'])
+                except FileNotFoundError:
+                    return None
+                _untrack(block)
+                self._blocks[key] = block
+
+        connection.execute('INSERT OR IGNORE INTO attachments (key, pid) VALUES (?, ?)',
+                           (key, os.getpid()))
+        self.touch(key)
+        view = self._view(block, tuple(json.loads(row['shape'])), np.dtype(row['dtype']))
+        return view, json.loads(row['meta'])
+
+    def touch(self, key):
+        """Refresh a block's TTL; returns False if it was released or expired"""
+        now = time.time()
+        cursor = self._connection().execute(
+            'UPDATE blocks SET last_used = ? WHERE key = ? AND released = 0 AND last_used > ?',
+            (now, key, now - self.ttl)
+        )
+        return cursor.rowcount == 1
+
+    def detach(self, key):
+        """Drop this worker's mapping and reference to a block"""
+        with self._lock:
+            block = self._blocks.pop(key, None)
+        if block is None:
+            return
+        self._close_block(key, block)
+        self._connection().execute('DELETE FROM attachments WHERE key = ? AND pid = ?',
+                                   (key, os.getpid()))
+        self._unlink_unused()
+
+    def _close_block(self, key, block):
+        try:
+            block.close()
+        except BufferError:
+            # A view from publish() or attach() is still referenced, e.g. by
+            # a request in flight, so the mapping cannot be closed yet. Keep
+            # it and retry from _close_pending() once the view is dropped.
+            logger.debug('Deferring close of shared matrix %s', key)
+            with self._lock:
+                self._closing.append((key, block))
+
+    def _close_pending(self):
+        """Close deferred mappings whose views have been dropped; returns the keys left open"""
+        with self._lock:
+            pending, self._closing = self._closing, []
+        still_open = []
+        for key, block in pending:
+            try:
+                block.close()
+            except BufferError:
+                still_open.append((key, block))
+        with self._lock:
+            self._closing.extend(still_open)
+        return [key for key, _ in still_open]
+
+    def release(self, key):
+        """Mark a block for removal once every worker has detached"""
+        cursor = self._connection().execute(
+            'UPDATE blocks SET released = 1 WHERE key = ? AND released = 0', (key,))
+        self.detach(key)
+        self._unlink_unused()
+        return cursor.rowcount == 1
+
+    def reap(self):
+        """Forget attachments of dead workers and unlink unused blocks"""
+        self._close_pending()
+        connection = self._connection()
+        pids = [row['pid'] for row in connection.execute('SELECT DISTINCT pid FROM attachments')]
+        dead = [(pid,) for pid in pids if not pid_alive(pid)]
+        if dead:
+            connection.executemany('DELETE FROM attachments WHERE pid = ?', dead)
+        self._unlink_unused()
+
+    def _unlink_unused(self):
+        connection = self._connection()
+        rows = connection.execute(
+            'SELECT key, name FROM blocks WHERE (released = 1 OR last_used <= ?) '
+            'AND key NOT IN (SELECT key FROM attachments)',
+            (time.time() - self.ttl,)
+        ).fetchall()
+        for row in rows:
+            _unlink(row['name'])
+            connection.execute('DELETE FROM blocks WHERE key = ?', (row['key'],))
+
+    def close(self):
+        """Detach every block this worker maps; call on worker exit"""
+        with self._lock:
+            keys = list(self._blocks)
+        for key in keys:
+            try:
+                self.detach(key)
+            except sqlite3.Error:
+                pass
+        for key in set(self._close_pending()) - self._reported:
+            self._reported.add(key)
+            logger.warning('Shared matrix %s is still referenced at close; '
+                           'it stays mapped until this process exits', key)
+
+    def stats(self):
+        self.reap()
+        connection = self._connection()
+        blocks, stored = connection.execute(
+            'SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM blocks').fetchone()
+        attachments = connection.execute('SELECT COUNT(*) FROM attachments').fetchone()[0]
+        with self._lock:
+            mapped = len(self._blocks)
+            closing = len(self._closing)
+        return {
+            'blocks': blocks,
+            'bytes': stored,
+            'attachments': attachments,
+            'mapped_by_worker': mapped,
+            'closing_by_worker': closing,
+            'ttl_seconds': self.ttl
+        }
@@ -0,0 +1,221 @@
+import numpy as np
+
+from sensitivity import CrispWeightModel
+from vectorized_topsis import VectorizedFuzzyTOPSIS, top_k_order
+
+SAMPLING_METHODS = ('halton', 'random')
+WEIGHT_DISTRIBUTIONS = ('uniform', 'simplex')
+
+
+def first_primes(count):
+    """The first `count` primes"""
+    limit = max(16, int(count * (np.log(count + 1) + np.log(np.log(count + 2)) + 2)))
+    sieve = np.ones(limit + 1, dtype=bool)
+    sieve[:2] = False
+    for p in range(2, int(limit ** 0.5) + 1):
+        if sieve[p]:
+            sieve[p * p::p] = False
+    return np.flatnonzero(sieve)[:count]
+
+
+def halton(n, dimensions, rng=None):
+    """n points of the Halton sequence in [0, 1)^dimensions, skipping index 0.
+
+    With a Generator every digit of every base gets its own random
+    permutation (scrambled Halton), which removes the correlation between
+    the high-dimensional coordinates of the plain sequence while keeping
+    its low discrepancy.
+    """
+    index = np.arange(1, n + 1)
+    points = np.empty((n, dimensions))
+    for j, base in enumerate(first_primes(dimensions)):
+        base = int(base)
+        # Digits until base^-k falls below double precision
+        digits = int(np.ceil(53 / np.log2(base)))
+        value = np.zeros(n)
+        scale = 1 / base
+        remaining = index.copy()
+        for _ in range(digits):
+            digit = remaining % base
+            if rng is not None:
+                digit = rng.permutation(base)[digit]
+            elif not remaining.any():
+                break
+            value += digit * scale
+            remaining //= base
+            scale /= base
+        points[:, j] = value
+    return points
+
+
+def saltelli_indices(f_a, f_b, f_ab):
+    """First-order and total Sobol indices from a Saltelli design.
+
+    f_a, f_b: outputs of shape (N, q) on the two base matrices; f_ab:
+    (m, N, q), with row j evaluated on A with column j taken from B.
+    Uses the Saltelli (2010) first-order and Jansen total estimators and
+    returns (first_order, total), each (m, q). Outputs that do not vary
+    get zero indices.
+    """
+    variance = np.var(np.concatenate([f_a, f_b]), axis=0)
+    first = np.mean(f_b * (f_ab - f_a), axis=1)
+    total = 0.5 * np.mean((f_a - f_ab) ** 2, axis=1)
+    varies = variance > 1e-30
+    first = np.where(varies, first / np.where(varies, variance, 1), 0.0)
+    total = np.where(varies, total / np.where(varies, variance, 1), 0.0)
+    return first, total
+
+
+class CrispTopCloseness:
+    """Closeness of selected sites under scaled crisp weights, via CrispWeightModel"""
+
+    def __init__(self, alternatives, weights, criteria_types):
+        self.model = CrispWeightModel(alternatives, weights, criteria_types)
+        self.n_criteria = self.model.n_criteria
+        self.base = self.model.weights
+
+    def closeness(self, factors=None, sites=None):
+        """(K, len(sites)) closeness for weights base * factors[k]; base when factors is None"""
+        weights = self.base[None] if factors is None else self.base * factors
+        squared = weights ** 2
+        plus_sq = self.model.plus_sq if sites is None else self.model.plus_sq[sites]
+        minus_sq = self.model.minus_sq if sites is None else self.model.minus_sq[sites]
+        d_plus = np.sqrt(squared @ plus_sq.T)
+        d_minus = np.sqrt(squared @ minus_sq.T)
+        denominator = d_plus + d_minus
+        return np.divide(d_minus, denominator, out=np.zeros_like(denominator),
+                         where=denominator > 0)
+
+
+class FuzzyTopCloseness:
+    """Closeness of selected sites under scaled fuzzy weights.
+
+    Normalization does not depend on the weights, and for non-negative
+    weights the ideal solutions are the normalized column extremes scaled
+    by the weights, so only the selected rows are ever weighted.
+    """
+
+    def __init__(self, alternatives, weights, criteria_types, distance='vertex'):
+        self.topsis = VectorizedFuzzyTOPSIS(alternatives, weights, criteria_types,
+                                            distance=distance)
+        if np.any(self.topsis.weights < 0):
+            raise ValueError('Weights must be non-negative')
+        self.n_criteria = self.topsis.n_criteria
+        self.base = self.topsis.weights
+        self.normalized = self.topsis.normalize_fuzzy_matrix()
+        benefit = self.topsis.criteria_types[:, None]
+        col_max, col_min = self.normalized.max(axis=0), self.normalized.min(axis=0)
+        self.best = np.where(benefit, col_max, col_min)
+        self.worst = np.where(benefit, col_min, col_max)
+
+    def closeness(self, factors=None, sites=None):
+        """(K, len(sites)) closeness for weights base * factors[k]; base when factors is None"""
+        if factors is None:
+            return self.topsis.closeness()[None] if sites is None \
+                else self.topsis.closeness()[None, sites]
+        weights = self.base * factors[:, :, None]                     # (K, m, 3)
+        rows = self.normalized if sites is None else self.normalized[sites]
+        weighted = rows[None] * weights[:, None]                       # (K, k, m, 3)
+        d_plus = self.topsis.kernel(weighted, (self.best * weights)[:, None]).sum(axis=-1)
+        d_minus = self.topsis.kernel(weighted, (self.worst * weights)[:, None]).sum(axis=-1)
+        denominator = d_plus + d_minus
+        return np.divide(d_minus, denominator, out=np.zeros_like(denominator),
+                         where=denominator > 0)
+
+
+class SobolWeightSensitivity:
+    """Variance-based sensitivity of the top sites' closeness to the weights.
+
+    Each criterion's weight is multiplied by an independent random factor:
+    'uniform' draws it from U(1 - spread, 1 + spread), and 'simplex' from
+    Exp(1), which for equal weights spreads the normalized weight vector
+    uniformly over the simplex. TOPSIS closeness does not change when all
+    weights are scaled together, so the factors need no renormalization.
+
+    The top_k sites are chosen at the given weights. First-order and total
+    indices are reported for the closeness of each of them and for their
+    mean closeness, from a Saltelli design of N * (m + 2) evaluations.
+    """
+
+    def __init__(self, model, top_k=10, distribution='uniform', spread=0.5):
+        """
+        model: CrispTopCloseness or FuzzyTopCloseness
+        """
+        if distribution not in WEIGHT_DISTRIBUTIONS:
+            raise ValueError(f"distribution must be one of {', '.join(WEIGHT_DISTRIBUTIONS)}")
+        if distribution == 'uniform' and not 0 < spread <= 1:
+            raise ValueError('spread must be in (0, 1]')
+        if isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1:
+            raise ValueError('top_k must be a positive integer')
+
+        self.model = model
+        self.distribution = distribution
+        self.spread = spread
+        self.n_criteria = model.n_criteria
+
+        base = model.closeness()[0]
+        self.top_sites = top_k_order(base, top_k)
+        self.base_closeness = base[self.top_sites]
+
+    def factors(self, u):
+        """Weight factors from points u in [0, 1)"""
+        if self.distribution == 'uniform':
+            return 1 - self.spread + 2 * self.spread * u
+        return -np.log1p(-u)
+
+    def evaluate(self, factors, block_cells):
+        """Top-site closeness plus their mean, (K, k + 1), in blocks of design points"""
+        k = len(self.top_sites)
+        rows = max(1, block_cells // (k * self.n_criteria * 3))
+        out = np.empty((len(factors), k + 1))
+        for start in range(0, len(factors), rows):
+            cc = self.model.closeness(factors[start:start + rows], self.top_sites)
+            out[start:start + rows, :k] = cc
+            out[start:start + rows, k] = cc.mean(axis=1)
+        return out
+
+    def run(self, samples=1024, sampling='halton', seed=0, block_cells=4_000_000):
+        """Sobol indices from `samples` base points (N) of a 2m-dimensional design"""
+        if sampling not in SAMPLING_METHODS:
+            raise ValueError(f"sampling must be one of {', '.join(SAMPLING_METHODS)}")
+        samples = int(samples)
+        if samples < 2:
+            raise ValueError('samples must be at least 2')
+
+        m = self.n_criteria
+        rng = np.random.default_rng(seed)
+        u = halton(samples, 2 * m, rng) if sampling == 'halton' else rng.random((samples, 2 * m))
+        a, b = self.factors(u[:, :m]), self.factors(u[:, m:])
+
+        # A, B, then A with column j from B for every j: (m + 2) * N points
+        ab = np.repeat(a[None], m, axis=0)
+        columns = np.arange(m)
+        ab[columns, :, columns] = b[:, columns].T
+        design = np.concatenate([a, b, ab.reshape(m * samples, m)])
+
+        out = self.evaluate(design, block_cells)
+        f_a, f_b = out[:samples], out[samples:2 * samples]
+        f_ab = out[2 * samples:].reshape(m, samples, -1)
+        first, total = saltelli_indices(f_a, f_b, f_ab)
+
+        top_sites = [
+            {
+                'alternative_index': int(site),
+                'closeness': float(self.base_closeness[i]),
+                'first_order': first[:, i].tolist(),
+                'total': total[:, i].tolist()
+            }
+            for i, site in enumerate(self.top_sites)
+        ]
+
+        return {
+            'samples': samples,
+            'evaluations': len(design),
+            'sampling': sampling,
+            'distribution': self.distribution,
+            'spread': self.spread if self.distribution == 'uniform' else None,
+            'seed': seed,
+            'first_order': first[:, -1].tolist(),
+            'total': total[:, -1].tolist(),
+            'top_sites': top_sites
+        }
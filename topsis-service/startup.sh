@@ -7,4 +7,4 @@ echo "Starting TOPSIS service..."
 pip install -r requirements.txt
 
 # Start the application
-gunicorn --bind=0.0.0.0:$PORT --timeout 600 app:app
+gunicorn --bind=0.0.0.0:$PORT --threads 4 --timeout 600 app:app
@@ -0,0 +1,283 @@
+import os
+import tempfile
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from fuzzy_kernels import distance_kernel
+from vectorized_topsis import normalize_fuzzy_columns, top_k_order
+
+
+def open_matrix(source):
+    """Open a decision matrix for block reads without loading it.
+
+    source: path to a .npy file (memory-mapped read-only) or an array-like,
+    e.g. an existing np.memmap.
+    """
+    if isinstance(source, str):
+        return np.load(source, mmap_mode='r')
+    return source
+
+
+class _StreamingTOPSIS(ABC):
+    """Two-pass, block-wise TOPSIS over a matrix that need not fit in memory.
+
+    Pass one reads row blocks and accumulates column statistics, from
+    which the ideal solutions follow in closed form. Pass two re-reads the
+    blocks and computes distances and closeness per block. The closeness
+    can go into a bounded top-k selection, an output .npy memmap, or both.
+    Peak memory is O(block_rows * m) whatever the number of alternatives.
+
+    Blocks are read in `dtype`. Column statistics are always accumulated in
+    float64 and only the derived per-column constants are cast to `dtype`.
+    """
+
+    def __init__(self, source, weights, criteria_types, block_rows=65536, dtype=float):
+        self.matrix = open_matrix(source)
+        self.dtype = np.dtype(dtype)
+        self.weights = np.asarray(weights, dtype=float)
+        self.criteria_types = np.asarray(criteria_types, dtype=bool)
+        self.block_rows = max(1, int(block_rows))
+        self.n_alternatives = self.matrix.shape[0]
+        self.n_criteria = self.matrix.shape[1]
+
+        if self.n_alternatives == 0:
+            raise ValueError('No alternatives provided')
+        if self.criteria_types.shape != (self.n_criteria,):
+            raise ValueError('criteria_types must match number of criteria')
+
+    def blocks(self):
+        """Yield (start, block) with each block copied into memory as self.dtype"""
+        for start in range(0, self.n_alternatives, self.block_rows):
+            stop = min(start + self.block_rows, self.n_alternatives)
+            yield start, np.asarray(self.matrix[start:stop], dtype=self.dtype)
+
+    @abstractmethod
+    def accumulate(self, block):
+        """Pass one: fold a block into the column statistics"""
+
+    @abstractmethod
+    def finish_statistics(self):
+        """Derive the per-column constants of pass two from the statistics"""
+
+    @abstractmethod
+    def block_closeness(self, block):
+        """Pass two: closeness of one block's rows"""
+
+    def run(self, top_k=100, output_path=None, bins=10, progress=None):
+        """Stream both passes; returns the top-k rankings and a summary.
+
+        progress, if given, is called after every block with the fraction
+        of both passes done.
+        """
+        rows_total = 2 * self.n_alternatives
+
+        # Pass one: column statistics and ideal solutions
+        for start, block in self.blocks():
+            self.accumulate(block)
+            if progress is not None:
+                progress((start + len(block)) / rows_total)
+        self.finish_statistics()
+
+        output = temp_path = None
+        if output_path is not None:
+            # Closeness goes to a temporary file beside output_path and is
+            # moved into place once complete, so an existing file is never
+            # truncated while it may still be mapped, e.g. as the input
+            fd, temp_path = tempfile.mkstemp(
+                suffix='.npy', dir=os.path.dirname(os.path.abspath(output_path)))
+            os.close(fd)
+
+        best_index = np.empty(0, dtype=np.int64)
+        best_cc = np.empty(0)
+        total = 0.0
+        total_sq = 0.0
+        low, high = np.inf, -np.inf
+        counts = np.zeros(bins, dtype=np.int64)
+
+        try:
+            if temp_path is not None:
+                output = np.lib.format.open_memmap(
+                    temp_path, mode='w+', dtype=self.dtype, shape=(self.n_alternatives,))
+
+            # Pass two: distances and closeness per block
+            for start, block in self.blocks():
+                cc = self.block_closeness(block)
+                if output is not None:
+                    output[start:start + len(cc)] = cc
+
+                total += float(cc.sum())
+                total_sq += float((cc ** 2).sum())
+                low, high = min(low, float(cc.min())), max(high, float(cc.max()))
+                counts += np.histogram(cc, bins=bins, range=(0.0, 1.0))[0]
+
+                if top_k:
+                    # Earlier candidates precede this block, so ties stay in index order
+                    local = top_k_order(cc, top_k)
+                    best_index = np.concatenate([best_index, local + start])
+                    best_cc = np.concatenate([best_cc, cc[local]])
+                    keep = top_k_order(best_cc, top_k)
+                    best_index, best_cc = best_index[keep], best_cc[keep]
+
+                if progress is not None:
+                    progress((self.n_alternatives + start + len(cc)) / rows_total)
+
+            if output is not None:
+                output.flush()
+                del output
+                os.replace(temp_path, output_path)
+        except BaseException:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        n = self.n_alternatives
+        mean = total / n
+        return {
+            'rankings': [
+                {
+                    'alternative_index': int(i),
+                    'closeness_coefficient': float(c),
+                    'rank': rank
+                }
+                for rank, (i, c) in enumerate(zip(best_index, best_cc), 1)
+            ],
+            'summary': {
+                'total': n,
+                'mean': mean,
+                'std': float(np.sqrt(max(total_sq / n - mean ** 2, 0.0))),
+                'min': low,
+                'max': high,
+                'histogram': {
+                    'bin_edges': np.linspace(0.0, 1.0, bins + 1).tolist(),
+                    'counts': counts.tolist()
+                }
+            },
+            'output_path': output_path
+        }
+
+
+class StreamingCrispTOPSIS(_StreamingTOPSIS):
+    """Out-of-core CrispTOPSIS over an (n, m) matrix.
+
+    Pass one accumulates column sums of squares and raw extremes; the
+    weighted ideals are those extremes scaled by weight / norm.
+    """
+
+    def __init__(self, source, weights, criteria_types, block_rows=65536, dtype=float):
+        super().__init__(source, weights, criteria_types, block_rows, dtype)
+        if self.matrix.ndim != 2:
+            raise ValueError('matrix must have shape (n, m)')
+        if self.weights.shape != (self.n_criteria,):
+            raise ValueError('Weights must match number of criteria')
+
+        self.sum_squares = np.zeros(self.n_criteria)
+        self.col_max = np.full(self.n_criteria, -np.inf)
+        self.col_min = np.full(self.n_criteria, np.inf)
+
+    def accumulate(self, block):
+        self.sum_squares += np.sum(np.square(block, dtype=np.float64), axis=0)
+        np.maximum(self.col_max, block.max(axis=0), out=self.col_max)
+        np.minimum(self.col_min, block.min(axis=0), out=self.col_min)
+
+    def finish_statistics(self):
+        norms = np.sqrt(self.sum_squares)
+        norms[norms == 0] = 1
+
+        # A negative weight turns the raw maximum into the weighted minimum
+        high = self.col_max / norms * self.weights
+        low = self.col_min / norms * self.weights
+        weighted_max, weighted_min = np.maximum(high, low), np.minimum(high, low)
+        pis = np.where(self.criteria_types, weighted_max, weighted_min)
+        nis = np.where(self.criteria_types, weighted_min, weighted_max)
+        self.norms, self.pis, self.nis, self.block_weights = (
+            a.astype(self.dtype) for a in (norms, pis, nis, self.weights))
+
+    def block_closeness(self, block):
+        weighted = block / self.norms * self.block_weights
+        d_plus = np.sqrt(np.sum((weighted - self.pis) ** 2, axis=1))
+        d_minus = np.sqrt(np.sum((weighted - self.nis) ** 2, axis=1))
+        denominator = d_plus + d_minus
+        denominator[denominator == 0] = 1
+        return d_minus / denominator
+
+
+class StreamingFuzzyTOPSIS(_StreamingTOPSIS):
+    """Out-of-core fuzzy TOPSIS over an (n, m, 3) tensor.
+
+    Pass one collects, per column and TFN component, the raw max/min plus
+    the smallest and largest positive value and whether any value is not
+    positive. That is enough to derive the normalization scales and the
+    FPIS/FNIS of the weighted matrix without a third pass. Pass two uses
+    the cell distance kernel named by `distance` (fuzzy_kernels).
+    """
+
+    def __init__(self, source, weights, criteria_types, block_rows=65536, dtype=float,
+                 distance='vertex'):
+        super().__init__(source, weights, criteria_types, block_rows, dtype)
+        self.distance = distance
+        self.kernel = distance_kernel(distance)
+        if self.matrix.ndim != 3 or self.matrix.shape[2] != 3:
+            raise ValueError('matrix must have shape (n, m, 3)')
+        if self.weights.shape != (self.n_criteria, 3):
+            raise ValueError('weights must have shape (m, 3)')
+
+        shape = (self.n_criteria, 3)
+        self.raw_max = np.full(shape, -np.inf)
+        self.raw_min = np.full(shape, np.inf)
+        self.positive_max = np.full(shape, -np.inf)
+        self.positive_min = np.full(shape, np.inf)
+        self.has_nonpositive = np.zeros(shape, dtype=bool)
+
+    def accumulate(self, block):
+        positive = block > 0
+        np.maximum(self.raw_max, block.max(axis=0), out=self.raw_max)
+        np.minimum(self.raw_min, block.min(axis=0), out=self.raw_min)
+        np.maximum(self.positive_max, np.where(positive, block, -np.inf).max(axis=0),
+                   out=self.positive_max)
+        np.minimum(self.positive_min, np.where(positive, block, np.inf).min(axis=0),
+                   out=self.positive_min)
+        self.has_nonpositive |= (~positive).any(axis=0)
+
+    def finish_statistics(self):
+        benefit = self.criteria_types
+        # Same scales as fuzzy_column_scales: max upper / min positive lower
+        self.scale = np.where(benefit, self.raw_max[:, 2], self.positive_min[:, 0])
+
+        normalized_max = np.zeros((self.n_criteria, 3))
+        normalized_min = np.zeros((self.n_criteria, 3))
+
+        cols = benefit & (self.scale > 0)
+        normalized_max[cols] = self.raw_max[cols] / self.scale[cols, None]
+        normalized_min[cols] = self.raw_min[cols] / self.scale[cols, None]
+
+        # Cost columns map component k to scale / raw component (2 - k),
+        # or to 1 where that raw value is not positive
+        cols = ~benefit & np.isfinite(self.scale)
+        scale = self.scale[cols, None]
+        positive_min = self.positive_min[cols, ::-1]
+        positive_max = self.positive_max[cols, ::-1]
+        nonpositive = self.has_nonpositive[cols, ::-1]
+        has_positive = np.isfinite(positive_min)
+        with np.errstate(divide='ignore'):
+            from_min = np.where(has_positive, scale / positive_min, -np.inf)
+            from_max = np.where(has_positive, scale / positive_max, np.inf)
+        normalized_max[cols] = np.where(nonpositive, np.maximum(from_min, 1.0), from_min)
+        normalized_min[cols] = np.where(nonpositive, np.minimum(from_max, 1.0), from_max)
+
+        high = normalized_max * self.weights
+        low = normalized_min * self.weights
+        weighted_max, weighted_min = np.maximum(high, low), np.minimum(high, low)
+        fpis = np.where(benefit[:, None], weighted_max, weighted_min)
+        fnis = np.where(benefit[:, None], weighted_min, weighted_max)
+        self.block_scale, self.fpis, self.fnis, self.block_weights = (
+            a.astype(self.dtype) for a in (self.scale, fpis, fnis, self.weights))
+
+    def block_closeness(self, block):
+        weighted = normalize_fuzzy_columns(
+            block, self.criteria_types, self.block_scale) * self.block_weights
+        d_plus = self.kernel(weighted, self.fpis).sum(axis=1)
+        d_minus = self.kernel(weighted, self.fnis).sum(axis=1)
+        denominator = d_plus + d_minus
+        return np.divide(d_minus, denominator, out=np.zeros_like(denominator),
+                         where=denominator > 0)
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from alpha_cut_topsis import AlphaCutFuzzyTOPSIS, alpha_levels_from
+
+
+def problem(seed, n=9, m=4):
+    rng = np.random.default_rng(seed)
+    lower = rng.uniform(1, 10, (n, m))
+    values = np.stack([lower, lower + rng.uniform(0, 2, (n, m)),
+                       lower + rng.uniform(2, 4, (n, m))], axis=2)
+    return values, np.sort(rng.uniform(0.1, 1, (m, 3)), axis=1), rng.random(m) < 0.5
+
+
+def naive_intervals(engine):
+    """The closeness intervals of the class docstring, one level and site at a time"""
+    weighted = engine.weighted_matrix()
+    n, m = engine.n_alternatives, engine.n_criteria
+    cc_lower = np.zeros((len(engine.levels), n))
+    cc_upper = np.zeros_like(cc_lower)
+    for level, alpha in enumerate(engine.levels):
+        cuts = [[(a + alpha * (b - a), c - alpha * (c - b)) for a, b, c in row] for row in weighted]
+        pis, nis = [], []
+        for j in range(m):
+            highest = max(cuts[i][j][1] for i in range(n))
+            lowest = min(cuts[i][j][0] for i in range(n))
+            pis.append(highest if engine.criteria_types[j] else lowest)
+            nis.append(lowest if engine.criteria_types[j] else highest)
+        for i in range(n):
+            def distances(ideal):
+                nearest = farthest = 0.0
+                for (low, high), point in zip(cuts[i], ideal):
+                    nearest += 0.0 if low <= point <= high else min(abs(low - point),
+                                                                   abs(high - point))
+                    farthest += max(abs(low - point), abs(high - point))
+                return nearest, farthest
+            plus_min, plus_max = distances(pis)
+            minus_min, minus_max = distances(nis)
+            cc_lower[level, i] = minus_min / (minus_min + plus_max)
+            cc_upper[level, i] = minus_max / (minus_max + plus_min)
+    return cc_lower, cc_upper
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('block_cells', [1, 4_000_000])
+def test_intervals_match_naive_computation(seed, block_cells):
+    engine = AlphaCutFuzzyTOPSIS(*problem(seed), alpha_levels=5, block_cells=block_cells)
+
+    cc_lower, cc_upper = engine.closeness_intervals()
+
+    expected_lower, expected_upper = naive_intervals(engine)
+    np.testing.assert_allclose(cc_lower, expected_lower, rtol=1e-12)
+    np.testing.assert_allclose(cc_upper, expected_upper, rtol=1e-12)
+
+
+def test_points_inside_the_cuts_have_closeness_inside_the_interval():
+    engine = AlphaCutFuzzyTOPSIS(*problem(3), alpha_levels=[0.0, 0.5, 0.9])
+    cc_lower, cc_upper = engine.closeness_intervals()
+    weighted = engine.weighted_matrix()
+    lower, upper = engine.cuts(weighted)
+    pis, nis = engine.ideal_solutions(weighted)
+    rng = np.random.default_rng(0)
+
+    for _ in range(200):
+        point = lower + rng.random(lower.shape) * (upper - lower)
+        d_plus = np.abs(point - pis[:, None, :]).sum(axis=-1)
+        d_minus = np.abs(point - nis[:, None, :]).sum(axis=-1)
+        cc = d_minus / (d_minus + d_plus)
+        assert np.all(cc >= cc_lower - 1e-12)
+        assert np.all(cc <= cc_upper + 1e-12)
+
+
+def test_crisp_input_gives_point_intervals():
+    values, weights, criteria_types = problem(4)
+    values[:] = values[:, :, 1:2]
+    weights[:] = weights[:, 1:2]
+
+    defuzzified, cc_lower, cc_upper = AlphaCutFuzzyTOPSIS(values, weights,
+                                                          criteria_types).closeness()
+
+    np.testing.assert_allclose(cc_lower, cc_upper, rtol=1e-12)
+    np.testing.assert_allclose(defuzzified, cc_lower[0], rtol=1e-12)
+
+
+@pytest.mark.parametrize('value', [1, True, [], [-0.1, 0.5], [0.5, 1.5]])
+def test_invalid_alpha_levels_are_rejected(value):
+    with pytest.raises(ValueError):
+        alpha_levels_from(value)
+
+
+def test_alpha_levels_from_a_list_are_sorted_and_unique():
+    assert alpha_levels_from([1, 0.5, 0.5, 0]).tolist() == [0.0, 0.5, 1.0]
@@ -0,0 +1,230 @@
+import threading
+
+import numpy as np
+import pytest
+
+import app as app_module
+from app import app
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_sensitivity_rejects_non_finite_weights(client):
+    response = client.post('/api/crisp-topsis/sensitivity', json={
+        'alternatives': [[1, 2], [3, 4]],
+        'weights': [1, None],
+        'criteria_types': [True, True]
+    })
+
+    assert response.status_code == 400
+    assert 'finite' in response.get_json()['error']
+
+
+def test_sensitivity_rejects_non_finite_alternatives(client):
+    response = client.post('/api/crisp-topsis/sensitivity', json={
+        'alternatives': [[1, None], [3, 4]],
+        'weights': [1, 1],
+        'criteria_types': [True, True]
+    })
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('body', ['[1, 2]', '"alternatives"', '{not json'])
+def test_analyze_rejects_json_body_that_is_not_an_object(client, body):
+    response = client.post('/api/crisp-topsis/analyze', data=body,
+                           content_type='application/json')
+
+    assert response.status_code == 400
+    assert 'JSON object' in response.get_json()['error']
+
+
+CRISP = {
+    'alternatives': [[250, 16, 12, 5], [200, 16, 8, 3], [300, 32, 16, 4], [275, 32, 8, 4]],
+    'weights': [0.25, 0.25, 0.25, 0.25],
+    'criteria_types': [False, True, True, True]
+}
+
+
+def tfn(value):
+    return {'lower': value * 0.9, 'most_likely': value, 'upper': value * 1.1}
+
+
+FUZZY = {
+    'alternatives': [[tfn(v) for v in row] for row in CRISP['alternatives']],
+    'weights': [tfn(w) for w in CRISP['weights']],
+    'criteria_types': CRISP['criteria_types']
+}
+
+# Routes that read alternatives, weights and criteria_types with
+# validate_topsis_payload, with a valid body for each
+PAYLOAD_ROUTES = [
+    ('/api/crisp-topsis/analyze', CRISP),
+    ('/api/promethee/analyze', CRISP),
+    ('/api/ensemble/analyze', CRISP),
+    ('/api/crisp-topsis/sensitivity', CRISP),
+    ('/api/crisp-topsis/weight-sweep', {**CRISP, 'criterion': 0, 'range': [0, 1]}),
+    ('/api/crisp-topsis/sobol', {**CRISP, 'samples': 16}),
+    ('/api/crisp-topsis/bootstrap-ranks',
+     {**CRISP, 'yearly': [[5, 6], [4, 5], [6, 7], [5, 5]], 'resamples': 20}),
+    ('/api/fuzzy-topsis/analyze', FUZZY),
+    ('/api/fuzzy-topsis/alpha-cut', FUZZY),
+    ('/api/topsis/compare', FUZZY),
+    ('/api/fuzzy-topsis/sobol', {**FUZZY, 'samples': 16}),
+    ('/api/fuzzy-topsis/rank-stability', {**FUZZY, 'seed': 1, 'max_samples': 200})
+]
+
+
+@pytest.mark.parametrize('route,body', PAYLOAD_ROUTES)
+def test_payload_routes_accept_valid_body(client, route, body):
+    response = client.post(route, json=body)
+
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['success']
+
+
+@pytest.mark.parametrize('field', ['alternatives', 'weights', 'criteria_types'])
+@pytest.mark.parametrize('route,body', PAYLOAD_ROUTES)
+def test_payload_routes_reject_missing_field(client, route, body, field):
+    response = client.post(route, json={k: v for k, v in body.items() if k != field})
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == f'Invalid input data: Invalid or missing {field}'
+
+
+@pytest.mark.parametrize('route', ['/api/crisp-topsis/analyze-scenarios',
+                                   '/api/fuzzy-topsis/analyze-scenarios'])
+def test_scenario_routes_reject_missing_weight_sets(client, route):
+    body = CRISP if 'crisp' in route else FUZZY
+    response = client.post(route, json={k: v for k, v in body.items() if k != 'weights'})
+
+    assert response.status_code == 400
+    assert 'weight_sets' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('job_type', ['crisp-topsis', 'fuzzy-topsis', 'rank-stability'])
+def test_job_submission_rejects_missing_weights(client, job_type):
+    body = CRISP if job_type == 'crisp-topsis' else FUZZY
+    response = client.post('/api/jobs', json={
+        'job_type': job_type,
+        **{k: v for k, v in body.items() if k != 'weights'}
+    })
+
+    assert response.status_code == 400
+    assert 'weights' in response.get_json()['error']
+
+
+def test_rank_stability_rejects_distance_kernel(client):
+    response = client.post('/api/fuzzy-topsis/rank-stability',
+                           json={**FUZZY, 'distance': 'hamming'})
+
+    assert response.status_code == 400
+    assert 'distance' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('weights', [None, FUZZY['weights']])
+def test_fuzzy_session_ranks_with_requested_distance(client, weights):
+    body = {**FUZZY, 'type': 'fuzzy', 'distance': 'hamming'}
+    if weights is None:
+        del body['weights']
+    created = client.post('/api/sessions', json=body).get_json()
+    assert created['distance'] == 'hamming'
+
+    if weights is None:
+        rankings = client.post(f"/api/sessions/{created['session_id']}/rank",
+                               json={'weights': FUZZY['weights']}).get_json()['rankings']
+    else:
+        rankings = created['rankings']
+    expected = client.post('/api/fuzzy-topsis/analyze',
+                           json={**FUZZY, 'distance': 'hamming'}).get_json()['rankings']
+
+    assert [r['alternative_index'] for r in rankings] == \
+        [r['alternative_index'] for r in expected]
+    assert [r['closeness_coefficient'] for r in rankings] == \
+        pytest.approx([r['closeness_coefficient'] for r in expected])
+
+
+@pytest.mark.parametrize('route,extra', [
+    ('/api/streaming-topsis/analyze', {}),
+    ('/api/jobs', {'job_type': 'streaming-topsis'})
+])
+@pytest.mark.parametrize('output_path', ['matrix.npy', './sub/../matrix.npy', 'link.npy'])
+def test_streaming_rejects_output_path_over_the_matrix(client, tmp_path, monkeypatch, route,
+                                                       extra, output_path):
+    monkeypatch.setenv('TOPSIS_DATA_DIR', str(tmp_path))
+    np.save(tmp_path / 'matrix.npy', np.array(CRISP['alternatives'], dtype=float))
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'link.npy').symlink_to(tmp_path / 'matrix.npy')
+
+    response = client.post(route, json={
+        **extra, 'matrix_path': 'matrix.npy', 'output_path': output_path,
+        'weights': CRISP['weights'], 'criteria_types': CRISP['criteria_types']
+    })
+
+    assert response.status_code == 400
+    assert 'output_path' in response.get_json()['error']
+    assert np.load(tmp_path / 'matrix.npy').shape == (4, 4)
+
+
+@pytest.fixture
+def queued_job():
+    job_id = app_module.job_manager.store.create('crisp-topsis')
+    yield job_id
+    app_module.job_manager.store.delete(job_id)
+
+
+def test_job_event_streams_are_capped_per_worker(client, monkeypatch, queued_job):
+    monkeypatch.setattr(app_module, 'job_event_streams', threading.BoundedSemaphore(1))
+    url = f'/api/jobs/{queued_job}/events'
+
+    first = client.get(url, buffered=False)
+    assert first.status_code == 200
+    assert client.get(url).status_code == 503
+
+    first.close()
+    second = client.get(url, buffered=False)
+    assert second.status_code == 200
+    second.close()
+
+
+@pytest.mark.parametrize('limits,keep_alives', [
+    ({'JOB_EVENT_HEARTBEAT_SECONDS': 0, 'JOB_EVENT_IDLE_HEARTBEATS': 2}, 2),
+    ({'JOB_EVENT_MAX_SECONDS': 0}, 0)
+])
+def test_job_event_stream_ends_without_progress(client, monkeypatch, queued_job, limits,
+                                                keep_alives):
+    monkeypatch.setenv('TOPSIS_JOB_EVENT_INTERVAL', '0.01')
+    for name, value in limits.items():
+        monkeypatch.setattr(app_module, name, value)
+
+    body = client.get(f'/api/jobs/{queued_job}/events').get_data(as_text=True)
+
+    assert body.startswith('event: progress\n')
+    assert body.count(': keep-alive') == keep_alives
+    assert body.rstrip().split('\n')[-2] == 'event: timeout'
+
+
+def test_incremental_session_can_be_edited_from_another_worker(client):
+    created = client.post('/api/sessions', json={**CRISP, 'type': 'crisp'}).get_json()
+    session_id = created['session_id']
+    assert created['shared']
+
+    # Another worker only has the shared store, not this worker's copy
+    app_module.session_store.delete(session_id)
+    added = client.post(f'/api/sessions/{session_id}/alternatives',
+                        json={'values': [220, 32, 16, 5]})
+    app_module.session_store.delete(session_id)
+    removed = client.delete(f'/api/sessions/{session_id}/alternatives/0')
+
+    assert added.status_code == 200
+    assert added.get_json()['alternative_index'] == 4
+    assert removed.status_code == 200
+    assert removed.get_json()['n_alternatives'] == 4
+
+    assert client.delete(f'/api/sessions/{session_id}').status_code == 200
+    response = client.post(f'/api/sessions/{session_id}/alternatives',
+                           json={'values': [220, 32, 16, 5]})
+    assert response.status_code == 404
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from app import CrispTOPSIS, app
+from batch import BatchProblem, run_batch
+from jobs import ProcessPool
+from vectorized_topsis import VectorizedFuzzyTOPSIS
+
+
+def tfn(value):
+    return {'lower': value * 0.9, 'most_likely': value, 'upper': value * 1.1}
+
+
+def problems(rng):
+    """Crisp and fuzzy problems in two shapes, plus one invalid problem"""
+    items = []
+    for n, m in [(6, 3), (6, 3), (9, 4)]:
+        values = rng.uniform(1, 10, (n, m))
+        types = (rng.random(m) < 0.5).tolist()
+        items.append(BatchProblem('crisp', values.tolist(), rng.uniform(0.1, 1, m).tolist(), types))
+        items.append(BatchProblem('fuzzy', [[tfn(v) for v in row] for row in values],
+                                  [tfn(w) for w in rng.uniform(0.1, 1, m)], types, top_k=2,
+                                  distance='hamming'))
+    items.insert(3, ValueError('Invalid or missing weights'))
+    return items
+
+
+def expected_closeness(item):
+    if item.type == 'fuzzy':
+        return VectorizedFuzzyTOPSIS(item.values, item.weights, item.criteria_types,
+                                     distance=item.distance).closeness()
+    return CrispTOPSIS(item.values, item.weights, item.criteria_types).closeness()
+
+
+def assert_matches_single_runs(items, results):
+    for item, result in zip(items, results):
+        if isinstance(item, Exception):
+            assert result == {'success': False, 'error': f'Invalid input data: {item}'}
+            continue
+        cc = expected_closeness(item)
+        order = np.argsort(-cc, kind='stable')[:item.top_k]
+        assert [r['alternative_index'] for r in result['rankings']] == order.tolist()
+        np.testing.assert_allclose([r['closeness_coefficient'] for r in result['rankings']],
+                                   cc[order], rtol=1e-12)
+        assert ('summary' in result) == (item.top_k is not None)
+
+
+@pytest.mark.parametrize('chunk_bytes', [1, 64 * 1024 * 1024])
+def test_batch_matches_one_run_per_problem(chunk_bytes):
+    items = problems(np.random.default_rng(0))
+
+    results, info = run_batch(items, chunk_bytes=chunk_bytes)
+
+    assert_matches_single_runs(items, results)
+    assert info['groups'] == 4
+    assert info['chunks'] == (6 if chunk_bytes == 1 else 4)
+    assert not info['parallel']
+
+
+def test_large_batches_run_across_the_pool():
+    items = problems(np.random.default_rng(1))
+    pool = ProcessPool(1)
+    try:
+        results, info = run_batch(items, pool, parallel_cells=0)
+    finally:
+        pool.shutdown()
+
+    assert info['parallel']
+    assert_matches_single_runs(items, results)
+
+
+def test_batch_route_reports_invalid_problems_in_place():
+    response = app.test_client().post('/api/batch', json={'problems': [
+        {'id': 'a', 'type': 'crisp', 'alternatives': [[1, 2], [3, 4]], 'weights': [1, 1],
+         'criteria_types': [True, True]},
+        {'id': 'b', 'type': 'crisp', 'alternatives': [[1, 2], [3, 4]], 'weights': [1],
+         'criteria_types': [True, True]},
+        'not a problem'
+    ]})
+
+    results = response.get_json()['results']
+    assert response.status_code == 200
+    assert [r['success'] for r in results] == [True, False, False]
+    assert [r.get('id') for r in results] == ['a', 'b', None]
+    assert [r['alternative_index'] for r in results[0]['rankings']] == [1, 0]
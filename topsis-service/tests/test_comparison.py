@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from app import app
+from comparison import compare_rankings, count_inversions, kendall_tau_b, spearman
+
+
+def naive_tau_b(x, y):
+    n = len(x)
+    concordant = discordant = x_only = y_only = 0
+    for i in range(n):
+        for j in range(i + 1, n):
+            dx, dy = np.sign(x[i] - x[j]), np.sign(y[i] - y[j])
+            if dx and dy:
+                concordant += dx == dy
+                discordant += dx != dy
+            elif dx:
+                x_only += 1
+            elif dy:
+                y_only += 1
+    denominator = np.sqrt((concordant + discordant + x_only)
+                          * (concordant + discordant + y_only))
+    return (concordant - discordant) / denominator if denominator else 0.0
+
+
+def naive_ranks(values):
+    """1-based average ranks in descending order"""
+    return np.array([np.sum(values > v) + (np.sum(values == v) + 1) / 2 for v in values])
+
+
+@pytest.mark.parametrize('n', [1, 2, 7, 64, 129])
+@pytest.mark.parametrize('levels', [3, 1000])
+def test_kendall_tau_b_matches_pairwise_count(n, levels):
+    # Few levels means many ties in both inputs and in the joint pairs
+    rng = np.random.default_rng(n * levels)
+    x = rng.integers(0, levels, n) / levels
+    y = np.where(rng.random(n) < 0.5, x, rng.integers(0, levels, n) / levels)
+
+    assert kendall_tau_b(x, y) == pytest.approx(naive_tau_b(x, y), abs=1e-12)
+
+
+def test_count_inversions_matches_pairwise_count():
+    values = np.random.default_rng(5).integers(0, 20, 101)
+
+    expected = sum(int(values[i] > values[j])
+                   for i in range(101) for j in range(i + 1, 101))
+
+    assert count_inversions(values) == expected
+
+
+def test_spearman_is_pearson_of_average_ranks():
+    rng = np.random.default_rng(6)
+    x, y = rng.integers(0, 5, 30), rng.integers(0, 5, 30)
+
+    expected = np.corrcoef(naive_ranks(x), naive_ranks(y))[0, 1]
+
+    assert spearman(x, y) == pytest.approx(expected, abs=1e-12)
+
+
+def test_compare_rankings_reports_rank_changes():
+    comparison = compare_rankings([0.9, 0.5, 0.7], [0.6, 0.8, 0.4])
+
+    assert comparison['sites']['fuzzy_rank'].tolist() == [1, 3, 2]
+    assert comparison['sites']['crisp_rank'].tolist() == [2, 1, 3]
+    assert comparison['sites']['rank_change'].tolist() == [-1, 2, -1]
+    assert comparison['metrics']['sites_with_rank_changes'] == 3
+    assert comparison['metrics']['max_rank_difference'] == 2
+    assert comparison['metrics']['kendall_tau_b'] == pytest.approx(-1 / 3)
+
+
+def test_compare_route_uses_sites_present_in_both_rankings():
+    def records(scores):
+        order = sorted(scores, key=scores.get, reverse=True)
+        return [{'alternative_index': i, 'closeness_coefficient': scores[i], 'rank': rank}
+                for rank, i in enumerate(order, 1)]
+
+    response = app.test_client().post('/api/rankings/compare', json={
+        'fuzzy_rankings': records({0: 0.9, 2: 0.7, 3: 0.2}),
+        'crisp_rankings': records({2: 0.8, 0: 0.6, 1: 0.5})
+    })
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['sites']['alternative_index'] == [0, 2]
+    assert body['sites']['rank_change'] == [-1, 1]
+    assert body['metrics']['kendall_tau_b'] == pytest.approx(-1.0)
+
+
+def test_compare_rejects_rankings_of_different_lengths():
+    with pytest.raises(ValueError):
+        compare_rankings([0.1, 0.2], [0.1, 0.2, 0.3])
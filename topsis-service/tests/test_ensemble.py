@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from app import CrispTOPSIS
+from ensemble import (SharedDecisionMatrix, borda_scores, copeland_scores, run_ensemble,
+                      topsis_scores)
+
+
+def shared_matrix():
+    rng = np.random.default_rng(3)
+    return SharedDecisionMatrix(rng.random((6, 3)) + 0.1, [0.5, 0.3, 0.2], [True, False, True])
+
+
+def test_repeated_methods_get_a_single_vote():
+    shared = shared_matrix()
+
+    scores, ranks, consensus = run_ensemble(shared, ['vikor', 'topsis', 'vikor', 'vikor'])
+    _, _, expected = run_ensemble(shared, ['vikor', 'topsis'])
+
+    assert list(scores) == ['vikor', 'topsis']
+    assert ranks.shape == (2, 6)
+    assert consensus.tolist() == expected.tolist()
+
+
+def random_ranks(seed, n_methods, n):
+    rng = np.random.default_rng(seed)
+    return np.stack([rng.permutation(n) for _ in range(n_methods)])
+
+
+def test_topsis_scores_match_crisp_topsis():
+    shared = shared_matrix()
+
+    scores = topsis_scores(shared, {})
+
+    np.testing.assert_allclose(scores, CrispTOPSIS(shared.alternatives, shared.weights,
+                                                   shared.benefit.tolist()).closeness())
+
+
+def test_borda_scores_count_alternatives_ranked_below():
+    ranks = random_ranks(0, 4, 9)
+
+    expected = [sum(int(np.sum(row > row[a])) for row in ranks) for a in range(9)]
+
+    assert borda_scores(ranks).tolist() == expected
+
+
+# An even number of methods leaves some pairs tied, which count for neither side
+@pytest.mark.parametrize('n_methods', [3, 4])
+@pytest.mark.parametrize('block_cells', [1, 40, 4_000_000])
+def test_copeland_scores_match_pairwise_majorities(n_methods, block_cells):
+    ranks = random_ranks(n_methods, n_methods, 11)
+
+    expected = []
+    for a in range(11):
+        score = 0
+        for b in range(11):
+            ahead = int(np.sum(ranks[:, a] < ranks[:, b]))
+            behind = int(np.sum(ranks[:, a] > ranks[:, b]))
+            score += (ahead > behind) - (ahead < behind)
+        expected.append(score)
+
+    assert copeland_scores(ranks, block_cells).tolist() == expected
+
+
+def test_lower_is_better_methods_rank_ascending():
+    shared = shared_matrix()
+
+    scores, ranks, _ = run_ensemble(shared, ['vikor', 'topsis'])
+
+    assert np.argsort(ranks[0]).tolist() == np.argsort(scores['vikor'], kind='stable').tolist()
+    assert np.argsort(ranks[1]).tolist() == \
+        np.argsort(-scores['topsis'], kind='stable').tolist()
+    assert scores['vikor'].min() == 0 and scores['vikor'].max() <= 1
+
+
+@pytest.mark.parametrize('methods,consensus', [([], 'borda'), (['ahp'], 'borda'),
+                                               (['topsis'], 'median')])
+def test_unknown_methods_and_consensus_are_rejected(methods, consensus):
+    with pytest.raises(ValueError):
+        run_ensemble(shared_matrix(), methods, consensus)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from fuzzy_kernels import DEFUZZIFIERS, DISTANCE_KERNELS
+from sessions import DecisionSession
+from streaming_topsis import StreamingFuzzyTOPSIS
+from vectorized_topsis import VectorizedFuzzyTOPSIS
+
+
+def fuzzy_problem(n=40, m=5, seed=0):
+    rng = np.random.default_rng(seed)
+    lower = rng.uniform(1, 10, (n, m))
+    values = np.stack([lower, lower + rng.uniform(0, 2, (n, m)),
+                       lower + rng.uniform(2, 4, (n, m))], axis=2)
+    weights = np.sort(rng.uniform(0.1, 1, (m, 3)), axis=1)
+    criteria_types = rng.random(m) < 0.5
+    return values, weights, criteria_types
+
+
+def test_registry_names():
+    assert sorted(DISTANCE_KERNELS) == [
+        'centroid', 'euclidean-centroid', 'graded-mean', 'hamming', 'vertex']
+    assert sorted(DEFUZZIFIERS) == ['centroid', 'graded-mean']
+    assert DISTANCE_KERNELS['euclidean-centroid'] is DISTANCE_KERNELS['centroid']
+
+
+@pytest.mark.parametrize('distance,expected', [
+    ('vertex', np.sqrt(14 / 3)),
+    ('hamming', 2.0),
+    ('centroid', 2.0),
+    ('euclidean-centroid', 2.0),
+    ('graded-mean', 2.0)
+])
+def test_distance_kernel_values(distance, expected):
+    x = np.array([1.0, 2.0, 3.0])
+    y = np.array([2.0, 4.0, 6.0])
+    assert DISTANCE_KERNELS[distance](x, y) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('distance', sorted(DISTANCE_KERNELS))
+def test_session_closeness_uses_distance_kernel(distance):
+    values, weights, criteria_types = fuzzy_problem()
+    topsis = VectorizedFuzzyTOPSIS(values, weights, criteria_types, distance=distance)
+    session = DecisionSession(topsis.normalize_fuzzy_matrix(), criteria_types, distance=distance)
+
+    np.testing.assert_allclose(session.closeness(weights), topsis.closeness(), rtol=1e-12)
+
+
+@pytest.mark.parametrize('distance', sorted(DISTANCE_KERNELS))
+def test_incremental_session_uses_distance_kernel(distance):
+    values, weights, criteria_types = fuzzy_problem()
+    engine = VectorizedFuzzyTOPSIS(values, weights, criteria_types, distance=distance).incremental()
+
+    expected = VectorizedFuzzyTOPSIS(values, weights, criteria_types, distance=distance)
+    np.testing.assert_allclose(engine.closeness(), expected.closeness(), rtol=1e-12)
+
+
+@pytest.mark.parametrize('distance', sorted(DISTANCE_KERNELS))
+def test_streaming_fuzzy_uses_distance_kernel(tmp_path, distance):
+    values, weights, criteria_types = fuzzy_problem()
+    engine = StreamingFuzzyTOPSIS(values, weights, criteria_types, block_rows=7,
+                                  distance=distance)
+    output_path = str(tmp_path / 'closeness.npy')
+    engine.run(top_k=None, output_path=output_path)
+
+    expected = VectorizedFuzzyTOPSIS(values, weights, criteria_types, distance=distance)
+    np.testing.assert_allclose(np.load(output_path), expected.closeness(), rtol=1e-12)
+
+
+def test_unknown_distance_is_rejected():
+    values, weights, criteria_types = fuzzy_problem()
+    with pytest.raises(ValueError):
+        DecisionSession(values, criteria_types, distance='manhattan')
+    with pytest.raises(ValueError):
+        StreamingFuzzyTOPSIS(values, weights, criteria_types, distance='manhattan')
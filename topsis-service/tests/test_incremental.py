@@ -0,0 +1,161 @@
+import numpy as np
+import pytest
+
+from incremental import IncrementalCrispTOPSIS, IncrementalFuzzyTOPSIS
+from sessions import IncrementalSessionStore
+from vectorized_topsis import VectorizedFuzzyTOPSIS, crisp_closeness_batch
+
+
+def crisp_rebuild(rows, weights, criteria_types):
+    return crisp_closeness_batch(np.array(rows), weights, criteria_types)
+
+
+def fuzzy_rebuild(rows, weights, criteria_types):
+    return VectorizedFuzzyTOPSIS(np.array(rows), weights, criteria_types).closeness()
+
+
+def random_crisp_row(rng, m):
+    return rng.uniform(0, 10, m)
+
+
+def random_fuzzy_row(rng, m):
+    lower = rng.uniform(0, 10, m)
+    return np.stack([lower, lower + rng.uniform(0, 2, m), lower + rng.uniform(2, 4, m)], axis=1)
+
+
+ENGINES = [
+    (IncrementalCrispTOPSIS, crisp_rebuild, random_crisp_row, lambda rng, m: rng.uniform(-0.2, 1, m)),
+    (IncrementalFuzzyTOPSIS, fuzzy_rebuild, random_fuzzy_row,
+     lambda rng, m: np.sort(rng.uniform(0.1, 1, (m, 3)), axis=1))
+]
+
+
+def assert_matches_rebuild(engine, rows, rebuild, weights, criteria_types):
+    ids = sorted(rows)
+    expected = rebuild([rows[i] for i in ids], weights, criteria_types)
+    order = np.argsort(-expected, kind='stable')
+
+    rankings = engine.rank()
+    assert [r['alternative_index'] for r in rankings] == [ids[i] for i in order]
+    np.testing.assert_allclose([r['closeness_coefficient'] for r in rankings],
+                               expected[order], rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize('engine_class,rebuild,random_row,random_weights', ENGINES)
+@pytest.mark.parametrize('seed', range(3))
+def test_edits_match_full_recompute(engine_class, rebuild, random_row, random_weights, seed):
+    rng = np.random.default_rng(seed)
+    m = 4
+    weights = random_weights(rng, m)
+    criteria_types = rng.random(m) < 0.5
+    initial = [random_row(rng, m) for _ in range(12)]
+    engine = engine_class(initial, weights, criteria_types)
+    rows = dict(enumerate(initial))
+
+    for step in range(60):
+        action = rng.integers(3) if len(rows) > 2 else 0
+        # Scaled rows push column extremes out; zero rows hit the degenerate case
+        values = random_row(rng, m) * rng.choice([0.0, 1.0, 5.0], p=[0.1, 0.7, 0.2])
+        if action == 0:
+            alternative_id, _ = engine.add(values)
+            rows[alternative_id] = values
+        elif action == 1:
+            alternative_id = int(rng.choice(list(rows)))
+            engine.update(alternative_id, values)
+            rows[alternative_id] = values
+        else:
+            alternative_id = int(rng.choice(list(rows)))
+            engine.remove(alternative_id)
+            del rows[alternative_id]
+
+        assert_matches_rebuild(engine, rows, rebuild, weights, criteria_types)
+
+
+@pytest.mark.parametrize('engine_class,rebuild,random_row,random_weights', ENGINES)
+def test_removing_the_column_extreme_rescans_it(engine_class, rebuild, random_row, random_weights):
+    rng = np.random.default_rng(7)
+    m = 3
+    weights = random_weights(rng, m)
+    criteria_types = [True, False, True]
+    rows = {i: random_row(rng, m) for i in range(6)}
+    rows[2] = rows[2] * 10
+    engine = engine_class([rows[i] for i in range(6)], weights, criteria_types)
+
+    engine.remove(2)
+    del rows[2]
+
+    assert_matches_rebuild(engine, rows, rebuild, weights, criteria_types)
+
+
+@pytest.mark.parametrize('engine_class,rebuild,random_row,random_weights', ENGINES)
+def test_edit_reports_rank_changes(engine_class, rebuild, random_row, random_weights):
+    rng = np.random.default_rng(3)
+    m = 3
+    engine = engine_class([random_row(rng, m) for _ in range(5)], random_weights(rng, m),
+                          [True, True, True])
+    before = {r['alternative_index']: r['rank'] for r in engine.rank()}
+
+    alternative_id, changes = engine.add(random_row(rng, m) * 5)
+
+    after = {r['alternative_index']: r['rank'] for r in engine.rank()}
+    assert {c['alternative_index'] for c in changes} == \
+        {i for i in after if before.get(i) != after[i]}
+    assert alternative_id == 5
+
+
+def test_unknown_alternative_and_last_removal_are_rejected():
+    engine = IncrementalCrispTOPSIS([[1.0, 2.0]], [0.5, 0.5], [True, False])
+    with pytest.raises(KeyError):
+        engine.update(9, [1.0, 1.0])
+    with pytest.raises(ValueError):
+        engine.remove(0)
+
+
+@pytest.mark.parametrize('engine_class,rebuild,random_row,random_weights', ENGINES)
+def test_edits_through_two_workers_apply_to_the_latest_state(tmp_path, engine_class, rebuild,
+                                                             random_row, random_weights):
+    rng = np.random.default_rng(5)
+    weights, criteria_types = random_weights(rng, 3), [True, False, True]
+    initial = [random_row(rng, 3) for _ in range(6)]
+    rows = dict(enumerate(initial))
+
+    # Each worker has its own store and its own cached copy of the engine
+    first, second = (IncrementalSessionStore(str(tmp_path / 'sessions.sqlite3')) for _ in range(2))
+    first_engine = engine_class(initial, weights, criteria_types)
+    first.create('session', first_engine)
+    second_engine = second.load('session')
+
+    first_engine, (new_id, _) = first.edit('session', first_engine,
+                                           lambda engine: engine.add(rows[0] * 3))
+    rows[new_id] = rows[0] * 3
+    engine, _ = second.edit('session', second_engine, lambda engine: engine.remove(2))
+    del rows[2]
+
+    # The second worker's copy was stale, so it edited the stored state
+    assert engine is not second_engine
+    assert_matches_rebuild(engine, rows, rebuild, weights, criteria_types)
+
+    # A failed edit is rolled back and the next edit reloads the engine
+    with pytest.raises(KeyError):
+        second.edit('session', engine, lambda engine: engine.remove(2))
+    reloaded, _ = second.edit('session', engine, lambda engine: engine.update(0, rows[1]))
+    assert reloaded is not engine
+    engine = reloaded
+    rows[0] = rows[1]
+    assert_matches_rebuild(engine, rows, rebuild, weights, criteria_types)
+
+    assert first.delete('session')
+    assert second.edit('session', engine, lambda engine: engine.remove(0)) is None
+
+
+def test_fuzzy_engine_with_a_defuzzifier_kernel_round_trips(tmp_path):
+    rng = np.random.default_rng(6)
+    engine = IncrementalFuzzyTOPSIS([random_fuzzy_row(rng, 3) for _ in range(5)],
+                                    np.ones((3, 3)), [True, True, False], distance='graded-mean')
+    store = IncrementalSessionStore(str(tmp_path / 'sessions.sqlite3'))
+    store.create('session', engine)
+
+    loaded = store.load('session')
+
+    assert loaded.kernel is engine.kernel
+    np.testing.assert_array_equal(loaded.closeness(), engine.closeness())
@@ -0,0 +1,150 @@
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from jobs import (
+    CANCELLED,
+    FAILED,
+    FINISHED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    JobManager,
+    JobQueueFull,
+    JobStore
+)
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_for(store, job_id, statuses, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f'job {job_id} still {job["status"]}')
+
+
+def create_in_exited_process(store):
+    """Create a queued job owned by a process that has already exited"""
+    code = ('import sys; from jobs import JobStore; '
+            'print(JobStore(sys.argv[1]).create("crisp-topsis"))')
+    output = subprocess.run(
+        [sys.executable, '-c', code, store.path], check=True, capture_output=True, text=True,
+        cwd=SERVICE_DIR
+    )
+    return output.stdout.strip()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / 'jobs.sqlite3'), ttl=3600)
+
+
+@pytest.fixture
+def manager(store):
+    manager = JobManager(store, max_workers=1, max_active=2)
+    yield manager
+    manager.shutdown()
+
+
+def crisp_params():
+    return {
+        'alternatives': np.array([[3.0, 1.0], [2.0, 2.0], [1.0, 3.0]]),
+        'weights': np.array([0.6, 0.4]),
+        'criteria_types': np.array([True, False])
+    }
+
+
+def test_submit_runs_job_to_completion(manager):
+    job_id = manager.submit('crisp-topsis', crisp_params())
+
+    job = wait_for(manager.store, job_id, FINISHED)
+
+    assert job['status'] == SUCCEEDED
+    assert job['progress'] == 1
+    rankings = manager.store.result(job_id)['rankings']
+    assert [r['alternative_index'] for r in rankings] == [0, 1, 2]
+
+
+def test_submit_rejects_unknown_job_type(manager):
+    with pytest.raises(ValueError):
+        manager.submit('no-such-job', crisp_params())
+
+
+def test_cancel_queued_job_never_starts(store):
+    job_id = store.create('crisp-topsis')
+
+    store.request_cancel(job_id)
+
+    assert store.get(job_id)['status'] == CANCELLED
+    assert not store.start(job_id)
+
+
+def test_cancel_running_job_stops_at_next_progress_report(manager):
+    rng = np.random.default_rng(0)
+    lower = rng.random((50, 4))
+    params = {
+        'alternatives': np.stack([lower, lower + 0.5, lower + 1.0], axis=2),
+        'weights': np.tile([0.5, 1.0, 1.5], (4, 1)),
+        'criteria_types': np.array([True, True, False, False]),
+        'options': {'tolerance': 1e-9, 'batch_size': 10, 'max_samples': 10 ** 9}
+    }
+    job_id = manager.submit('rank-stability', params)
+    wait_for(manager.store, job_id, (RUNNING,) + FINISHED)
+
+    manager.cancel(job_id)
+
+    assert wait_for(manager.store, job_id, FINISHED)['status'] == CANCELLED
+
+
+def test_finished_jobs_expire_after_ttl(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'), ttl=-1)
+    job_id = store.create('crisp-topsis')
+    store.start(job_id)
+
+    store.finish(job_id, SUCCEEDED, result={'rankings': []})
+
+    assert store.get(job_id) is None
+    assert store.result(job_id) is None
+
+
+def test_active_jobs_never_expire(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'), ttl=-1)
+    job_id = store.create('crisp-topsis')
+
+    assert store.get(job_id)['status'] == QUEUED
+    assert store.count_active() == 1
+
+
+def test_jobs_of_exited_process_are_failed(store):
+    job_id = create_in_exited_process(store)
+
+    job = store.get(job_id)
+
+    assert job['status'] == FAILED
+    assert 'orphaned' in job['error']
+    assert store.count_active() == 0
+
+
+def test_orphaned_jobs_do_not_fill_the_queue(manager):
+    for _ in range(manager.max_active):
+        create_in_exited_process(manager.store)
+
+    job_id = manager.submit('crisp-topsis', crisp_params())
+
+    assert wait_for(manager.store, job_id, FINISHED)['status'] == SUCCEEDED
+
+
+def test_queue_limit_counts_live_jobs(manager):
+    for _ in range(manager.max_active):
+        manager.store.create('crisp-topsis')
+
+    with pytest.raises(JobQueueFull):
+        manager.submit('crisp-topsis', crisp_params())
@@ -0,0 +1,16 @@
+import numpy as np
+import pytest
+
+from benchmarks.precision_tolerance import CLOSENESS_TOLERANCE, problems
+
+
+@pytest.mark.parametrize('problem', ['crisp', 'fuzzy'])
+def test_float32_closeness_is_within_the_documented_tolerance(problem):
+    _, values, weights, criteria_types, engine = [
+        p for p in problems(1000, np.random.default_rng(0)) if p[0] == problem][0]
+
+    cc64 = engine(values, weights, criteria_types, np.float64).closeness()
+    cc32 = engine(values.astype(np.float32), weights, criteria_types, np.float32).closeness()
+
+    assert cc32.dtype == np.float32
+    assert np.max(np.abs(cc32.astype(np.float64) - cc64)) <= CLOSENESS_TOLERANCE
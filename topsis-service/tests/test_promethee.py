@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from jobs import ProcessPool
+from promethee import PrometheeII
+
+
+def problem(seed, n=23, m=4):
+    rng = np.random.default_rng(seed)
+    # Rounded values so some differences are exactly zero
+    return np.round(rng.uniform(0, 10, (n, m)), 1), rng.uniform(0.1, 1, m), rng.random(m) < 0.5
+
+
+def naive_flows(matrix, weights, criteria_types, preference, q=None, p=None):
+    """Flows straight from the definition, one pair at a time"""
+    n = len(matrix)
+    weights = np.asarray(weights) / np.sum(weights)
+    pi = np.zeros((n, n))
+    for a in range(n):
+        for b in range(n):
+            if a == b:
+                continue
+            for j, w in enumerate(weights):
+                d = matrix[a, j] - matrix[b, j]
+                if not criteria_types[j]:
+                    d = -d
+                if preference == 'usual':
+                    degree = 1.0 if d > 0 else 0.0
+                else:
+                    degree = min(max((d - q[j]) / (p[j] - q[j]), 0.0), 1.0)
+                pi[a, b] += w * degree
+    plus, minus = pi.sum(axis=1) / (n - 1), pi.sum(axis=0) / (n - 1)
+    return plus, minus, plus - minus
+
+
+@pytest.mark.parametrize('preference', ['usual', 'linear'])
+@pytest.mark.parametrize('tile', [1, 5, 23, 256])
+def test_flows_match_naive_pairwise(preference, tile):
+    matrix, weights, criteria_types = problem(0)
+    thresholds = {} if preference == 'usual' else {
+        'indifference': [0.5, 0.0, 1.0, 0.2], 'preference_threshold': [2.0, 3.0, 4.0, 0.5]}
+
+    flows = PrometheeII(matrix, weights, criteria_types, preference, tile=tile,
+                        **thresholds).flows()
+
+    expected = naive_flows(matrix, weights, criteria_types, preference,
+                           thresholds.get('indifference'), thresholds.get('preference_threshold'))
+    for actual, wanted in zip(flows, expected):
+        np.testing.assert_allclose(actual, wanted, rtol=1e-12, atol=1e-15)
+    assert flows[2].sum() == pytest.approx(0, abs=1e-12)
+
+
+def test_pooled_bands_match_serial_flows():
+    matrix, weights, criteria_types = problem(1, n=40)
+    engine = PrometheeII(matrix, weights, criteria_types, tile=6)
+    pool = ProcessPool(2)
+    try:
+        pooled = engine.flows(pool)
+    finally:
+        pool.shutdown()
+
+    for actual, wanted in zip(pooled, engine.flows()):
+        np.testing.assert_allclose(actual, wanted, rtol=1e-12)
+
+
+@pytest.mark.parametrize('options', [
+    {'preference': 'gaussian'},
+    {'preference': 'linear'},
+    {'preference': 'linear', 'preference_threshold': [1, 1, 1, 1], 'indifference': [1, 0, 0, 0]},
+    {'preference': 'linear', 'preference_threshold': [1, 1, 1]}
+])
+def test_invalid_preference_settings_are_rejected(options):
+    matrix, weights, criteria_types = problem(2)
+    with pytest.raises(ValueError):
+        PrometheeII(matrix, weights, criteria_types, **options)
+
+
+def test_negative_or_zero_weights_are_rejected():
+    matrix, _, criteria_types = problem(3)
+    with pytest.raises(ValueError):
+        PrometheeII(matrix, [1, -1, 1, 1], criteria_types)
+    with pytest.raises(ValueError):
+        PrometheeII(matrix, [0, 0, 0, 0], criteria_types)
@@ -0,0 +1,28 @@
+import numpy as np
+
+from bootstrap import BootstrapRankConfidence
+from monte_carlo import RankTally
+
+
+def test_rank_tally_counts_ranks_and_pools_the_tail():
+    tally = RankTally(3, max_rank=1)
+    tally.add(np.array([[0.9, 0.5, 0.1], [0.2, 0.8, 0.1]]))
+
+    assert tally.samples == 2
+    assert tally.probabilities().tolist() == [[0.5, 0.5], [0.5, 0.5], [0.0, 1.0]]
+    sites = tally.sites(0.5, median=True, probabilities=True)
+    assert sites[2]['rank_interval'] == [None, None]
+    assert sites[2]['mean_rank'] == 3.0
+    assert sites[0]['rank_probabilities'] == [0.5]
+
+
+def test_bootstrap_result_does_not_depend_on_chunk_size():
+    rng = np.random.default_rng(0)
+    engine = BootstrapRankConfidence(rng.random((8, 3)), [1, 2, 3], [True, False, True],
+                                     rng.random((8, 6)), criterion=0, seed=4)
+
+    small = engine.run(200, chunk_bytes=1)
+    large = engine.run(200)
+
+    assert small['chunk_size'] == 1
+    assert small['sites'] == large['sites']
@@ -0,0 +1,88 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+import response_formats
+from app import app
+
+BODY = {
+    'alternatives': [[250, 16, 12, 5], [200, 16, 8, 3], [300, 32, 16, 4],
+                     [275, 32, 8, 4], [200, 16, 8, 3]],
+    'weights': [0.25, 0.25, 0.25, 0.25],
+    'criteria_types': [False, True, True, True]
+}
+
+
+def records(client, **extra):
+    return client.post('/api/crisp-topsis/analyze', json={**BODY, **extra}).get_json()
+
+
+def as_columns(rankings):
+    return {
+        'order': [r['alternative_index'] for r in rankings],
+        'closeness': [r['closeness_coefficient'] for r in rankings],
+        'rank': [r['rank'] for r in rankings]
+    }
+
+
+@pytest.mark.parametrize('top_k', [None, 2])
+def test_columnar_json_carries_the_same_rankings(top_k):
+    client = app.test_client()
+    extra = {} if top_k is None else {'top_k': top_k}
+    expected = records(client, **extra)
+
+    response = records(client, response_format='columnar', **extra)
+
+    assert {key: response[key] for key in ('order', 'closeness', 'rank')} == \
+        as_columns(expected['rankings'])
+    assert response.get('summary') == expected.get('summary')
+
+
+def test_npy_accept_header_returns_a_structured_array():
+    client = app.test_client()
+    expected = records(client)['rankings']
+
+    response = client.post('/api/crisp-topsis/analyze', json=BODY,
+                           headers={'Accept': 'application/x-npy'})
+
+    assert response.mimetype == 'application/x-npy'
+    array = np.load(io.BytesIO(response.data), allow_pickle=False)
+    assert array.dtype == response_formats.RANKING_DTYPE
+    assert as_columns(expected) == {
+        'order': array['alternative_index'].tolist(),
+        'closeness': array['closeness_coefficient'].tolist(),
+        'rank': array['rank'].tolist()
+    }
+
+
+def test_msgpack_accept_header_returns_the_columnar_payload():
+    msgpack = pytest.importorskip('msgpack')
+    client = app.test_client()
+    expected = records(client, response_format='columnar')
+
+    response = client.post('/api/crisp-topsis/analyze', json=BODY,
+                           headers={'Accept': 'application/msgpack'})
+
+    assert response.mimetype == 'application/msgpack'
+    assert msgpack.unpackb(response.data) == expected
+
+
+def test_stdlib_json_matches_orjson(monkeypatch):
+    payload = {'success': True, **response_formats.columnar_rankings(
+        np.array([0.25, 0.75, 0.5]), np.array([1, 2, 0]))}
+    encoded = json.loads(response_formats.dumps_json(payload))
+
+    monkeypatch.setattr(response_formats, 'orjson', None)
+
+    assert json.loads(response_formats.dumps_json(payload)) == encoded
+    assert encoded == {'success': True, 'order': [1, 2, 0],
+                       'closeness': [0.75, 0.5, 0.25], 'rank': [1, 2, 3]}
+
+
+def test_unknown_response_format_is_rejected():
+    response = app.test_client().post('/api/crisp-topsis/analyze',
+                                      json={**BODY, 'response_format': 'csv'})
+
+    assert response.status_code == 400
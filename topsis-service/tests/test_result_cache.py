@@ -0,0 +1,89 @@
+import io
+import json
+
+import numpy as np
+
+from app import app
+from result_cache import MemoryTier, ResultCache, SQLiteTier, cache_key
+
+
+def test_cache_key_depends_on_values_not_layout():
+    values = np.arange(6).reshape(2, 3)
+
+    key = cache_key('crisp-topsis', values, [1, 1, 1])
+
+    assert key == cache_key('crisp-topsis', values.astype(float).tolist(), np.ones(3))
+    assert key == cache_key('crisp-topsis', np.asfortranarray(values), [1.0, 1.0, 1.0])
+    assert key != cache_key('fuzzy-topsis', values, [1, 1, 1])
+    assert key != cache_key('crisp-topsis', values.reshape(3, 2), [1, 1, 1])
+
+
+def test_compute_runs_once_across_workers_sharing_the_file(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    first, second = ResultCache(shared_path=path), ResultCache(shared_path=path)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return np.array([0.25, 0.75])
+
+    assert first.get_or_compute('key', compute)[1] == 'miss'
+    assert first.get_or_compute('key', compute)[1] == 'memory'
+    value, source = second.get_or_compute('key', compute)
+
+    assert source == 'shared'
+    assert value.tolist() == [0.25, 0.75]
+    assert len(calls) == 1
+    second.flush_counters()
+    first.flush_counters()
+    assert first.stats()['shared']['counters'] == {'misses': 1, 'memory_hits': 1, 'shared_hits': 1}
+
+
+def test_memory_tier_evicts_least_recently_used():
+    tier = MemoryTier(max_bytes=3 * 8)
+    for key in 'abc':
+        tier.put(key, np.zeros(1))
+    tier.get('a')
+    tier.put('d', np.zeros(1))
+
+    assert tier.get('b') is None
+    assert tier.get('a') is not None
+    assert tier.stats()['bytes'] == 24
+
+
+def test_shared_tier_deletes_oldest_entries_past_its_budget(tmp_path):
+    tier = SQLiteTier(str(tmp_path / 'cache.sqlite3'), max_bytes=4 * 8)
+    for key in 'abc':
+        tier.put(key, np.zeros(2))
+
+    assert tier.get('a') is None
+    assert tier.get('c') is not None
+    assert tier.stats()['bytes'] <= 32
+
+
+def test_unusable_shared_tier_degrades_to_a_miss(tmp_path):
+    cache = ResultCache(shared_path=str(tmp_path))  # A directory, not a database
+
+    value, source = cache.get_or_compute('key', lambda: np.array([0.5]))
+
+    assert source == 'miss'
+    assert value.tolist() == [0.5]
+    assert cache.counters['shared_errors'] == 2
+
+
+def test_analyze_hits_the_cache_whatever_the_request_format():
+    client = app.test_client()
+    matrix = np.random.default_rng().uniform(1, 10, (5, 3))
+    params = {'weights': [0.5, 0.3, 0.2], 'criteria_types': [True, False, True]}
+
+    first = client.post('/api/crisp-topsis/analyze',
+                        json={'alternatives': matrix.tolist(), **params})
+    buffer = io.BytesIO()
+    np.save(buffer, matrix)
+    second = client.post('/api/crisp-topsis/analyze', data=buffer.getvalue(),
+                         content_type='application/x-npy',
+                         headers={'X-Topsis-Params': json.dumps(params)})
+
+    assert first.headers['X-Cache'] == 'miss'
+    assert second.headers['X-Cache'] == 'memory'
+    assert second.get_json()['rankings'] == first.get_json()['rankings']
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from app import CrispTOPSIS, app
+from vectorized_topsis import VectorizedFuzzyTOPSIS
+
+
+def crisp_engine(rng, weights):
+    return CrispTOPSIS(rng.uniform(0, 10, (25, 4)), weights, [True, False, True, False])
+
+
+def fuzzy_engine(rng, weights):
+    lower = rng.uniform(1, 10, (25, 4))
+    values = np.stack([lower, lower + 1, lower + 2], axis=2)
+    return VectorizedFuzzyTOPSIS(values, weights, [True, False, True, False],
+                                 distance='hamming')
+
+
+@pytest.mark.parametrize('make_engine,weight_shape', [
+    (crisp_engine, (4,)),
+    (fuzzy_engine, (4, 3))
+])
+def test_scenarios_match_one_run_per_weight_set(make_engine, weight_shape):
+    weight_sets = np.sort(np.random.default_rng(0).uniform(0.1, 1, (6,) + weight_shape), axis=-1)
+    engine = make_engine(np.random.default_rng(1), weight_sets[0])
+
+    closeness = engine.closeness_scenarios(weight_sets)
+
+    assert closeness.shape == (6, 25)
+    for weights, cc in zip(weight_sets, closeness):
+        single = make_engine(np.random.default_rng(1), weights)
+        np.testing.assert_allclose(cc, single.closeness(), rtol=1e-12)
+    assert engine.rank_scenarios(weight_sets)[3] == \
+        make_engine(np.random.default_rng(1), weight_sets[3]).rank()
+
+
+def test_crisp_scenario_route_matches_analyze():
+    client = app.test_client()
+    body = {
+        'alternatives': [[250, 16, 12], [200, 16, 8], [300, 32, 16], [275, 32, 8]],
+        'criteria_types': [False, True, True]
+    }
+    weight_sets = [[0.2, 0.5, 0.3], [0.6, 0.2, 0.2]]
+
+    response = client.post('/api/crisp-topsis/analyze-scenarios',
+                           json={**body, 'weight_sets': weight_sets})
+
+    scenarios = response.get_json()['scenario_rankings']
+    assert len(scenarios) == 2
+    for weights, rankings in zip(weight_sets, scenarios):
+        single = client.post('/api/crisp-topsis/analyze', json={**body, 'weights': weights})
+        assert rankings == single.get_json()['rankings']
+
+
+def test_scenario_weight_sets_must_match_criteria():
+    response = app.test_client().post('/api/crisp-topsis/analyze-scenarios', json={
+        'alternatives': [[1, 2], [3, 4]],
+        'weight_sets': [[0.5, 0.5], [1, 1, 1]],
+        'criteria_types': [True, True]
+    })
+
+    assert response.status_code == 400
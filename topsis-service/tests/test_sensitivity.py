@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from app import CrispTOPSIS
+from sensitivity import CrispWeightModel, quadratic_roots
+
+
+def problem(seed, n=12, m=4):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(1, 10, (n, m)), rng.uniform(0.1, 1, m), rng.random(m) < 0.5
+
+
+def brute_order(matrix, weights, criteria_types, criterion, t, top_k=None):
+    weights = np.array(weights, dtype=float)
+    weights[criterion] = t
+    cc = CrispTOPSIS(matrix, weights, criteria_types).closeness()
+    return np.argsort(-cc, kind='stable')[:top_k].tolist()
+
+
+def test_quadratic_roots_match_numpy():
+    rng = np.random.default_rng(0)
+    for a2, a1, a0 in rng.normal(size=(50, 3)):
+        expected = np.roots([a2, a1, a0])
+        expected = np.sort(expected[np.isreal(expected)].real)
+        roots = quadratic_roots(a2, a1, a0)
+        np.testing.assert_allclose(np.sort(roots[~np.isnan(roots)]), expected, rtol=1e-9)
+
+    assert quadratic_roots(0, 2, -1).tolist()[0] == 0.5
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_model_closeness_matches_crisp_topsis(seed):
+    matrix, weights, criteria_types = problem(seed)
+
+    np.testing.assert_allclose(CrispWeightModel(matrix, weights, criteria_types).closeness(weights),
+                               CrispTOPSIS(matrix, weights, criteria_types).closeness(),
+                               rtol=1e-12)
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('top_k', [1, 3])
+def test_stability_interval_is_where_the_top_k_order_holds(seed, top_k):
+    matrix, weights, criteria_types = problem(seed)
+    result = CrispWeightModel(matrix, weights, criteria_types).top_k_stability(top_k)
+
+    assert result['order'] == brute_order(matrix, weights, criteria_types, 0, weights[0], top_k)
+    for criterion in result['criteria']:
+        j = criterion['criterion_index']
+        lower, upper = criterion['weight_interval']
+        inside_high = weights[j] * 4 if upper is None else upper
+        for t in np.linspace(lower, inside_high, 23)[1:-1]:
+            assert brute_order(matrix, weights, criteria_types, j, t, top_k) == result['order']
+        if upper is not None:
+            assert brute_order(matrix, weights, criteria_types, j, upper * (1 + 1e-6),
+                               top_k) != result['order']
+        if lower > 0:
+            assert brute_order(matrix, weights, criteria_types, j, lower * (1 - 1e-6),
+                               top_k) != result['order']
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('top_k', [None, 2])
+def test_weight_sweep_matches_brute_force(seed, top_k):
+    matrix, weights, criteria_types = problem(seed)
+    model = CrispWeightModel(matrix, weights, criteria_types)
+
+    sweep = model.weight_sweep(1, 0.0, 3.0, top_k=top_k)
+
+    segments = sweep['segments']
+    assert segments[0]['weight_interval'][0] == 0.0
+    assert segments[-1]['weight_interval'][1] == 3.0
+    assert len(sweep['breakpoints']) == len(segments) - 1
+    for segment in segments:
+        low, high = segment['weight_interval']
+        for t in np.linspace(low, high, 7)[1:-1]:
+            assert brute_order(matrix, weights, criteria_types, 1, t, top_k) == segment['order']
+    for breakpoint, before, after in zip(sweep['breakpoints'], segments, segments[1:]):
+        assert before['order'] != after['order']
+        t = breakpoint['weight']
+        below = brute_order(matrix, weights, criteria_types, 1, t * (1 - 1e-7))
+        above = brute_order(matrix, weights, criteria_types, 1, t * (1 + 1e-7))
+        for ahead, behind in breakpoint['swaps']:
+            assert below.index(ahead) < below.index(behind)
+            assert above.index(ahead) > above.index(behind)
@@ -0,0 +1,103 @@
+import gc
+import logging
+import os
+import subprocess
+import sys
+import uuid
+
+import numpy as np
+import pytest
+
+from shared_matrices import SharedMatrixStore
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytestmark = pytest.mark.skipif(not os.path.isdir('/dev/shm'), reason='needs /dev/shm')
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SharedMatrixStore(str(tmp_path / 'shared.sqlite3'), ttl=60,
+                              prefix=f'test_{uuid.uuid4().hex[:8]}_')
+    yield store
+    store.release('session')
+    store.close()
+
+
+def publish_in_exited_process(store, key, array):
+    """Publish a block from a worker that exits without detaching"""
+    code = ('import sys, numpy as np; from shared_matrices import SharedMatrixStore; '
+            'SharedMatrixStore(sys.argv[1], prefix=sys.argv[2])'
+            '.publish(sys.argv[3], np.load(sys.argv[4]), {"criteria_types": [True, False]})')
+    array_path = store.path + '.npy'
+    np.save(array_path, array)
+    subprocess.run([sys.executable, '-c', code, store.path, store.prefix, key, array_path],
+                   check=True, cwd=SERVICE_DIR)
+
+
+def test_attach_maps_a_block_published_by_another_worker(store):
+    matrix = np.arange(12, dtype=float).reshape(6, 2)
+    publish_in_exited_process(store, 'session', matrix)
+
+    view, meta = store.attach('session')
+
+    np.testing.assert_array_equal(view, matrix)
+    assert not view.flags.writeable
+    assert meta == {'criteria_types': [True, False]}
+
+
+def test_released_block_of_a_dead_worker_is_unlinked(store):
+    publish_in_exited_process(store, 'session', np.ones((3, 2)))
+    store.attach('session')
+
+    assert store.release('session')
+
+    assert store.attach('session') is None
+    assert store.stats()['blocks'] == 0
+
+
+def test_released_block_stays_readable_through_existing_views(store):
+    store.publish('session', np.ones((3, 2)), {})
+    other = SharedMatrixStore(store.path, ttl=60, prefix=store.prefix)
+    view, _ = other.attach('session')
+
+    store.release('session')
+
+    # Released blocks are no longer handed out, but the mapping stays valid
+    assert other.attach('session') is None
+    assert view.sum() == 6
+    del view
+    other.close()
+
+
+def test_detach_keeps_a_referenced_mapping_until_its_views_are_dropped(store):
+    view = store.publish('session', np.ones((3, 2)), {})
+    column = view[:, 1]
+    del view
+
+    store.detach('session')
+    store.reap()
+
+    # The mapping outlives detach() while a derived view still uses it
+    assert store.stats()['closing_by_worker'] == 1
+    assert column.sum() == 3
+
+    del column
+    gc.collect()
+    store.reap()
+
+    assert store.stats()['closing_by_worker'] == 0
+
+
+def test_close_logs_mappings_that_are_still_referenced(store, caplog):
+    view = store.publish('session', np.ones((3, 2)), {})
+
+    with caplog.at_level(logging.WARNING, logger='shared_matrices'):
+        store.close()
+        store.close()
+
+    assert len(caplog.records) == 1
+    assert 'session' in caplog.records[0].getMessage()
+    del view
+    store.close()
+    assert store.stats()['closing_by_worker'] == 0
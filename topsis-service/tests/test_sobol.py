@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from app import CrispTOPSIS
+from sobol import (CrispTopCloseness, FuzzyTopCloseness, SobolWeightSensitivity, halton,
+                   saltelli_indices)
+from vectorized_topsis import VectorizedFuzzyTOPSIS
+
+
+def crisp_problem(seed, n=12):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(1, 10, (n, 4)), rng.uniform(0.1, 1, 4), [True, False, True, True]
+
+
+def fuzzy_problem(seed, n=12):
+    rng = np.random.default_rng(seed)
+    middle = rng.uniform(1, 10, (n, 4))
+    weights = rng.uniform(0.2, 1, 4)
+    return (np.stack([middle * 0.9, middle, middle * 1.2], axis=-1),
+            np.stack([weights * 0.8, weights, weights * 1.1], axis=-1),
+            [True, False, True, True])
+
+
+def test_plain_halton_matches_radical_inverse():
+    points = halton(4, 2)
+
+    np.testing.assert_allclose(points[:, 0], [1 / 2, 1 / 4, 3 / 4, 1 / 8])
+    np.testing.assert_allclose(points[:, 1], [1 / 3, 2 / 3, 1 / 9, 4 / 9])
+
+
+def test_scrambled_halton_stays_in_unit_cube_and_is_stratified():
+    points = halton(243, 3, np.random.default_rng(0))
+
+    assert np.all((points >= 0) & (points < 1))
+    # 243 = 3^5 points: every third of the base-3 axis gets the same count
+    assert np.bincount((points[:, 1] * 3).astype(int)).tolist() == [81, 81, 81]
+
+
+def test_saltelli_indices_recover_an_additive_model():
+    # f = sum c_j x_j with independent U(0, 1) inputs: S_j = S_Tj = c_j^2 / sum c^2
+    rng = np.random.default_rng(1)
+    coefficients = np.array([3.0, 2.0, 1.0, 0.0])
+    a, b = rng.random((200_000, 4)), rng.random((200_000, 4))
+    ab = np.repeat(a[None], 4, axis=0)
+    for j in range(4):
+        ab[j, :, j] = b[:, j]
+
+    first, total = saltelli_indices((a @ coefficients)[:, None], (b @ coefficients)[:, None],
+                                    (ab @ coefficients)[..., None])
+
+    expected = coefficients ** 2 / np.sum(coefficients ** 2)
+    np.testing.assert_allclose(first[:, 0], expected, atol=0.02)
+    np.testing.assert_allclose(total[:, 0], expected, atol=0.02)
+    assert total[3, 0] == 0
+
+
+def test_crisp_model_matches_crisp_topsis_with_scaled_weights():
+    alternatives, weights, criteria_types = crisp_problem(2)
+    model = CrispTopCloseness(alternatives, weights, criteria_types)
+    factors = np.random.default_rng(3).uniform(0.5, 1.5, (5, 4))
+    sites = np.array([7, 0, 3])
+
+    closeness = model.closeness(factors, sites)
+
+    for k, f in enumerate(factors):
+        expected = CrispTOPSIS(alternatives, weights * f, criteria_types).closeness()
+        np.testing.assert_allclose(closeness[k], expected[sites], rtol=1e-12)
+
+
+@pytest.mark.parametrize('distance', ['vertex', 'hamming'])
+def test_fuzzy_model_matches_vectorized_topsis_with_scaled_weights(distance):
+    alternatives, weights, criteria_types = fuzzy_problem(4)
+    model = FuzzyTopCloseness(alternatives, weights, criteria_types, distance)
+    factors = np.random.default_rng(5).uniform(0.5, 1.5, (5, 4))
+    sites = np.array([2, 11])
+
+    closeness = model.closeness(factors, sites)
+
+    for k, f in enumerate(factors):
+        expected = VectorizedFuzzyTOPSIS(alternatives, weights * f[:, None], criteria_types,
+                                         distance=distance).closeness()
+        np.testing.assert_allclose(closeness[k], expected[sites], rtol=1e-12)
+
+
+@pytest.mark.parametrize('sampling', ['halton', 'random'])
+@pytest.mark.parametrize('distribution', ['uniform', 'simplex'])
+def test_run_is_reproducible_and_independent_of_block_size(sampling, distribution):
+    engine = SobolWeightSensitivity(CrispTopCloseness(*crisp_problem(6)), top_k=3,
+                                    distribution=distribution)
+
+    result = engine.run(64, sampling, seed=7)
+    blocked = engine.run(64, sampling, seed=7, block_cells=1)
+
+    assert result == engine.run(64, sampling, seed=7)
+    assert result != engine.run(64, sampling, seed=8)
+    # Blocks only change the matrix products' summation order
+    for name in ('first_order', 'total'):
+        np.testing.assert_allclose(blocked[name], result[name], atol=1e-12)
+        for site, expected in zip(blocked['top_sites'], result['top_sites']):
+            np.testing.assert_allclose(site[name], expected[name], atol=1e-12)
+    assert result['evaluations'] == 64 * 6
+    assert [site['alternative_index'] for site in result['top_sites']] == \
+        engine.top_sites.tolist()
+
+
+def test_weight_of_a_constant_criterion_has_zero_indices():
+    alternatives, weights, criteria_types = crisp_problem(9)
+    alternatives[:, 2] = 5.0
+    engine = SobolWeightSensitivity(CrispTopCloseness(alternatives, weights, criteria_types),
+                                    top_k=4)
+
+    result = engine.run(256)
+
+    assert result['first_order'][2] == 0 and result['total'][2] == 0
+    for site in result['top_sites']:
+        assert site['total'][2] == 0
+    assert sum(result['total']) > 0
+
+
+@pytest.mark.parametrize('options', [{'distribution': 'normal'}, {'spread': 0},
+                                     {'spread': 1.5}, {'top_k': 0}, {'top_k': True}])
+def test_invalid_settings_are_rejected(options):
+    with pytest.raises(ValueError):
+        SobolWeightSensitivity(CrispTopCloseness(*crisp_problem(10)), **options)
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from streaming_topsis import StreamingCrispTOPSIS, StreamingFuzzyTOPSIS
+from vectorized_topsis import (
+    VectorizedFuzzyTOPSIS,
+    closeness_summary,
+    crisp_closeness_batch,
+    rankings_from_closeness
+)
+
+
+def crisp_problem(rng, n, m):
+    values = rng.uniform(0, 10, (n, m))
+    values[3] = 0  # A degenerate all-zero row
+    return values, rng.uniform(0.1, 1, m), rng.random(m) < 0.5
+
+
+def fuzzy_problem(rng, n, m):
+    lower = rng.uniform(-1, 10, (n, m))  # Some non-positive lower values
+    values = np.stack([lower, lower + rng.uniform(0, 2, (n, m)),
+                       lower + rng.uniform(2, 4, (n, m))], axis=2)
+    return values, np.sort(rng.uniform(0.1, 1, (m, 3)), axis=1), rng.random(m) < 0.5
+
+
+PROBLEMS = [
+    (StreamingCrispTOPSIS, crisp_problem,
+     lambda values, weights, types: crisp_closeness_batch(values, weights, types)),
+    (StreamingFuzzyTOPSIS, fuzzy_problem,
+     lambda values, weights, types: VectorizedFuzzyTOPSIS(values, weights, types).closeness())
+]
+
+
+@pytest.mark.parametrize('engine_class,problem,in_memory', PROBLEMS)
+@pytest.mark.parametrize('block_rows', [1, 7, 1000])
+def test_streaming_matches_in_memory_closeness(tmp_path, engine_class, problem, in_memory,
+                                               block_rows):
+    values, weights, criteria_types = problem(np.random.default_rng(block_rows), 50, 4)
+    matrix_path = str(tmp_path / 'matrix.npy')
+    output_path = str(tmp_path / 'closeness.npy')
+    np.save(matrix_path, values)
+
+    engine = engine_class(matrix_path, weights, criteria_types, block_rows)
+    result = engine.run(top_k=10, output_path=output_path)
+
+    expected = in_memory(values, weights, criteria_types)
+    np.testing.assert_allclose(np.load(output_path), expected, rtol=1e-12, atol=1e-15)
+
+    top = rankings_from_closeness(expected, 10)
+    assert [r['alternative_index'] for r in result['rankings']] == \
+        [r['alternative_index'] for r in top]
+    summary = closeness_summary(expected)
+    assert result['summary']['total'] == 50
+    assert result['summary']['mean'] == pytest.approx(summary['mean'])
+    assert result['summary']['histogram']['counts'] == summary['histogram']['counts']
+
+
+@pytest.mark.parametrize('engine_class,problem,in_memory', PROBLEMS)
+def test_float32_streaming_stays_close_to_float64(tmp_path, engine_class, problem, in_memory):
+    values, weights, criteria_types = problem(np.random.default_rng(0), 200, 5)
+    output_path = str(tmp_path / 'closeness.npy')
+
+    engine = engine_class(values, weights, criteria_types, 64, np.float32)
+    engine.run(top_k=0, output_path=output_path)
+
+    closeness = np.load(output_path)
+    assert closeness.dtype == np.float32
+    np.testing.assert_allclose(closeness, in_memory(values, weights, criteria_types), atol=1e-5)
+
+
+def test_streaming_rejects_mismatched_weights():
+    with pytest.raises(ValueError):
+        StreamingCrispTOPSIS(np.ones((4, 3)), [1, 1], [True, True, True])
+    with pytest.raises(ValueError):
+        StreamingFuzzyTOPSIS(np.ones((4, 3, 3)), np.ones((3,)), [True, True, True])
+
+
+def test_output_over_the_input_matrix_is_replaced_after_the_run(tmp_path):
+    values, weights, criteria_types = crisp_problem(np.random.default_rng(1), 50, 4)
+    matrix_path = str(tmp_path / 'matrix.npy')
+    np.save(matrix_path, values)
+
+    StreamingCrispTOPSIS(matrix_path, weights, criteria_types, 7).run(output_path=matrix_path)
+
+    np.testing.assert_allclose(np.load(matrix_path),
+                               crisp_closeness_batch(values, weights, criteria_types),
+                               rtol=1e-12, atol=1e-15)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['matrix.npy']
+
+
+def test_failed_run_keeps_the_existing_output(tmp_path):
+    values, weights, criteria_types = crisp_problem(np.random.default_rng(2), 50, 4)
+    output_path = tmp_path / 'closeness.npy'
+    np.save(output_path, np.arange(3.0))
+
+    def progress(fraction):
+        if fraction > 0.5:
+            raise RuntimeError('cancelled')
+
+    engine = StreamingCrispTOPSIS(values, weights, criteria_types, 7)
+    with pytest.raises(RuntimeError):
+        engine.run(output_path=str(output_path), progress=progress)
+
+    assert np.load(output_path).tolist() == [0.0, 1.0, 2.0]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['closeness.npy']
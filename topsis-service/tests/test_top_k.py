@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from app import app
+
+
+def tfn(value):
+    return {'lower': value * 0.9, 'most_likely': value, 'upper': value * 1.1}
+
+
+def crisp_body(rng):
+    # Small integer values so several sites tie
+    return {
+        'alternatives': rng.integers(1, 4, (60, 3)).tolist(),
+        'weights': [0.5, 0.3, 0.2],
+        'criteria_types': [True, False, True]
+    }
+
+
+def fuzzy_body(rng):
+    body = crisp_body(rng)
+    return {
+        **body,
+        'alternatives': [[tfn(v) for v in row] for row in body['alternatives']],
+        'weights': [tfn(w) for w in body['weights']]
+    }
+
+
+@pytest.mark.parametrize('route,make_body', [
+    ('/api/crisp-topsis/analyze', crisp_body),
+    ('/api/fuzzy-topsis/analyze', fuzzy_body)
+])
+@pytest.mark.parametrize('top_k', [1, 7, 60, 500])
+def test_top_k_returns_the_head_of_the_full_ranking(route, make_body, top_k):
+    client = app.test_client()
+    body = make_body(np.random.default_rng(0))
+
+    full = client.post(route, json=body).get_json()
+    response = client.post(route, json={**body, 'top_k': top_k}).get_json()
+
+    assert 'summary' not in full
+    assert response['rankings'] == full['rankings'][:top_k]
+
+    cc = np.array([r['closeness_coefficient'] for r in full['rankings']])
+    summary = response['summary']
+    assert summary['total'] == 60
+    assert summary['mean'] == pytest.approx(cc.mean())
+    assert summary['max'] == pytest.approx(cc.max())
+    assert summary['percentiles']['p50'] == pytest.approx(np.median(cc))
+    assert sum(summary['histogram']['counts']) == 60
+
+
+def test_session_rank_honours_top_k():
+    client = app.test_client()
+    body = crisp_body(np.random.default_rng(1))
+    session_id = client.post('/api/sessions', json={
+        'type': 'crisp', 'alternatives': body['alternatives'],
+        'criteria_types': body['criteria_types']
+    }).get_json()['session_id']
+
+    full = client.post(f'/api/sessions/{session_id}/rank', json={'weights': body['weights']})
+    top = client.post(f'/api/sessions/{session_id}/rank',
+                      json={'weights': body['weights'], 'top_k': 5})
+
+    assert top.get_json()['rankings'] == full.get_json()['rankings'][:5]
+    assert top.get_json()['summary']['total'] == 60
+    client.delete(f'/api/sessions/{session_id}')
+
+
+@pytest.mark.parametrize('top_k', [0, -3, True, '5', 2.5])
+def test_invalid_top_k_is_rejected(top_k):
+    body = crisp_body(np.random.default_rng(2))
+    response = app.test_client().post('/api/crisp-topsis/analyze', json={**body, 'top_k': top_k})
+
+    assert response.status_code == 400
+    assert 'top_k' in response.get_json()['error']
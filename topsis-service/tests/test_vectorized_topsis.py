@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from app import FuzzyTOPSIS, TriangularFuzzyNumber
+from vectorized_topsis import VectorizedFuzzyTOPSIS, rankings_from_closeness, top_k_order
+
+
+def legacy_rank(values, weights, criteria_types):
+    alternatives = [[TriangularFuzzyNumber(*cell) for cell in row] for row in values]
+    return FuzzyTOPSIS(alternatives, [TriangularFuzzyNumber(*w) for w in weights],
+                       list(criteria_types)).rank()
+
+
+def fuzzy_problem(rng, n, m):
+    lower = rng.uniform(1, 10, (n, m))
+    values = np.stack([lower, lower + rng.uniform(0, 2, (n, m)),
+                       lower + rng.uniform(2, 4, (n, m))], axis=2)
+    return values, np.sort(rng.uniform(0.1, 1, (m, 3)), axis=1), rng.random(m) < 0.5
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_vectorized_matches_object_engine(seed):
+    values, weights, criteria_types = fuzzy_problem(np.random.default_rng(seed), 30, 5)
+
+    expected = legacy_rank(values, weights, criteria_types)
+    rankings = VectorizedFuzzyTOPSIS(values, weights, criteria_types).rank()
+
+    assert [r['alternative_index'] for r in rankings] == \
+        [r['alternative_index'] for r in expected]
+    np.testing.assert_allclose([r['closeness_coefficient'] for r in rankings],
+                               [r['closeness_coefficient'] for r in expected], rtol=1e-12)
+
+
+def test_tied_alternatives_keep_input_order():
+    values, weights, criteria_types = fuzzy_problem(np.random.default_rng(4), 6, 3)
+    # Rows 1, 3 and 5 are identical, so they tie
+    values[3] = values[5] = values[1]
+
+    expected = legacy_rank(values, weights, criteria_types)
+    rankings = VectorizedFuzzyTOPSIS(values, weights, criteria_types).rank()
+
+    assert [r['alternative_index'] for r in rankings] == \
+        [r['alternative_index'] for r in expected]
+    tied = [r['alternative_index'] for r in rankings if r['alternative_index'] in (1, 3, 5)]
+    assert tied == [1, 3, 5]
+
+
+@pytest.mark.parametrize('top_k', [1, 5, 17, 40, 41, 100])
+def test_top_k_is_a_prefix_of_the_full_ranking(top_k):
+    # Few distinct values, so ties fall on the top-k boundary
+    cc = np.random.default_rng(top_k).integers(0, 5, 41).astype(float)
+
+    full = np.argsort(-cc, kind='stable')
+
+    assert top_k_order(cc, top_k).tolist() == full[:top_k].tolist()
+    assert rankings_from_closeness(cc, top_k) == rankings_from_closeness(cc)[:top_k]
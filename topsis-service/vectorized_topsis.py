@@ -0,0 +1,325 @@
+import numpy as np
+
+from fuzzy_kernels import distance_kernel
+
+# Values of the "precision" request field. Closeness only has to separate
+# sites to a few significant digits, so float32 is safe for ranking and
+# halves the memory footprint and bandwidth of every tensor.
+PRECISIONS = {'float64': np.float64, 'float32': np.float32}
+
+
+def fuzzy_array(values, dtype=float):
+    """Convert nested {lower, most_likely, upper} dicts into a float array.
+
+    A list of dicts becomes shape (m, 3); a list of lists of dicts becomes
+    shape (n, m, 3). The last axis is always (lower, most_likely, upper).
+    """
+    if values and isinstance(values[0], dict):
+        rows = [(v['lower'], v['most_likely'], v['upper']) for v in values]
+    else:
+        rows = [
+            [(c['lower'], c['most_likely'], c['upper']) for c in alt]
+            for alt in values
+        ]
+    return np.ascontiguousarray(rows, dtype=dtype)
+
+
+def top_k_order(cc, top_k=None):
+    """Indices of the best `top_k` closeness values, best first.
+
+    Uses partial selection so only the k survivors are sorted. Ties are
+    broken by input order, so the result is always a prefix of the full
+    stable descending sort.
+    """
+    n = len(cc)
+    if top_k is None or top_k >= n:
+        return np.argsort(-cc, kind='stable')
+
+    # Everything strictly above the k-th largest value is in; ties at the
+    # boundary are filled in input order
+    kth = np.partition(cc, n - top_k)[n - top_k]
+    above = np.flatnonzero(cc > kth)
+    tied = np.flatnonzero(cc == kth)[:top_k - len(above)]
+    survivors = np.concatenate([above, tied])
+    return survivors[np.lexsort((survivors, -cc[survivors]))]
+
+
+def rankings_from_closeness(cc, top_k=None):
+    """Build the ranking list for a 1-D array of closeness coefficients.
+
+    A stable descending sort keeps ties in input order, matching the
+    list.sort(reverse=True) used by the object-based engines. With top_k
+    only the best k rows are selected and serialized.
+    """
+    return [
+        {
+            'alternative_index': int(i),
+            'closeness_coefficient': float(cc[i]),
+            'rank': rank
+        }
+        for rank, i in enumerate(top_k_order(cc, top_k), 1)
+    ]
+
+
+def closeness_summary(cc, bins=10):
+    """Totals and score distribution for responses that omit most rows"""
+    counts, edges = np.histogram(cc, bins=bins, range=(0.0, 1.0))
+    percentiles = np.percentile(cc, [10, 25, 50, 75, 90])
+    return {
+        'total': int(len(cc)),
+        'mean': float(np.mean(cc)),
+        'std': float(np.std(cc)),
+        'min': float(np.min(cc)),
+        'max': float(np.max(cc)),
+        'percentiles': {
+            f'p{p}': float(v) for p, v in zip((10, 25, 50, 75, 90), percentiles)
+        },
+        'histogram': {
+            'bin_edges': edges.tolist(),
+            'counts': counts.tolist()
+        }
+    }
+
+
+def fuzzy_column_scales(values, criteria_types):
+    """Per-column normalization scale of a (n, m, 3) fuzzy matrix.
+
+    Benefit columns use the max upper value; cost columns use the min
+    positive lower value (inf when no lower value is positive).
+    """
+    benefit = np.asarray(criteria_types, dtype=bool)
+    max_upper = values[:, :, 2].max(axis=0)
+    lower = values[:, :, 0]
+    min_lower = np.where(lower > 0, lower, np.inf).min(axis=0)
+    return np.where(benefit, max_upper, min_lower)
+
+
+def normalize_fuzzy_columns(values, criteria_types, scale):
+    """Normalize (n, m, 3) fuzzy columns against precomputed column scales.
+
+    Benefit columns are divided by their max upper value. Cost columns
+    become min_lower / (upper, most_likely, lower), with 1 where the
+    denominator is not positive. Columns without a usable scale are zero.
+    """
+    benefit = np.asarray(criteria_types, dtype=bool)
+    normalized = np.zeros_like(values)
+
+    # Benefit criteria: divide by the column's max upper value
+    cols = benefit & (scale > 0)
+    normalized[:, cols, :] = values[:, cols, :] / scale[cols, None]
+
+    # Cost criteria: min positive lower divided by (upper, most_likely, lower)
+    cols = ~benefit & np.isfinite(scale)
+    reversed_tfn = values[:, cols, ::-1]
+    normalized[:, cols, :] = np.divide(
+        scale[cols, None],
+        reversed_tfn,
+        out=np.ones_like(reversed_tfn),
+        where=reversed_tfn > 0
+    )
+
+    return normalized
+
+
+def crisp_closeness_batch(matrix, weights, criteria_types, dtype=float):
+    """Crisp TOPSIS closeness for a stack of problems in one pass.
+
+    matrix: array of shape (..., n, m); weights and criteria_types: arrays
+    of shape (..., m) broadcastable against it. Uses the same vector
+    normalization and zero-guards as CrispTOPSIS and returns closeness of
+    shape (..., n) in the given dtype.
+    """
+    matrix = np.asarray(matrix, dtype=dtype)
+    weights = np.asarray(weights, dtype=dtype)
+    benefit = np.expand_dims(np.asarray(criteria_types, dtype=bool), -2)
+
+    # Column norms accumulate in float64 even for float32 input
+    norms = np.sqrt(np.sum(matrix ** 2, axis=-2, keepdims=True, dtype=np.float64))
+    norms[norms == 0] = 1
+    weighted = matrix / norms.astype(matrix.dtype) * weights[..., None, :]
+
+    col_max = weighted.max(axis=-2, keepdims=True)
+    col_min = weighted.min(axis=-2, keepdims=True)
+    pis = np.where(benefit, col_max, col_min)
+    nis = np.where(benefit, col_min, col_max)
+
+    d_plus = np.sqrt(np.sum((weighted - pis) ** 2, axis=-1))
+    d_minus = np.sqrt(np.sum((weighted - nis) ** 2, axis=-1))
+    denominator = d_plus + d_minus
+    denominator[denominator == 0] = 1
+    return d_minus / denominator
+
+
+def fuzzy_closeness_batch(values, weights, criteria_types, dtype=float, distance='vertex'):
+    """Fuzzy TOPSIS closeness for a stack of independent problems.
+
+    values: array of shape (..., n, m, 3); weights: (..., m, 3);
+    criteria_types: (..., m). Every problem is normalized against its own
+    columns, exactly as VectorizedFuzzyTOPSIS would, and closeness of shape
+    (..., n) is returned in the given dtype. distance names a kernel in
+    fuzzy_kernels.DISTANCE_KERNELS.
+    """
+    kernel = distance_kernel(distance)
+    values = np.asarray(values, dtype=dtype)
+    weights = np.asarray(weights, dtype=dtype)
+    benefit = np.asarray(criteria_types, dtype=bool)
+
+    # Column scales as in fuzzy_column_scales, per problem
+    lower = values[..., 0]
+    scale = np.where(
+        benefit,
+        values[..., 2].max(axis=-2),
+        np.where(lower > 0, lower, np.inf).min(axis=-2)
+    )
+
+    # Broadcast the (..., m) column properties over rows and TFN components
+    benefit = benefit[..., None, :, None]
+    scale = scale[..., None, :, None]
+    reversed_tfn = values[..., ::-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normalized = np.where(
+            benefit,
+            np.where(scale > 0, values / scale, 0.0),
+            np.where(np.isfinite(scale),
+                     np.where(reversed_tfn > 0, scale / reversed_tfn, 1.0), 0.0)
+        )
+
+    weighted = normalized * weights[..., None, :, :]
+    col_max = weighted.max(axis=-3, keepdims=True)
+    col_min = weighted.min(axis=-3, keepdims=True)
+    fpis = np.where(benefit, col_max, col_min)
+    fnis = np.where(benefit, col_min, col_max)
+
+    d_plus = kernel(weighted, fpis).sum(axis=-1)
+    d_minus = kernel(weighted, fnis).sum(axis=-1)
+    denominator = d_plus + d_minus
+    return np.divide(d_minus, denominator, out=np.zeros_like(denominator),
+                     where=denominator > 0)
+
+
+def ranks_from_closeness(cc):
+    """Zero-based rank positions along the last axis (0 = best).
+
+    Ties are broken by input order, consistent with rankings_from_closeness.
+    """
+    order = np.argsort(-cc, axis=-1, kind='stable')
+    ranks = np.empty_like(order)
+    positions = np.broadcast_to(np.arange(cc.shape[-1]), order.shape)
+    np.put_along_axis(ranks, order, positions, axis=-1)
+    return ranks
+
+
+class VectorizedFuzzyTOPSIS:
+    """Fuzzy TOPSIS over a contiguous (n, m, 3) triangular fuzzy tensor.
+
+    Produces the same closeness coefficients and ranking as FuzzyTOPSIS, but
+    every step runs as a whole-array NumPy operation instead of building a
+    TriangularFuzzyNumber per cell.
+    """
+
+    def __init__(self, alternatives, weights, criteria_types, dtype=float, distance='vertex'):
+        """
+        alternatives: array-like of shape (n, m, 3) as (lower, most_likely, upper)
+        weights: array-like of shape (m, 3)
+        criteria_types: List of booleans (True for benefit, False for cost)
+        dtype: float64 (default) or float32 for every step of the computation
+        distance: name of a cell distance kernel in fuzzy_kernels.DISTANCE_KERNELS
+        """
+        self.distance = distance
+        self.kernel = distance_kernel(distance)
+        self.alternatives = np.ascontiguousarray(alternatives, dtype=dtype)
+        self.weights = np.ascontiguousarray(weights, dtype=dtype)
+        self.criteria_types = np.asarray(criteria_types, dtype=bool)
+
+        if self.alternatives.ndim != 3 or self.alternatives.shape[2] != 3:
+            raise ValueError('alternatives must have shape (n, m, 3)')
+
+        self.n_alternatives, self.n_criteria = self.alternatives.shape[:2]
+
+        if self.weights.shape != (self.n_criteria, 3):
+            raise ValueError('weights must have shape (m, 3)')
+        if self.criteria_types.shape != (self.n_criteria,):
+            raise ValueError('criteria_types must match number of criteria')
+
+    def normalize_fuzzy_matrix(self):
+        """Normalize the fuzzy decision matrix"""
+        scale = fuzzy_column_scales(self.alternatives, self.criteria_types)
+        return normalize_fuzzy_columns(self.alternatives, self.criteria_types, scale)
+
+    def calculate_weighted_matrix(self, normalized):
+        """Apply weights to normalized matrix"""
+        return normalized * self.weights
+
+    def calculate_ideal_solutions(self, weighted):
+        """Calculate fuzzy positive and negative ideal solutions"""
+        col_max = weighted.max(axis=0)
+        col_min = weighted.min(axis=0)
+        benefit = self.criteria_types[:, None]
+
+        fpis = np.where(benefit, col_max, col_min)
+        fnis = np.where(benefit, col_min, col_max)
+        return fpis, fnis
+
+    def calculate_distances(self, weighted, fpis, fnis):
+        """Calculate distances from ideal solutions with the selected kernel"""
+        cell_plus = self.kernel(weighted, fpis)
+        cell_minus = self.kernel(weighted, fnis)
+        return cell_plus.sum(axis=1), cell_minus.sum(axis=1)
+
+    def calculate_closeness_coefficients(self, d_plus, d_minus):
+        """Calculate closeness coefficients (CC)"""
+        denominator = d_plus + d_minus
+        return np.divide(
+            d_minus,
+            denominator,
+            out=np.zeros_like(denominator),
+            where=denominator > 0
+        )
+
+    def closeness(self):
+        """Run steps 1-5 and return the closeness coefficient array"""
+        normalized = self.normalize_fuzzy_matrix()
+        weighted = self.calculate_weighted_matrix(normalized)
+        fpis, fnis = self.calculate_ideal_solutions(weighted)
+        d_plus, d_minus = self.calculate_distances(weighted, fpis, fnis)
+        return self.calculate_closeness_coefficients(d_plus, d_minus)
+
+    def rank(self, top_k=None):
+        """Perform complete fuzzy TOPSIS ranking, optionally only the top k"""
+        return rankings_from_closeness(self.closeness(), top_k)
+
+    def closeness_scenarios(self, weight_sets):
+        """Closeness coefficients for K fuzzy weight sets of shape (K, m, 3).
+
+        The matrix is normalized once and the weight sets are broadcast over
+        a (K, n, m, 3) tensor, so each extra scenario only costs the
+        weighting, ideal-solution and distance arithmetic.
+        """
+        weight_sets = np.asarray(weight_sets, dtype=self.alternatives.dtype)
+        if weight_sets.ndim != 3 or weight_sets.shape[1:] != (self.n_criteria, 3):
+            raise ValueError('weight_sets must have shape (K, m, 3)')
+
+        normalized = self.normalize_fuzzy_matrix()
+        weighted = normalized[None, :, :, :] * weight_sets[:, None, :, :]
+
+        col_max = weighted.max(axis=1, keepdims=True)
+        col_min = weighted.min(axis=1, keepdims=True)
+        benefit = self.criteria_types[:, None]
+        fpis = np.where(benefit, col_max, col_min)
+        fnis = np.where(benefit, col_min, col_max)
+
+        cell_plus = self.kernel(weighted, fpis)
+        cell_minus = self.kernel(weighted, fnis)
+        return self.calculate_closeness_coefficients(
+            cell_plus.sum(axis=2), cell_minus.sum(axis=2)
+        )
+
+    def rank_scenarios(self, weight_sets):
+        """Rank the alternatives once per fuzzy weight set"""
+        return [rankings_from_closeness(cc) for cc in self.closeness_scenarios(weight_sets)]
+
+    def incremental(self):
+        """Switch to an engine that absorbs add/update/remove edits in place"""
+        from incremental import IncrementalFuzzyTOPSIS
+        return IncrementalFuzzyTOPSIS(self.alternatives, self.weights, self.criteria_types,
+                                      self.distance)